@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Offline turn benchmark for the agent registry.
+
+Runs the sample flows of `test_rfp_agents.py` and `test_smart_orchestrator.py`
+through each agent with `rag.shared_libraries.offline`: a scripted model and
+canned retrieval, with optional simulated latency. No Google Cloud access is
+needed. For each agent it reports, per turn:
+- the Python overhead: wall time minus the simulated model and retrieval latency
+- the events produced and model calls made
+- the peak memory allocated (measured in a separate pass under tracemalloc)
+
+Usage:
+    python benchmarks/agent_benchmark.py
+    python benchmarks/agent_benchmark.py --agents rag rfp_validation --repeats 50
+    python benchmarks/agent_benchmark.py --llm-latency-ms 800 --retrieval-latency-ms 150
+    python benchmarks/agent_benchmark.py --max-overhead-ms 20  # fail on regressions
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, REPO_ROOT)
+
+# Keep the benchmark off the network before any settings are read
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+os.environ.setdefault("PROMPT_CACHE_ENABLED", "false")
+
+from google.adk.runners import Runner  # noqa: E402
+from google.adk.sessions import InMemorySessionService  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from rag.agent_registry import get_agent  # noqa: E402
+from rag.shared_libraries.offline import FakeRetrievalClient, ScriptedLlm, offline  # noqa: E402
+
+APP_NAME = "agent_benchmark"
+
+SAMPLE_PROJECT = """Project name: Digital Transformation Project
+Description: Modernize legacy systems and implement cloud-based solutions
+Budget: $500,000 - $750,000
+Timeline: 6-9 months
+Requirements: Cloud migration, API development, Security compliance"""
+
+SAMPLE_RFP = """REQUEST FOR PROPOSAL
+Digital Transformation Project
+
+1. Project Overview
+We are seeking proposals for a digital transformation project.
+
+2. Scope of Work
+- Cloud migration
+- API development
+- Security implementation
+
+3. Timeline
+6 months
+
+4. Budget
+$500,000"""
+
+ROUTING_REQUESTS = [
+    "I want to create an RFP for a new mobile app development project",
+    "Please validate this RFP for compliance",
+    "What should be included in an RFP?",
+    "What are the requirements for technical specifications in RFPs?",
+    "Help me understand the RFP process",
+]
+
+# Conversations per agent; each conversation runs in a fresh session
+FLOWS = {
+    "rag": [[request] for request in ROUTING_REQUESTS],
+    "rfp_orchestrator": [
+        ["I want to create an RFP for a new e-commerce website"],
+        ["Please validate this RFP for compliance"],
+        ["What should be included in an RFP?"],
+        ["Help me understand RFP guidelines"],
+    ],
+    "rfp_creation": [
+        ["I want to create an RFP for a digital transformation project", SAMPLE_PROJECT],
+    ],
+    "rfp_validation": [
+        ["Please validate this RFP for compliance", SAMPLE_RFP],
+        [f"Please validate this RFP for compliance:\n\n{SAMPLE_RFP}"],
+    ],
+    "rfp_query": [
+        ["What should be included in an RFP?"],
+        ["What are the requirements for technical specifications in RFPs?"],
+    ],
+}
+
+
+async def run_flow(runner: Runner, turns: list[str], llm: ScriptedLlm, retrieval: FakeRetrievalClient) -> list[dict]:
+    """
+    Run one conversation in a fresh session and measure each turn.
+
+    Args:
+        runner (Runner): Runner of the agent under test
+        turns (list): User messages, in order
+        llm (ScriptedLlm): The agent's model, for call counts and simulated latency
+        retrieval (FakeRetrievalClient): The agent's retrieval backend
+
+    Returns:
+        list: Per turn, wall_ms, overhead_ms, events and llm_calls, and
+            peak_kb while tracemalloc is tracing
+    """
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id="benchmark")
+    results = []
+    for text in turns:
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        requests, simulated = llm.requests, llm.simulated_seconds + retrieval.simulated_seconds
+        events = 0
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        async for _ in runner.run_async(user_id="benchmark", session_id=session.id, new_message=message):
+            events += 1
+        wall = time.perf_counter() - start
+        simulated = llm.simulated_seconds + retrieval.simulated_seconds - simulated
+        result = {
+            "wall_ms": wall * 1000,
+            "overhead_ms": (wall - simulated) * 1000,
+            "events": events,
+            "llm_calls": llm.requests - requests,
+        }
+        if tracemalloc.is_tracing():
+            result["peak_kb"] = (tracemalloc.get_traced_memory()[1] - baseline) / 1024
+        results.append(result)
+    return results
+
+
+async def benchmark_agent(
+    agent_name: str,
+    repeats: int,
+    llm_latency_seconds: float,
+    retrieval_latency_seconds: float,
+    trace_memory: bool,
+) -> list[dict]:
+    """
+    Run an agent's flows `repeats` times on the offline stand-ins.
+
+    Args:
+        agent_name (str): Registry name of the agent
+        repeats (int): Runs of each flow
+        llm_latency_seconds (float): Simulated latency per model call
+        retrieval_latency_seconds (float): Simulated latency per retrieval
+        trace_memory (bool): Record each turn's peak allocation as peak_kb
+
+    Returns:
+        list: One result per turn, see `run_flow`
+    """
+    agent = get_agent(agent_name)
+    llm = ScriptedLlm(latency_seconds=llm_latency_seconds)
+    retrieval = FakeRetrievalClient(latency_seconds=retrieval_latency_seconds)
+    results = []
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with offline(agent, llm, retrieval):
+            runner = Runner(app_name=APP_NAME, agent=agent, session_service=InMemorySessionService())
+            for _ in range(repeats):
+                for turns in FLOWS[agent_name]:
+                    results.extend(await run_flow(runner, turns, llm, retrieval))
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return results
+
+
+def summarize(results: list[dict]) -> dict:
+    """Median and p95 overhead, mean events and model calls, and median peak memory per turn."""
+    overheads = sorted(result["overhead_ms"] for result in results)
+    summary = {
+        "turns": len(results),
+        "overhead_median_ms": statistics.median(overheads),
+        "overhead_p95_ms": overheads[min(len(overheads) - 1, int(0.95 * len(overheads)))],
+        "events_per_turn": statistics.mean(result["events"] for result in results),
+        "llm_calls_per_turn": statistics.mean(result["llm_calls"] for result in results),
+    }
+    peaks = [result["peak_kb"] for result in results if "peak_kb" in result]
+    if peaks:
+        summary["peak_kb_per_turn"] = statistics.median(peaks)
+    return summary
+
+
+async def run_benchmark(args) -> dict[str, dict]:
+    summaries = {}
+    for agent_name in args.agents:
+        # Warm-up: builds the agent and fills lazy caches outside the measurement
+        await benchmark_agent(agent_name, 1, 0.0, 0.0, trace_memory=False)
+        results = await benchmark_agent(
+            agent_name, args.repeats, args.llm_latency_ms / 1000, args.retrieval_latency_ms / 1000, False
+        )
+        if not args.skip_memory:
+            results = [
+                {**timed, "peak_kb": traced["peak_kb"]}
+                for timed, traced in zip(results, await benchmark_agent(agent_name, args.repeats, 0.0, 0.0, True))
+            ]
+        summaries[agent_name] = summarize(results)
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-turn agent overhead offline.")
+    parser.add_argument(
+        "--agents",
+        nargs="+",
+        default=list(FLOWS),
+        choices=list(FLOWS),
+        help="Registry names of the agents to measure",
+    )
+    parser.add_argument("--repeats", type=int, default=20, help="Runs of each sample flow")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated latency per model call")
+    parser.add_argument(
+        "--retrieval-latency-ms", type=float, default=0.0, help="Simulated latency per retrieval"
+    )
+    parser.add_argument("--skip-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--json", action="store_true", help="Print the summaries as JSON")
+    parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        default=None,
+        help="Exit with an error if any agent's median per-turn overhead exceeds this",
+    )
+    args = parser.parse_args()
+
+    summaries = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        print(
+            f"{'agent':<18}{'turns':>7}{'overhead (ms)':>15}{'p95 (ms)':>10}"
+            f"{'events':>8}{'llm calls':>11}{'peak (KB)':>11}"
+        )
+        for agent_name, summary in summaries.items():
+            peak = summary.get("peak_kb_per_turn")
+            print(
+                f"{agent_name:<18}{summary['turns']:>7}{summary['overhead_median_ms']:>15.2f}"
+                f"{summary['overhead_p95_ms']:>10.2f}{summary['events_per_turn']:>8.1f}"
+                f"{summary['llm_calls_per_turn']:>11.1f}{(f'{peak:.0f}' if peak is not None else '-'):>11}"
+            )
+
+    if args.max_overhead_ms is not None:
+        over_budget = [
+            agent_name for agent_name, summary in summaries.items()
+            if summary["overhead_median_ms"] > args.max_overhead_ms
+        ]
+        if over_budget:
+            print(f"❌ Median per-turn overhead over {args.max_overhead_ms}ms for: {', '.join(over_budget)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
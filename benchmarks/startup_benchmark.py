@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cold-start benchmark for the agent registry.
+
+Each measurement runs in a fresh interpreter and reports:
+- the time to import `rag.agent_registry`
+- the time to build one agent with `get_agent`
+- how many modules were loaded in total
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --agents rfp_validation --runs 10
+    python benchmarks/startup_benchmark.py --max-seconds 6  # fail on regressions
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from rag.agent_registry import get_agent
+imported = time.perf_counter()
+agent = get_agent({agent_name!r})
+built = time.perf_counter()
+print(json.dumps({{
+    "import_seconds": imported - start,
+    "build_seconds": built - imported,
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def measure_cold_start(agent_name: str) -> dict:
+    """
+    Build one agent in a fresh interpreter and time it.
+
+    Args:
+        agent_name (str): Registry name of the agent to build
+
+    Returns:
+        dict: import_seconds, build_seconds and modules
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(agent_name=agent_name)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure agent cold-start time.")
+    parser.add_argument(
+        "--agents",
+        nargs="+",
+        default=["rag", "rfp_creation", "rfp_validation", "rfp_query", "rfp_orchestrator"],
+        help="Registry names of the agents to measure",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per agent")
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Exit with an error if any agent's median cold start exceeds this",
+    )
+    args = parser.parse_args()
+
+    print(f"{'agent':<18}{'import (ms)':>14}{'build (ms)':>14}{'total (ms)':>14}{'modules':>10}")
+    over_budget = []
+    for agent_name in args.agents:
+        runs = [measure_cold_start(agent_name) for _ in range(args.runs)]
+        import_ms = statistics.median(run["import_seconds"] for run in runs) * 1000
+        build_ms = statistics.median(run["build_seconds"] for run in runs) * 1000
+        total_seconds = (import_ms + build_ms) / 1000
+        modules = runs[-1]["modules"]
+        print(f"{agent_name:<18}{import_ms:>14.1f}{build_ms:>14.1f}{total_seconds * 1000:>14.1f}{modules:>10}")
+        if args.max_seconds is not None and total_seconds > args.max_seconds:
+            over_budget.append(agent_name)
+
+    if over_budget:
+        print(f"❌ Cold start over {args.max_seconds}s for: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
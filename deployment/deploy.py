@@ -62,6 +62,8 @@ remote_app = agent_engines.create(
         "tqdm",
         "requests",
         "llama-index",
+        "pypdf",
+        "numpy",
     ],
     extra_packages=[
         "./rag",
@@ -0,0 +1,513 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Load Test for Deployed Agent Engines
+
+Simulates concurrent users against the same `stream_query` path as
+`run.py`. Each virtual user has its own user ID and a fresh session per
+scenario, and replays scenarios (one or more turns) drawn from a query mix
+file. Users are added on a ramp-up schedule. For every turn the harness
+records:
+- time to first event and total latency
+- the number of events and tool calls
+- errors
+
+The report gives p50/p95/p99 latencies, throughput and error rates, both
+overall and per ramp-up stage.
+
+The query mix is a JSONL file of scenarios, each with "turns" and an
+optional "name" and "weight":
+    {"name": "create", "weight": 2, "turns": ["I need an RFP for a CRM", "Budget is SAR 2M"]}
+A plain text file with one query per line also works.
+
+Usage:
+    # Capacity planning against a local stub server
+    python deployment/load_test.py stub --port 8089 --first-event-delay 0.8
+    python deployment/load_test.py run --stub-url http://localhost:8089 --queries mix.jsonl \\
+        --stages 10:30,50:60,50:120
+
+    # A deployed agent engine (AGENT_ENGINE_ID from .env by default)
+    python deployment/load_test.py run --queries mix.jsonl --users 20 --ramp-up 60 --duration 300
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+
+@dataclass
+class Scenario:
+    """A conversation replayed in one session."""
+
+    name: str
+    turns: list[str]
+    weight: float = 1.0
+
+
+def read_scenarios(path: str) -> list[Scenario]:
+    """
+    Read a query mix file.
+
+    Args:
+        path (str): JSONL file of scenarios, or a text file with one query per line
+
+    Returns:
+        list: The scenarios
+    """
+    scenarios = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                scenarios.append(Scenario(
+                    name=record.get("name", f"scenario-{number}"),
+                    turns=list(record["turns"]),
+                    weight=float(record.get("weight", 1.0)),
+                ))
+            else:
+                scenarios.append(Scenario(name=f"query-{number}", turns=[line]))
+    return scenarios
+
+
+def parse_stages(spec: str) -> list[tuple[int, float]]:
+    """Parses "10:30,50:60" into [(10 users, 30 s), (50 users, 60 s)]."""
+    stages = []
+    for stage in spec.split(","):
+        users, seconds = stage.split(":")
+        stages.append((int(users), float(seconds)))
+    return stages
+
+
+def user_start_times(stages: list[tuple[int, float]]) -> list[float]:
+    """
+    Start time of every virtual user for a ramp-up schedule.
+
+    Within a stage, the user count grows linearly from the previous stage's
+    target to this stage's target. Users are never removed.
+
+    Args:
+        stages (list): (target users, seconds) pairs
+
+    Returns:
+        list: Start offset in seconds of each user, in order
+    """
+    starts: list[float] = []
+    stage_start = 0.0
+    for target, seconds in stages:
+        added = target - len(starts)
+        for k in range(max(added, 0)):
+            starts.append(stage_start + seconds * k / added)
+        stage_start += seconds
+    return starts
+
+
+def stage_of(offset: float, stages: list[tuple[int, float]]) -> int:
+    """Returns the index of the stage an offset falls in."""
+    end = 0.0
+    for index, (_, seconds) in enumerate(stages):
+        end += seconds
+        if offset < end:
+            return index
+    return len(stages) - 1
+
+
+class AgentEngineTarget:
+    """Sends queries to a deployed agent engine."""
+
+    def __init__(self, agent_engine_id: str):
+        from vertexai import agent_engines
+
+        self.agent_engine = agent_engines.get(agent_engine_id)
+
+    def create_session(self, user_id: str) -> str:
+        return self.agent_engine.create_session(user_id=user_id)["id"]
+
+    def stream_query(self, user_id: str, session_id: str, message: str) -> Iterator[dict]:
+        return self.agent_engine.stream_query(user_id=user_id, session_id=session_id, message=message)
+
+
+class StubTarget:
+    """Sends queries to a stub server started with the "stub" command."""
+
+    def __init__(self, base_url: str, timeout: float = 300):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.http = requests.Session()
+
+    def create_session(self, user_id: str) -> str:
+        response = self.http.post(f"{self.base_url}/sessions", json={"user_id": user_id}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["id"]
+
+    def stream_query(self, user_id: str, session_id: str, message: str) -> Iterator[dict]:
+        body = {"user_id": user_id, "session_id": session_id, "message": message}
+        with self.http.post(f"{self.base_url}/stream_query", json=body, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+
+@dataclass
+class TurnResult:
+    """Measurements of one turn."""
+
+    user: int
+    scenario: str
+    turn: int
+    start_offset: float
+    ttfe_seconds: float | None
+    latency_seconds: float
+    events: int
+    tool_calls: int
+    error: str | None = None
+
+
+def count_tool_calls(event: dict) -> int:
+    parts = (event.get("content") or {}).get("parts") or []
+    return sum(1 for part in parts if "functionCall" in part or "function_call" in part)
+
+
+def run_turn(target, user: int, user_id: str, session_id: str, scenario: Scenario, turn: int, t0: float) -> TurnResult:
+    """Sends one turn and measures it; errors are recorded, not raised."""
+    start = time.perf_counter()
+    ttfe = None
+    events = tool_calls = 0
+    error = None
+    try:
+        for event in target.stream_query(user_id, session_id, scenario.turns[turn]):
+            if ttfe is None:
+                ttfe = time.perf_counter() - start
+            events += 1
+            tool_calls += count_tool_calls(event)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"[:200]
+    return TurnResult(
+        user=user, scenario=scenario.name, turn=turn, start_offset=start - t0, ttfe_seconds=ttfe,
+        latency_seconds=time.perf_counter() - start, events=events, tool_calls=tool_calls, error=error,
+    )
+
+
+def run_load_test(
+    target,
+    scenarios: list[Scenario],
+    stages: list[tuple[int, float]],
+    iterations: int | None = None,
+    think_time: float = 0.0,
+    seed: int | None = None,
+    output_path: str | None = None,
+) -> list[TurnResult]:
+    """
+    Run virtual users against a target following a ramp-up schedule.
+
+    Each user starts at its scheduled time and replays weighted random
+    scenarios, each in a new session, until the schedule ends or it has
+    run `iterations` scenarios.
+
+    Args:
+        target: AgentEngineTarget, StubTarget or any object with
+            `create_session` and `stream_query`
+        scenarios (list): The query mix
+        stages (list): Ramp-up schedule of (target users, seconds) pairs
+        iterations (int, optional): Scenarios per user; unlimited if None
+        think_time (float): Pause between turns, in seconds
+        seed (int, optional): Seed for the scenario choice
+        output_path (str, optional): JSONL file every turn is appended to
+
+    Returns:
+        list: The measurements of every turn, in completion order
+    """
+    starts = user_start_times(stages)
+    end = sum(seconds for _, seconds in stages)
+    weights = [scenario.weight for scenario in scenarios]
+    results: list[TurnResult] = []
+    lock = threading.Lock()
+    output = open(output_path, "a", encoding="utf-8") if output_path else None
+    t0 = time.perf_counter()
+
+    def record(result: TurnResult) -> None:
+        with lock:
+            results.append(result)
+            if output:
+                output.write(json.dumps(asdict(result)) + "\n")
+                output.flush()
+
+    def run_user(user: int) -> None:
+        rng = random.Random(None if seed is None else seed + user)
+        time.sleep(max(0.0, starts[user] - (time.perf_counter() - t0)))
+        user_id = f"load-{uuid.uuid4().hex[:8]}-{user}"
+        completed = 0
+        while (iterations is None or completed < iterations) and (
+            iterations is not None or time.perf_counter() - t0 < end
+        ):
+            scenario = rng.choices(scenarios, weights)[0]
+            try:
+                session_id = target.create_session(user_id)
+            except Exception as e:
+                record(TurnResult(
+                    user=user, scenario=scenario.name, turn=-1, start_offset=time.perf_counter() - t0,
+                    ttfe_seconds=None, latency_seconds=0.0, events=0, tool_calls=0,
+                    error=f"create_session: {type(e).__name__}: {e}"[:200],
+                ))
+                completed += 1
+                continue
+            for turn in range(len(scenario.turns)):
+                record(run_turn(target, user, user_id, session_id, scenario, turn, t0))
+                if think_time:
+                    time.sleep(think_time)
+            completed += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(len(starts), 1)) as executor:
+            list(executor.map(run_user, range(len(starts))))
+    finally:
+        if output:
+            output.close()
+    return results
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile, e.g. q=95; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+def summarize(results: list[TurnResult], elapsed_seconds: float | None = None) -> dict:
+    """
+    Aggregate turn measurements.
+
+    Args:
+        results (list): Turn measurements
+        elapsed_seconds (float, optional): Wall-clock time for throughput;
+            the span of the turns if None
+
+    Returns:
+        dict: Turns, errors, error rate, throughput, TTFE and latency
+            percentiles, and mean events and tool calls
+    """
+    ok = [result for result in results if not result.error]
+    latencies = [result.latency_seconds for result in ok]
+    ttfes = [result.ttfe_seconds for result in ok if result.ttfe_seconds is not None]
+    if elapsed_seconds is None and results:
+        elapsed_seconds = max(r.start_offset + r.latency_seconds for r in results) - min(r.start_offset for r in results)
+    return {
+        "turns": len(results),
+        "errors": len(results) - len(ok),
+        "error_rate": (len(results) - len(ok)) / len(results) if results else 0.0,
+        "throughput_per_second": len(ok) / elapsed_seconds if elapsed_seconds else 0.0,
+        **{f"ttfe_p{q}": percentile(ttfes, q) for q in (50, 95, 99)},
+        **{f"latency_p{q}": percentile(latencies, q) for q in (50, 95, 99)},
+        "mean_events": statistics.mean(r.events for r in ok) if ok else 0.0,
+        "mean_tool_calls": statistics.mean(r.tool_calls for r in ok) if ok else 0.0,
+    }
+
+
+def format_report(results: list[TurnResult], stages: list[tuple[int, float]], elapsed_seconds: float) -> str:
+    """Renders overall and per-stage summaries as a table."""
+    header = (
+        f"{'stage':<14}{'turns':>7}{'err %':>7}{'turn/s':>8}{'ttfe p50':>10}{'p95':>8}{'p99':>8}"
+        f"{'lat p50':>10}{'p95':>8}{'p99':>8}{'tools':>7}"
+    )
+
+    def row(label: str, summary: dict) -> str:
+        return (
+            f"{label:<14}{summary['turns']:>7}{summary['error_rate'] * 100:>7.1f}"
+            f"{summary['throughput_per_second']:>8.2f}{summary['ttfe_p50']:>10.2f}{summary['ttfe_p95']:>8.2f}"
+            f"{summary['ttfe_p99']:>8.2f}{summary['latency_p50']:>10.2f}{summary['latency_p95']:>8.2f}"
+            f"{summary['latency_p99']:>8.2f}{summary['mean_tool_calls']:>7.1f}"
+        )
+
+    lines = [header]
+    if len(stages) > 1:
+        for index, (users, seconds) in enumerate(stages):
+            stage_results = [r for r in results if stage_of(r.start_offset, stages) == index]
+            lines.append(row(f"{index + 1}: {users}u/{seconds:g}s", summarize(stage_results, seconds)))
+    lines.append(row("overall", summarize(results, elapsed_seconds)))
+    errors: dict[str, int] = {}
+    for result in results:
+        if result.error:
+            errors[result.error] = errors.get(result.error, 0) + 1
+    lines.extend(f"  {count}x {error}" for error, count in sorted(errors.items(), key=lambda item: -item[1]))
+    return "\n".join(lines)
+
+
+class StubEngine:
+    """Local HTTP stand-in for an agent engine, with scripted latencies."""
+
+    def __init__(
+        self,
+        first_event_delay: float = 0.5,
+        event_delay: float = 0.1,
+        text_events: int = 3,
+        tool_calls: int = 1,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        """
+        Args:
+            first_event_delay (float): Seconds before the first event
+            event_delay (float): Seconds between later events
+            text_events (int): Text events per response
+            tool_calls (int): Tool calls (each followed by its response) per turn
+            error_rate (float): Share of queries answered with HTTP 429
+            seed (int, optional): Seed for the simulated errors
+        """
+        self.first_event_delay = first_event_delay
+        self.event_delay = event_delay
+        self.text_events = text_events
+        self.tool_calls = tool_calls
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.queries = 0
+
+    def events(self, message: str) -> Iterator[dict]:
+        """Yields the scripted events for a query, sleeping between them."""
+        time.sleep(self.first_event_delay)
+        for number in range(self.tool_calls):
+            if number:
+                time.sleep(self.event_delay)
+            call = {"name": "retrieve_rfp_guidelines", "args": {"query": message[:100]}}
+            yield {"author": "stub_agent", "content": {"role": "model", "parts": [{"functionCall": call}]}}
+            response = {"name": call["name"], "response": {"result": "stub guideline"}}
+            yield {"author": "stub_agent", "content": {"role": "user", "parts": [{"functionResponse": response}]}}
+        for number in range(self.text_events):
+            if number or self.tool_calls:
+                time.sleep(self.event_delay)
+            yield {"author": "stub_agent", "content": {"role": "model", "parts": [{"text": f"Part {number + 1}."}]}}
+
+    def should_fail(self) -> bool:
+        with self._rng_lock:
+            self.queries += 1
+            return self._rng.random() < self.error_rate
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8089) -> ThreadingHTTPServer:
+        """Creates the HTTP server; call `serve_forever` on it, e.g. in a thread."""
+        engine = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, status: int, body: dict) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/sessions":
+                    self._json(200, {"id": uuid.uuid4().hex, "user_id": body.get("user_id")})
+                elif self.path == "/stream_query":
+                    if engine.should_fail():
+                        self._json(429, {"error": "RESOURCE_EXHAUSTED"})
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    for event in engine.events(body.get("message", "")):
+                        self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                        self.wfile.flush()
+                else:
+                    self._json(404, {"error": "not found"})
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a deployed agent engine or a local stub.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run a load test")
+    run.add_argument("--queries", required=True, help="Query mix: JSONL scenarios or one query per line")
+    run.add_argument("--agent-engine-id", default=None, help="Agent engine to test (default: AGENT_ENGINE_ID)")
+    run.add_argument("--stub-url", default=None, help="Test a stub server instead, e.g. http://localhost:8089")
+    run.add_argument("--users", type=int, default=10, help="Concurrent users (ignored with --stages)")
+    run.add_argument("--ramp-up", type=float, default=10, help="Seconds to start all users (ignored with --stages)")
+    run.add_argument("--duration", type=float, default=60, help="Total seconds (ignored with --stages)")
+    run.add_argument("--stages", default=None, help='Ramp-up schedule as "users:seconds,...", e.g. 10:30,50:60')
+    run.add_argument("--iterations", type=int, default=None, help="Scenarios per user instead of a timed run")
+    run.add_argument("--think-time", type=float, default=0.0, help="Seconds between turns")
+    run.add_argument("--seed", type=int, default=None, help="Seed for the scenario choice")
+    run.add_argument("--output", default=None, help="JSONL file every turn is appended to")
+
+    stub = commands.add_parser("stub", help="Serve a local stub agent engine")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=8089)
+    stub.add_argument("--first-event-delay", type=float, default=0.5, help="Seconds before the first event")
+    stub.add_argument("--event-delay", type=float, default=0.1, help="Seconds between events")
+    stub.add_argument("--text-events", type=int, default=3, help="Text events per response")
+    stub.add_argument("--tool-calls", type=int, default=1, help="Tool calls per turn")
+    stub.add_argument("--error-rate", type=float, default=0.0, help="Share of queries answered with HTTP 429")
+    args = parser.parse_args()
+
+    if args.command == "stub":
+        engine = StubEngine(args.first_event_delay, args.event_delay, args.text_events, args.tool_calls, args.error_rate)
+        server = engine.serve(args.host, args.port)
+        print(f"Stub agent engine on http://{args.host}:{server.server_port}")
+        server.serve_forever()
+        return
+
+    if args.stub_url:
+        target = StubTarget(args.stub_url)
+    else:
+        import vertexai
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        agent_engine_id = args.agent_engine_id or os.getenv("AGENT_ENGINE_ID")
+        if not agent_engine_id:
+            print("Error: pass --agent-engine-id, set AGENT_ENGINE_ID or use --stub-url")
+            return
+        vertexai.init(project=os.getenv("GOOGLE_CLOUD_PROJECT"), location=os.getenv("GOOGLE_CLOUD_LOCATION"))
+        target = AgentEngineTarget(agent_engine_id)
+
+    if args.stages:
+        stages = parse_stages(args.stages)
+    else:
+        stages = [(args.users, args.ramp_up), (args.users, max(args.duration - args.ramp_up, 0.0))]
+    scenarios = read_scenarios(args.queries)
+    start = time.perf_counter()
+    results = run_load_test(
+        target, scenarios, stages, args.iterations, args.think_time, args.seed, args.output
+    )
+    print(format_report(results, stages, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
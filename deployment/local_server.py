@@ -0,0 +1,95 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local Agent Server with Persistent Sessions
+
+Serves the same API as `adk api_server` (and, with --web, the `adk web` dev
+UI), but with sessions kept in the local SQLite session service
+(`rag.shared_libraries.sqlite_sessions`). The ADK CLI only accepts session
+services it can build from a URI, so this script builds the server itself.
+
+Usage (run from the repository root):
+    python deployment/local_server.py --web --port 8000
+    python deployment/local_server.py --db /tmp/sessions.db
+"""
+
+import argparse
+import os
+import sys
+
+import uvicorn
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.auth.credential_service.in_memory_credential_service import InMemoryCredentialService
+from google.adk.cli.adk_web_server import AdkWebServer
+from google.adk.cli.utils.agent_loader import AgentLoader
+from google.adk.evaluation.local_eval_set_results_manager import LocalEvalSetResultsManager
+from google.adk.evaluation.local_eval_sets_manager import LocalEvalSetsManager
+from google.adk.memory import InMemoryMemoryService
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from rag.config import get_settings  # noqa: E402
+from rag.shared_libraries.sqlite_sessions import SqliteSessionService  # noqa: E402
+
+
+def create_app(db_path: str, web: bool = False):
+    """
+    Build the FastAPI app serving the agents in the repository root.
+
+    Args:
+        db_path (str): The SQLite session file
+        web (bool): Also serve the dev UI under /dev-ui
+
+    Returns:
+        FastAPI: The app
+    """
+    settings = get_settings()
+    server = AdkWebServer(
+        agent_loader=AgentLoader(REPO_ROOT),
+        session_service=SqliteSessionService(
+            db_path,
+            pool_size=settings.session_pool_size,
+            blob_min_chars=settings.session_blob_min_chars,
+        ),
+        artifact_service=InMemoryArtifactService(),
+        memory_service=InMemoryMemoryService(),
+        credential_service=InMemoryCredentialService(),
+        eval_sets_manager=LocalEvalSetsManager(agents_dir=REPO_ROOT),
+        eval_set_results_manager=LocalEvalSetResultsManager(agents_dir=REPO_ROOT),
+        agents_dir=REPO_ROOT,
+    )
+    web_assets_dir = None
+    if web:
+        import google.adk.cli
+
+        web_assets_dir = os.path.join(os.path.dirname(google.adk.cli.__file__), "browser")
+    return server.get_fast_api_app(web_assets_dir=web_assets_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the agents with persistent SQLite sessions.")
+    parser.add_argument("--db", default=None, help="SQLite session file (default: SESSION_DB_PATH)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--web", action="store_true", help="Also serve the dev UI under /dev-ui")
+    args = parser.parse_args()
+
+    app = create_app(args.db or get_settings().session_db_path, web=args.web)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
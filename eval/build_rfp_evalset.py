@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Builds the RFP eval set, `data/rfp.evalset.json`.
+
+Cases cover the four intents the intent router dispatches, across a range
+of digital projects:
+- guideline questions, answered by the query agent from the guidelines
+- requests to create an RFP, where the creation agent asks for project details
+- requests to validate an RFP without its text, where the validation agent
+  asks for it
+- requests to validate a draft RFP, checked against the validation guidelines
+
+Edit the lists below and re-run to regenerate the file:
+    python eval/build_rfp_evalset.py
+"""
+
+import json
+import os
+
+OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "data", "rfp.evalset.json")
+
+PROJECTS = [
+    ("e-commerce website", "Online storefront with payments and order management"),
+    ("mobile banking app", "iOS and Android app for retail banking customers"),
+    ("cloud migration", "Move on-premise workloads to a public cloud"),
+    ("ERP implementation", "Finance, procurement and HR on one ERP platform"),
+    ("data warehouse", "Central analytics warehouse with self-service reporting"),
+    ("customer portal", "Self-service portal for account and support requests"),
+    ("CRM rollout", "Customer relationship management for sales and service teams"),
+    ("cybersecurity assessment", "Penetration testing and security posture review"),
+    ("API platform", "Managed API gateway and developer portal"),
+    ("chatbot", "Conversational assistant for customer support"),
+    ("document management system", "Digitised records with search and retention rules"),
+    ("learning management system", "Online training platform for employees"),
+    ("airline booking engine", "Flight search, booking and ancillaries"),
+    ("loyalty programme platform", "Points accrual, redemption and partner integration"),
+    ("IoT fleet monitoring", "Sensors and dashboards for vehicle fleet telemetry"),
+    ("digital identity solution", "Single sign-on and identity verification"),
+    ("data governance programme", "Data catalogue, quality rules and stewardship"),
+    ("network modernisation", "SD-WAN rollout across branch offices"),
+    ("website redesign", "New corporate website on a headless CMS"),
+    ("payment gateway integration", "Card and wallet payments for digital channels"),
+    ("business intelligence dashboards", "Executive KPI dashboards from existing data"),
+    ("robotic process automation", "Automate back-office finance processes"),
+    ("HR self-service portal", "Leave, payroll and benefits self-service"),
+    ("disaster recovery solution", "Secondary site and recovery runbooks"),
+    ("machine learning platform", "Model training, deployment and monitoring"),
+    ("contact centre modernisation", "Cloud contact centre with omnichannel routing"),
+    ("supply chain visibility", "Shipment tracking across suppliers and carriers"),
+    ("digital transformation project", "Modernize legacy systems and implement cloud-based solutions"),
+    ("managed IT services", "Service desk and infrastructure operations"),
+    ("smart office", "Room booking, access control and occupancy sensing"),
+    ("e-procurement system", "Sourcing, tendering and supplier management online"),
+    ("customer data platform", "Unified customer profiles for marketing"),
+    ("inflight entertainment app", "Streaming content to passenger devices"),
+    ("cargo management system", "Bookings, tracking and billing for air cargo"),
+    ("crew scheduling system", "Rostering and crew pairing optimisation"),
+    ("GIS platform", "Mapping and spatial analysis for operations"),
+    ("accessibility remediation", "Bring digital channels to WCAG 2.1 AA"),
+    ("test automation framework", "Automated regression testing for web and mobile"),
+    ("DevOps toolchain", "CI/CD pipelines, artifact storage and monitoring"),
+    ("knowledge base", "Searchable internal knowledge base with workflows"),
+]
+
+GUIDELINE_QUESTIONS = [
+    ("What should be included in an RFP?",
+     "An RFP should include an executive summary, project overview and objectives, scope of work, technical "
+     "requirements, evaluation criteria, submission guidelines, timeline and milestones, budget information, "
+     "terms and conditions, and contact information."),
+    ("What are the requirements for technical specifications in RFPs?",
+     "Technical specifications should describe the functional and non-functional requirements, integration "
+     "points, security and compliance requirements, and the standards the solution must meet."),
+    ("Help me understand the RFP process",
+     "The RFP process covers defining requirements, drafting and approving the RFP, publishing it, answering "
+     "vendor questions, evaluating proposals against the stated criteria, and awarding the contract."),
+    ("Help me understand RFP guidelines",
+     "The guidelines describe the required RFP sections, how to state scope and requirements, how proposals "
+     "are evaluated, and the submission and timeline rules."),
+    ("How should evaluation criteria be defined in an RFP?",
+     "Evaluation criteria should be stated in the RFP with technical and financial weights that add up to 100 "
+     "percent, and describe how each criterion is scored."),
+    ("What is the minimum proposal submission period?",
+     "The RFP should give vendors enough time to prepare proposals and state the proposal deadline, the "
+     "question period and the expected award date."),
+    ("How should the scope of work be written?",
+     "The scope of work should list the deliverables, the activities in and out of scope, the milestones and "
+     "the acceptance criteria."),
+    ("What budget information does an RFP need?",
+     "The RFP should state the budget range or the pricing format vendors must use, and how costs are "
+     "evaluated."),
+    ("Which terms and conditions belong in an RFP?",
+     "The terms and conditions cover contract type, payment terms, intellectual property, confidentiality, "
+     "warranties and penalties."),
+    ("How are vendor questions handled during the RFP?",
+     "Vendors submit questions by the stated deadline, and answers are shared with all bidders."),
+    ("What submission guidelines should an RFP give?",
+     "Submission guidelines state the format, the required documents, the deadline and how proposals are "
+     "delivered."),
+    ("How detailed should the timeline section be?",
+     "The timeline should list the RFP dates and the project milestones with their expected dates."),
+    ("What are the security requirements for digital project RFPs?",
+     "Security requirements cover data protection, access control, compliance with applicable regulations "
+     "and security testing."),
+    ("How should non-functional requirements be specified?",
+     "Non-functional requirements state measurable targets for performance, availability, scalability, "
+     "security and usability."),
+    ("What is the role of the executive summary in an RFP?",
+     "The executive summary introduces the organisation, the project, its objectives and what is requested "
+     "from vendors."),
+    ("How do I weight technical versus financial evaluation?",
+     "The technical and financial weights are chosen for the project and stated in the RFP; together they "
+     "add up to 100 percent."),
+    ("What contact information must an RFP include?",
+     "The RFP names a single point of contact with their email address for all vendor communication."),
+    ("Can an RFP require vendor references?",
+     "Yes, the RFP can require references from similar projects as part of the proposal."),
+    ("What should the project overview describe?",
+     "The project overview describes the background, the business objectives and the expected outcomes."),
+    ("How are proposals evaluated against the guidelines?",
+     "Proposals are scored against the evaluation criteria and weights stated in the RFP."),
+]
+
+VALIDATION_ASKS = [
+    "Please validate this RFP for compliance",
+    "Review my RFP against the guidelines",
+    "Can you check whether my RFP is compliant?",
+    "I need a compliance review of an RFP",
+]
+
+DRAFT_RFP = """REQUEST FOR PROPOSAL
+{title}
+
+1. Project Overview
+We are seeking proposals for a {name}: {description}.
+
+2. Scope of Work
+- Requirements analysis and design
+- Implementation and integration
+- Testing and go-live support
+
+3. Timeline
+{months} months
+
+4. Budget
+${budget:,}"""
+
+
+def user_content(text: str) -> dict:
+    return {"role": "user", "parts": [{"text": text}]}
+
+
+def model_content(text: str) -> dict:
+    return {"role": "model", "parts": [{"text": text}]}
+
+
+def case(eval_id: str, query: str, reference: str, tool_uses: list[dict] | None = None) -> dict:
+    return {
+        "eval_id": eval_id,
+        "conversation": [
+            {
+                "invocation_id": f"{eval_id}-1",
+                "user_content": user_content(query),
+                "final_response": model_content(reference),
+                "intermediate_data": {"tool_uses": tool_uses or [], "intermediate_responses": []},
+            }
+        ],
+        "session_input": {"app_name": "rag", "user_id": "eval_user", "state": {}},
+    }
+
+
+def build_cases() -> list[dict]:
+    cases = []
+    for index, (question, answer) in enumerate(GUIDELINE_QUESTIONS):
+        cases.append(case(
+            f"guidelines-{index:02d}",
+            question,
+            f"Based on the Digital Projects RFPs guidelines: {answer}",
+            [{"name": "retrieve_rag_documentation", "args": {"query": question}}],
+        ))
+    for index, (name, description) in enumerate(PROJECTS):
+        cases.append(case(
+            f"create-{index:02d}",
+            f"I want to create an RFP for a new {name}",
+            f"I'll help you create an RFP for your {name}. Please provide the project name and description, "
+            "scope and objectives, budget range, timeline, technical requirements and stakeholder information.",
+        ))
+        ask = VALIDATION_ASKS[index % len(VALIDATION_ASKS)]
+        cases.append(case(
+            f"validate-ask-{index:02d}",
+            ask,
+            "Please share your RFP document content, and I'll provide a validation report with a compliance "
+            "score, strengths, areas for improvement, missing requirements, recommendations and citations.",
+        ))
+        draft = DRAFT_RFP.format(
+            title=name.title(), name=name, description=description,
+            months=6 + index % 7, budget=250_000 + 50_000 * (index % 10),
+        )
+        query = f"{ask}:\n\n{draft}"
+        cases.append(case(
+            f"validate-draft-{index:02d}",
+            query,
+            "**Compliance Score:** 5/10. The RFP has a project overview, scope of work, timeline and budget, "
+            "but is missing the executive summary, technical requirements, evaluation criteria, submission "
+            "guidelines, terms and conditions and contact information.",
+            [{"name": "retrieve_rfp_validation_guidelines", "args": {"query": query}}],
+        ))
+    return cases
+
+
+def main():
+    eval_set = {
+        "eval_set_id": "rfp",
+        "name": "RFP agents",
+        "description": "Guideline questions, RFP creation and RFP validation requests for the intent router.",
+        "eval_cases": build_cases(),
+    }
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump(eval_set, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"Wrote {len(eval_set['eval_cases'])} cases to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parallel Eval Runner
+
+`AgentEvaluator.evaluate` runs one conversation at a time. This runner
+executes every (case, run) pair of an eval set concurrently, up to a
+concurrency cap, each in its own session. Per run it records the metric
+scores (`tool_trajectory_avg_score`, `response_match_score`, ...) together
+with the latency of each turn and the tokens used, then reports:
+- per metric: the mean over runs, its standard deviation across runs, and
+  whether it meets the threshold in `test_config.json`
+- latency (p50/p95 per turn) and tokens per case
+- per case: mean and standard deviation of each metric, latency and tokens
+
+so quality and performance changes show up in the same report.
+
+Every case run starts cold: the semantic answer cache and the retrieval
+result cache are bypassed for the whole eval, so a repeated run of a
+guideline question still calls the model and the retrieval backend instead of
+being answered from what an earlier run stored. Pass `--warm-caches` to
+measure with the caches on.
+
+Eval sets can be in the EvalSet schema (many cases per file, e.g.
+`data/rfp.evalset.json`) or the older list-of-turns format.
+
+Usage:
+    python eval/parallel_eval.py eval/data/rfp.evalset.json --runs 3 --concurrency 8
+    python eval/parallel_eval.py eval/data/conversation.test.json --output eval_report.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterator
+
+from google.adk.evaluation.agent_evaluator import AgentEvaluator
+from google.adk.evaluation.eval_case import EvalCase, IntermediateData, Invocation
+from google.adk.evaluation.eval_metrics import EvalMetric
+from google.adk.evaluation.evaluator import Evaluator
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+
+APP_NAME = "parallel_eval"
+
+
+def load_eval_set(path: str) -> tuple[list[EvalCase], dict[str, float]]:
+    """
+    Load an eval set and the criteria from the `test_config.json` next to it.
+
+    Args:
+        path (str): Eval set file, in the EvalSet schema or the older format
+
+    Returns:
+        tuple: The eval cases and the metric thresholds
+    """
+    criteria = AgentEvaluator.find_config_for_test_file(path)
+    eval_set = AgentEvaluator._load_eval_set_from_file(path, criteria, {})
+    return eval_set.eval_cases, criteria
+
+
+def default_evaluator(metric: EvalMetric) -> Evaluator:
+    """Returns ADK's evaluator for a metric (needs the `google-adk[eval]` extras)."""
+    from google.adk.evaluation.metric_evaluator_registry import DEFAULT_METRIC_EVALUATOR_REGISTRY
+
+    return DEFAULT_METRIC_EVALUATOR_REGISTRY.get_evaluator(metric)
+
+
+def _walk(agent) -> Iterator:
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+@contextmanager
+def cold_caches(agent) -> Iterator[None]:
+    """
+    Bypass the semantic answer caches and retrieval result caches of an agent
+    tree for the duration of a block, restoring them on exit.
+
+    Args:
+        agent (BaseAgent): Root of the agent tree
+    """
+    from google.adk.agents import LlmAgent
+
+    from rag.shared_libraries.retrieval import RagRetrievalTool
+    from rag.shared_libraries.semantic_cache import SemanticAnswerCache
+
+    saved: list[tuple[object, str, object]] = []
+
+    def swap(target: object, attribute: str, value: object) -> None:
+        # Agents can share a cache or client; keep the first saved value
+        if any(target is t and attribute == a for t, a, _ in saved):
+            return
+        saved.append((target, attribute, getattr(target, attribute)))
+        setattr(target, attribute, value)
+
+    for node in _walk(agent):
+        if not isinstance(node, LlmAgent):
+            continue
+        callbacks = node.before_model_callback
+        for callback in callbacks if isinstance(callbacks, list) else [callbacks]:
+            owner = getattr(callback, "__self__", None)
+            if isinstance(owner, SemanticAnswerCache):
+                swap(owner, "enabled", False)
+        for tool in node.tools:
+            if not isinstance(tool, RagRetrievalTool):
+                continue
+            # Record/replay clients wrap the backend client in `inner`
+            client = tool.client
+            while client is not None:
+                if getattr(client, "cache", None) is not None:
+                    swap(client, "cache", None)
+                client = getattr(client, "inner", None)
+    try:
+        yield
+    finally:
+        for target, attribute, value in reversed(saved):
+            setattr(target, attribute, value)
+
+
+@dataclass
+class CaseRun:
+    """One run of one eval case."""
+
+    eval_id: str
+    run: int
+    scores: dict[str, float | None] = field(default_factory=dict)
+    turn_latencies_ms: list[float] = field(default_factory=list)
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    error: str | None = None
+
+    @property
+    def latency_ms(self) -> float:
+        return sum(self.turn_latencies_ms)
+
+    @property
+    def tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
+
+
+async def run_case(agent, case: EvalCase, run: int, metrics: list[EvalMetric], get_evaluator) -> CaseRun:
+    """
+    Run one eval case in a fresh session, time each turn and score the result.
+
+    Args:
+        agent (BaseAgent): Agent under evaluation
+        case (EvalCase): The case; its conversation holds the expected turns
+        run (int): Run number, for the report
+        metrics (list): Metrics to score
+        get_evaluator (callable): Returns the evaluator for an `EvalMetric`
+
+    Returns:
+        CaseRun: Scores, per-turn latency and token usage, or the error
+    """
+    result = CaseRun(eval_id=case.eval_id, run=run)
+    session_input = case.session_input
+    user_id = session_input.user_id if session_input else "eval_user"
+    session_service = InMemorySessionService()
+    runner = Runner(app_name=APP_NAME, agent=agent, session_service=session_service)
+    try:
+        session = await session_service.create_session(
+            app_name=APP_NAME,
+            user_id=user_id,
+            state=dict(session_input.state) if session_input else {},
+            session_id=str(uuid.uuid4()),
+        )
+        actual = []
+        for expected in case.conversation:
+            final_response, tool_uses, invocation_id = None, [], ""
+            start = time.perf_counter()
+            async for event in runner.run_async(
+                user_id=user_id, session_id=session.id, new_message=expected.user_content
+            ):
+                invocation_id = invocation_id or event.invocation_id
+                if event.usage_metadata:
+                    result.prompt_tokens += event.usage_metadata.prompt_token_count or 0
+                    result.output_tokens += event.usage_metadata.candidates_token_count or 0
+                if event.is_final_response() and event.content and event.content.parts:
+                    final_response = event.content
+                else:
+                    tool_uses.extend(event.get_function_calls())
+            result.turn_latencies_ms.append((time.perf_counter() - start) * 1000)
+            actual.append(
+                Invocation(
+                    invocation_id=invocation_id,
+                    user_content=expected.user_content,
+                    final_response=final_response,
+                    intermediate_data=IntermediateData(tool_uses=tool_uses),
+                )
+            )
+        for metric in metrics:
+            evaluation = get_evaluator(metric).evaluate_invocations(actual, case.conversation)
+            result.scores[metric.metric_name] = evaluation.overall_score
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def run_eval(
+    agent,
+    cases: list[EvalCase],
+    criteria: dict[str, float],
+    runs: int = 3,
+    concurrency: int = 8,
+    get_evaluator: Callable[[EvalMetric], Evaluator] = default_evaluator,
+    warm_caches: bool = False,
+) -> "EvalReport":
+    """
+    Run every case `runs` times, at most `concurrency` at once.
+
+    Unless `warm_caches` is set, the agent's answer and retrieval caches are
+    bypassed (see `cold_caches`), so every run measures real model and
+    retrieval calls.
+
+    Args:
+        agent (BaseAgent): Agent under evaluation
+        cases (list): Eval cases
+        criteria (dict): Metric name -> threshold
+        runs (int): Runs of each case
+        concurrency (int): Cases running at the same time
+        get_evaluator (callable): Returns the evaluator for an `EvalMetric`
+        warm_caches (bool): Keep the caches on, so repeated runs may be
+            answered from them
+
+    Returns:
+        EvalReport: All case runs with their scores, latency and tokens
+    """
+    metrics = [EvalMetric(metric_name=name, threshold=threshold) for name, threshold in criteria.items()]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(case: EvalCase, run: int) -> CaseRun:
+        async with semaphore:
+            return await run_case(agent, case, run, metrics, get_evaluator)
+
+    start = time.perf_counter()
+    if warm_caches:
+        results = await asyncio.gather(*(bounded(case, run) for run in range(runs) for case in cases))
+    else:
+        with cold_caches(agent):
+            results = await asyncio.gather(*(bounded(case, run) for run in range(runs) for case in cases))
+    return EvalReport(
+        criteria=criteria,
+        runs=runs,
+        results=list(results),
+        elapsed_seconds=time.perf_counter() - start,
+    )
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)] if ordered else 0.0
+
+
+def _mean(values: list[float]) -> float | None:
+    return statistics.mean(values) if values else None
+
+
+def _stdev(values: list[float]) -> float | None:
+    return statistics.pstdev(values) if values else None
+
+
+@dataclass
+class EvalReport:
+    """Results of a parallel eval."""
+
+    criteria: dict[str, float]
+    runs: int
+    results: list[CaseRun]
+    elapsed_seconds: float
+
+    def _scored(self, metric: str) -> list[CaseRun]:
+        return [r for r in self.results if r.error is None and r.scores.get(metric) is not None]
+
+    def metric_summary(self, metric: str) -> dict:
+        """
+        Summarise one metric over all runs.
+
+        Returns:
+            dict: mean of the per-run means, their standard deviation across
+                runs, the per-case-run variance, threshold and whether it passed
+        """
+        scored = self._scored(metric)
+        run_means = [
+            statistics.mean(r.scores[metric] for r in scored if r.run == run)
+            for run in range(self.runs)
+            if any(r.run == run for r in scored)
+        ]
+        mean = _mean(run_means)
+        threshold = self.criteria[metric]
+        return {
+            "mean": mean,
+            "stdev_across_runs": _stdev(run_means),
+            "variance": statistics.pvariance([r.scores[metric] for r in scored]) if scored else None,
+            "threshold": threshold,
+            "passed": mean is not None and mean >= threshold,
+        }
+
+    def performance_summary(self) -> dict:
+        """Per-turn latency percentiles and per-case latency and tokens."""
+        completed = [r for r in self.results if r.error is None]
+        turns = [latency for r in completed for latency in r.turn_latencies_ms]
+        return {
+            "case_runs": len(self.results),
+            "errors": len(self.results) - len(completed),
+            "turn_latency_p50_ms": _percentile(turns, 50),
+            "turn_latency_p95_ms": _percentile(turns, 95),
+            "case_latency_mean_ms": _mean([r.latency_ms for r in completed]),
+            "tokens_per_case": _mean([r.tokens for r in completed]),
+            "elapsed_seconds": self.elapsed_seconds,
+        }
+
+    def case_summaries(self) -> dict[str, dict]:
+        """Per case: mean and standard deviation of each metric, latency and tokens."""
+        summaries = {}
+        for eval_id in dict.fromkeys(r.eval_id for r in self.results):
+            runs = [r for r in self.results if r.eval_id == eval_id]
+            completed = [r for r in runs if r.error is None]
+            summary = {"errors": [r.error for r in runs if r.error]}
+            for metric in self.criteria:
+                values = [r.scores[metric] for r in completed if r.scores.get(metric) is not None]
+                summary[metric] = {"mean": _mean(values), "stdev": _stdev(values)}
+            latencies = [r.latency_ms for r in completed]
+            summary["latency_mean_ms"] = _mean(latencies)
+            summary["latency_stdev_ms"] = _stdev(latencies)
+            summary["tokens_mean"] = _mean([r.tokens for r in completed])
+            summaries[eval_id] = summary
+        return summaries
+
+    @property
+    def passed(self) -> bool:
+        return all(self.metric_summary(metric)["passed"] for metric in self.criteria)
+
+    def to_dict(self) -> dict:
+        return {
+            "metrics": {metric: self.metric_summary(metric) for metric in self.criteria},
+            "performance": self.performance_summary(),
+            "cases": self.case_summaries(),
+            "results": [asdict(r) for r in self.results],
+        }
+
+    def format(self) -> str:
+        """Human-readable summary of quality and performance."""
+        performance = self.performance_summary()
+        lines = [
+            f"{performance['case_runs']} case runs ({self.runs} per case) in "
+            f"{performance['elapsed_seconds']:.1f}s, {performance['errors']} errors",
+        ]
+        for metric in self.criteria:
+            summary = self.metric_summary(metric)
+            if summary["mean"] is None:
+                lines.append(f"  {metric}: no scores (threshold {summary['threshold']})")
+                continue
+            lines.append(
+                f"  {'✅' if summary['passed'] else '❌'} {metric}: {summary['mean']:.3f} "
+                f"± {summary['stdev_across_runs']:.3f} across runs "
+                f"(variance {summary['variance']:.3f}, threshold {summary['threshold']})"
+            )
+        lines.append(
+            f"  Turn latency: p50 {performance['turn_latency_p50_ms']:.0f}ms, "
+            f"p95 {performance['turn_latency_p95_ms']:.0f}ms"
+        )
+        if performance["tokens_per_case"] is not None:
+            lines.append(
+                f"  Per case: {performance['case_latency_mean_ms']:.0f}ms, "
+                f"{performance['tokens_per_case']:.0f} tokens"
+            )
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an eval set concurrently, several times.")
+    parser.add_argument("eval_set", help="Eval set file (EvalSet schema or the older format)")
+    parser.add_argument("--agent", default="rag", help="Registry name of the agent to evaluate")
+    parser.add_argument("--runs", type=int, default=3, help="Runs of each case")
+    parser.add_argument("--concurrency", type=int, default=8, help="Cases running at the same time")
+    parser.add_argument("--output", help="Write the full report, with every case run, as JSON")
+    parser.add_argument(
+        "--warm-caches", action="store_true", help="Keep the semantic answer and retrieval caches on"
+    )
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    import dotenv
+
+    from rag.agent_registry import get_agent
+
+    dotenv.load_dotenv()
+    cases, criteria = load_eval_set(args.eval_set)
+    report = asyncio.run(
+        run_eval(
+            get_agent(args.agent),
+            cases,
+            criteria,
+            runs=args.runs,
+            concurrency=args.concurrency,
+            warm_caches=args.warm_caches,
+        )
+    )
+    print(report.format())
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"Report written to {args.output}")
+    if not report.passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,3 +36,17 @@ async def test_eval_full_conversation():
         ),
         num_runs=1,
     )
+
+
+@pytest.mark.asyncio
+async def test_eval_rfp_cases():
+    """Run the RFP eval set concurrently, three times per case, with cold caches."""
+    from parallel_eval import load_eval_set, run_eval
+    from rag.agent_registry import get_agent
+
+    cases, criteria = load_eval_set(
+        str(pathlib.Path(__file__).parent / "data/rfp.evalset.json")
+    )
+    report = await run_eval(get_agent("rag"), cases, criteria, runs=3, concurrency=8)
+    print(report.format())
+    assert report.passed, report.format()
@@ -12,4 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from . import agent
\ No newline at end of file
+import importlib
+
+
+def __getattr__(name):
+    # `rag.agent` builds the root agent and all of its sub-agents, so it is
+    # only imported when accessed (e.g. by `adk run rag` or the evaluator).
+    if name == "agent":
+        return importlib.import_module(".agent", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
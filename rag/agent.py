@@ -12,39 +12,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
-
-from google.adk.agents import Agent
-from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
-from vertexai.preview import rag
-
-from dotenv import load_dotenv
-from .prompts import return_instructions_smart_orchestrator
-
-load_dotenv()
+from .intent_classifier import (
+    DOCUMENT_QUERY,
+    RFP_CREATION,
+    RFP_GUIDELINES,
+    RFP_VALIDATION,
+    IntentClassifier,
+)
+from .intent_router import IntentRouterAgent
+from .rfp_creation_agent import rfp_creation_agent
+from .rfp_query_agent import rfp_query_agent
+from .rfp_validation_agent import rfp_validation_agent
+from .shared_libraries.cassettes import apply_configured_cassettes
+from .shared_libraries.tracing import apply_configured_tracing
+from .smart_orchestrator_agent import smart_orchestrator_agent
 
-ask_vertex_retrieval = VertexAiRagRetrieval(
-    name='retrieve_rag_documentation',
-    description=(
-        'Use this tool to retrieve documentation and reference materials for the question from the RAG corpus,'
-    ),
-    rag_resources=[
-        rag.RagResource(
-            # please fill in your own rag corpus
-            # here is a sample rag corpus for testing purpose
-            # e.g. projects/123/locations/us-central1/ragCorpora/456
-            rag_corpus=os.environ.get("RAG_CORPUS")
-        )
+# Classifies each turn locally and dispatches it straight to a specialist,
+# falling back to the LLM-based Smart Orchestrator when unsure.
+root_agent = IntentRouterAgent(
+    name='rfp_intent_router',
+    description='Routes RFP requests to the creation, validation or query agent',
+    classifier=IntentClassifier.from_prompt(),
+    routes={
+        RFP_CREATION: rfp_creation_agent.name,
+        RFP_VALIDATION: rfp_validation_agent.name,
+        RFP_GUIDELINES: rfp_query_agent.name,
+        DOCUMENT_QUERY: rfp_query_agent.name,
+    },
+    fallback_agent_name=smart_orchestrator_agent.name,
+    sub_agents=[
+        rfp_creation_agent,
+        rfp_validation_agent,
+        rfp_query_agent,
+        smart_orchestrator_agent,
     ],
-    similarity_top_k=10,
-    vector_distance_threshold=0.6,
 )
 
-root_agent = Agent(
-    model='gemini-2.5-flash',
-    name='smart_rfp_orchestrator',
-    instruction=return_instructions_smart_orchestrator(),
-    tools=[
-        ask_vertex_retrieval,
-    ]
-)
+# Records or replays model calls when CASSETTE_MODE is set, e.g. for evals,
+# and traces turns to a local file when TRACE_EXPORT_PATH is set
+apply_configured_tracing(apply_configured_cassettes(root_agent))
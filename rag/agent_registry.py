@@ -16,28 +16,79 @@
 Agent Registry for RFP System
 
 This module provides access to all available agents in the RFP system:
-- Original RAG agent for general document queries
+- Intent Router (root agent) that dispatches turns to the specialist agents
+- RFP Query Agent for guideline and document questions
 - RFP Creation Agent for creating new RFPs
 - RFP Validation Agent for validating existing RFPs
 - RFP Orchestrator Agent for routing and guidance
+
+Agents are imported lazily on first use and share one settings object
+(`rag.config.get_settings`) and one retrieval client.
 """
 
-from .agent import root_agent
-from .rfp_creation_agent import rfp_creation_agent
-from .rfp_validation_agent import rfp_validation_agent
-from .rfp_orchestrator_agent import rfp_orchestrator_agent
+import importlib
+import threading
+from collections.abc import Mapping
+
+
+class LazyAgentRegistry(Mapping):
+    """
+    Read-only mapping of agent names to agents that imports each agent's
+    module on first access. Listing names does not build any agent.
+    """
+
+    def __init__(self, agent_paths: dict[str, tuple[str, str]]):
+        """
+        Args:
+            agent_paths (dict): Maps agent names to (module, attribute) pairs,
+                with modules relative to this package
+        """
+        self._agent_paths = agent_paths
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, agent_name):
+        if agent_name not in self._agents:
+            module_name, attribute = self._agent_paths[agent_name]
+            with self._lock:
+                if agent_name not in self._agents:
+                    module = importlib.import_module(module_name, __package__)
+                    agent = getattr(module, attribute)
+                    # Records or replays model calls when CASSETTE_MODE is set,
+                    # and traces turns when TRACE_EXPORT_PATH is set
+                    from .shared_libraries.cassettes import apply_configured_cassettes
+                    from .shared_libraries.tracing import apply_configured_tracing
+
+                    self._agents[agent_name] = apply_configured_tracing(apply_configured_cassettes(agent))
+        return self._agents[agent_name]
+
+    def __contains__(self, agent_name):
+        return agent_name in self._agent_paths
+
+    def __iter__(self):
+        return iter(self._agent_paths)
+
+    def __len__(self):
+        return len(self._agent_paths)
+
+    def is_loaded(self, agent_name: str) -> bool:
+        """Whether the agent has already been built."""
+        return agent_name in self._agents
+
 
-# Agent Registry - Maps agent names to agent instances
-AGENT_REGISTRY = {
-    "rag": root_agent,  # Original RAG agent for general queries
-    "rfp_creation": rfp_creation_agent,  # RFP Creation Agent
-    "rfp_validation": rfp_validation_agent,  # RFP Validation Agent
-    "rfp_orchestrator": rfp_orchestrator_agent,  # RFP Orchestrator Agent
-}
+# Agent Registry - Maps agent names to the module attribute defining the agent.
+# Agents are built on first use, so a worker only pays for the agents it serves.
+AGENT_REGISTRY = LazyAgentRegistry({
+    "rag": (".agent", "root_agent"),  # Intent router, the default entry point
+    "rfp_creation": (".rfp_creation_agent", "rfp_creation_agent"),  # RFP Creation Agent
+    "rfp_validation": (".rfp_validation_agent", "rfp_validation_agent"),  # RFP Validation Agent
+    "rfp_query": (".rfp_query_agent", "rfp_query_agent"),  # RFP Query Agent
+    "rfp_orchestrator": (".rfp_orchestrator_agent", "rfp_orchestrator_agent"),  # RFP Orchestrator Agent
+})
 
 def get_agent(agent_name: str):
     """
-    Get an agent by name from the registry.
+    Get an agent by name from the registry, building it on first use.
     
     Args:
         agent_name (str): Name of the agent to retrieve
@@ -71,9 +122,10 @@ def get_agent_descriptions():
         dict: Dictionary mapping agent names to their descriptions
     """
     descriptions = {
-        "rag": "General RAG agent for querying the Digital Projects RFPs document",
+        "rag": "Intent router that dispatches requests to the specialist RFP agents",
         "rfp_creation": "Specialized agent for creating RFPs from project details",
         "rfp_validation": "Specialized agent for validating RFPs against guidelines",
+        "rfp_query": "Agent for guideline and document questions about RFPs",
         "rfp_orchestrator": "Orchestrator agent for routing RFP-related requests"
     }
     return descriptions
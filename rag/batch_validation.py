@@ -0,0 +1,361 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batch RFP Validation
+
+Re-validates a directory of RFPs (.md, .txt and .pdf) with the RFP
+Validation Agent, for example after the guidelines change:
+- Documents are validated concurrently with asyncio, up to a configurable
+  number at a time, either with the local agent or through a deployed
+  Agent Engine.
+- Rate-limit errors (HTTP 429 / RESOURCE_EXHAUSTED) are retried with
+  exponential backoff; other errors fail only that document.
+- Each result is appended to a JSONL file as soon as it completes, so a
+  run can be followed with `tail -f` and resumed with --resume.
+- Throughput and per-document latency percentiles are reported at the end.
+
+Run from the repository root:
+    python -m rag.batch_validation rfps/ --output validation.jsonl --concurrency 8
+    python -m rag.batch_validation rfps/ --agent-engine-id 1234567890 --resume
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from .shared_libraries.bulk_ingest import is_quota_error
+
+DOCUMENT_EXTENSIONS = (".md", ".txt", ".pdf")
+VALIDATION_REQUEST = "Please validate this RFP against the guidelines:\n\n{text}"
+
+_SCORE = re.compile(r"Overall Compliance Score:\**\s*(\d+(?:\.\d+)?)\s*/\s*10", re.IGNORECASE)
+
+Validate = Callable[[str], Awaitable[str]]
+
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating one document."""
+
+    document: str
+    ok: bool
+    latency_seconds: float
+    attempts: int
+    score: float | None = None
+    report: str | None = None
+    error: str | None = None
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__, ensure_ascii=False)
+
+
+@dataclass
+class BatchSummary:
+    """Outcome of a batch validation run."""
+
+    total: int = 0
+    skipped: int = 0
+    rate_limited: int = 0
+    elapsed_seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    def percentile(self, q: float) -> float:
+        """Latency percentile in seconds, e.g. q=95."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))]
+
+    def format(self) -> str:
+        """Renders the summary for the console."""
+        elapsed = self.elapsed_seconds or 1e-9
+        lines = [
+            f"Documents: {self.total} total, {self.succeeded} validated, "
+            f"{self.skipped} already in output, {self.failed} failed",
+            f"Throughput: {self.succeeded / elapsed * 60:.1f} documents/min over {self.elapsed_seconds:.1f}s",
+            f"Rate-limit retries: {self.rate_limited}",
+        ]
+        if self.latencies:
+            lines.append(
+                f"Latency: mean {statistics.mean(self.latencies):.1f}s, p50 {self.percentile(50):.1f}s, "
+                f"p95 {self.percentile(95):.1f}s, max {max(self.latencies):.1f}s"
+            )
+        lines.extend(f"  FAILED {document}: {error}" for document, error in self.errors.items())
+        return "\n".join(lines)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """
+    True for quota and rate-limit errors from the model or Agent Engine APIs.
+
+    A 429 counts only as a status code, not as a number anywhere in the
+    message (e.g. "processed 429 pages").
+    """
+    return is_quota_error(error)
+
+
+def parse_score(report: str) -> float | None:
+    """Returns the overall compliance score of a validation report, if it has one."""
+    match = _SCORE.search(report)
+    return float(match.group(1)) if match else None
+
+
+def collect_documents(directory: str) -> list[str]:
+    """Lists the RFP documents below a directory, sorted by path."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def read_document(path: str) -> str:
+    """Reads the text of an RFP document."""
+    if path.lower().endswith(".pdf"):
+        from .shared_libraries.pdf_chunker import extract_pages
+
+        return "\n".join(extract_pages(path))
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def completed_documents(output_path: str) -> set[str]:
+    """Returns the documents an earlier run already validated successfully."""
+    if not os.path.exists(output_path):
+        return set()
+    done = set()
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("ok"):
+                done.add(record["document"])
+    return done
+
+
+def local_validator(app_name: str = "rfp_batch_validation") -> Validate:
+    """
+    Validate with the local RFP Validation Agent, one fresh session per document.
+
+    Args:
+        app_name (str): App name for the in-memory sessions
+
+    Returns:
+        callable: Async function from a message to the agent's final response
+    """
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    from .agent_registry import get_agent
+
+    session_service = InMemorySessionService()
+    runner = Runner(app_name=app_name, agent=get_agent("rfp_validation"), session_service=session_service)
+
+    async def validate(message: str) -> str:
+        session = await session_service.create_session(app_name=app_name, user_id="batch")
+        try:
+            texts = []
+            async for event in runner.run_async(
+                user_id="batch",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    texts.extend(part.text for part in event.content.parts if part.text)
+            return "\n".join(texts)
+        finally:
+            await session_service.delete_session(app_name=app_name, user_id="batch", session_id=session.id)
+
+    return validate
+
+
+def agent_engine_validator(agent_engine_id: str) -> Validate:
+    """
+    Validate through a deployed Agent Engine, one fresh session per document.
+
+    The deployed root agent routes the validation request to the RFP
+    Validation Agent.
+
+    Args:
+        agent_engine_id (str): Agent Engine resource name or ID
+
+    Returns:
+        callable: Async function from a message to the agent's final response
+    """
+    from vertexai import agent_engines
+
+    agent_engine = agent_engines.get(agent_engine_id)
+
+    def stream(message: str) -> str:
+        user_id = f"batch-{uuid.uuid4().hex[:8]}"
+        texts = []
+        for event in agent_engine.stream_query(user_id=user_id, message=message):
+            parts = event.get("content", {}).get("parts", [])
+            event_texts = [part["text"] for part in parts if "text" in part]
+            if event_texts:
+                texts = event_texts
+        return "\n".join(texts)
+
+    async def validate(message: str) -> str:
+        return await asyncio.to_thread(stream, message)
+
+    return validate
+
+
+async def validate_documents(
+    paths: list[str],
+    validate: Validate,
+    output_path: str,
+    concurrency: int = 4,
+    max_attempts: int = 6,
+    backoff_seconds: float = 2.0,
+    resume: bool = False,
+    root: str | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> BatchSummary:
+    """
+    Validate documents concurrently, appending each result to a JSONL file.
+
+    Args:
+        paths (list): Documents to validate
+        validate (callable): Async function from a message to the validation report
+        output_path (str): JSONL file results are appended to
+        concurrency (int): Documents validated at the same time
+        max_attempts (int): Attempts per document when rate limited
+        backoff_seconds (float): First retry delay, doubled on each retry
+        resume (bool): Skip documents already validated in `output_path`
+        root (str, optional): Directory documents are named relative to
+        sleep (callable): Async sleep, replaceable in tests
+
+    Returns:
+        BatchSummary: Counts, throughput and latencies of the run
+    """
+    summary = BatchSummary(total=len(paths))
+    names = {path: os.path.relpath(path, root) if root else path for path in paths}
+    done = completed_documents(output_path) if resume else set()
+    pending = [path for path in paths if names[path] not in done]
+    summary.skipped = len(paths) - len(pending)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(path: str) -> ValidationResult:
+        async with semaphore:
+            start = time.perf_counter()
+            attempts = 0
+            try:
+                message = VALIDATION_REQUEST.format(text=await asyncio.to_thread(read_document, path))
+                while True:
+                    attempts += 1
+                    try:
+                        report = await validate(message)
+                        break
+                    except Exception as e:
+                        if not is_rate_limited(e) or attempts >= max_attempts:
+                            raise
+                        summary.rate_limited += 1
+                        delay = backoff_seconds * 2 ** (attempts - 1)
+                        await sleep(delay * random.uniform(0.5, 1.5))
+            except Exception as e:
+                return ValidationResult(
+                    names[path], ok=False, latency_seconds=time.perf_counter() - start,
+                    attempts=attempts, error=f"{type(e).__name__}: {e}",
+                )
+            return ValidationResult(
+                names[path], ok=True, latency_seconds=time.perf_counter() - start,
+                attempts=attempts, score=parse_score(report), report=report,
+            )
+
+    start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as output:
+        for task in asyncio.as_completed([run_one(path) for path in pending]):
+            result = await task
+            output.write(result.to_json() + "\n")
+            output.flush()
+            if result.ok:
+                summary.latencies.append(result.latency_seconds)
+                print(f"✅ {result.document}: score {result.score} in {result.latency_seconds:.1f}s")
+            else:
+                summary.errors[result.document] = result.error
+                print(f"❌ {result.document}: {result.error}")
+    summary.elapsed_seconds = time.perf_counter() - start
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a directory of RFPs with the RFP Validation Agent.")
+    parser.add_argument("directory", help="Directory with .md, .txt and .pdf RFPs")
+    parser.add_argument("--output", default="validation_results.jsonl", help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=4, help="Documents validated at the same time")
+    parser.add_argument("--max-attempts", type=int, default=6, help="Attempts per document when rate limited")
+    parser.add_argument(
+        "--agent-engine-id",
+        default=None,
+        help="Validate through this deployed Agent Engine instead of the local agent",
+    )
+    parser.add_argument("--resume", action="store_true", help="Skip documents already validated in --output")
+    args = parser.parse_args()
+
+    paths = collect_documents(args.directory)
+    if not paths:
+        print(f"Error: no {', '.join(DOCUMENT_EXTENSIONS)} files in {args.directory}")
+        return
+
+    if args.agent_engine_id:
+        import vertexai
+
+        from .config import get_settings
+
+        settings = get_settings()
+        vertexai.init(project=settings.google_cloud_project, location=settings.google_cloud_location)
+        validate = agent_engine_validator(args.agent_engine_id)
+    else:
+        validate = local_validator()
+
+    summary = asyncio.run(
+        validate_documents(
+            paths,
+            validate,
+            args.output,
+            concurrency=args.concurrency,
+            max_attempts=args.max_attempts,
+            resume=args.resume,
+            root=args.directory,
+        )
+    )
+    print(summary.format())
+
+
+if __name__ == "__main__":
+    main()
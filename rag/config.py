@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared Configuration for the RFP System
+
+All agents read their configuration from a single settings object, loaded
+once per process from the environment and the `.env` file. Field names map
+to upper-case environment variables, e.g. `rag_corpus` is read from
+RAG_CORPUS.
+"""
+
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class RagSettings(BaseSettings):
+    """Settings shared by every agent in the process."""
+
+    model_config = SettingsConfigDict(extra="ignore")
+
+    google_cloud_project: str | None = None
+    google_cloud_location: str | None = None
+
+    # Existing corpus in Vertex AI RAG Engine,
+    # e.g. projects/123/locations/us-central1/ragCorpora/456
+    rag_corpus: str | None = None
+
+    # Model used by all agents
+    agent_model: str = "gemini-2.5-flash"
+
+    # Retrieval backend: "vertex" (Vertex AI RAG Engine), "local" or "hybrid"
+    retrieval_backend: str = "vertex"
+    # Index used by the local and hybrid backends, built with
+    # rag.shared_libraries.local_index
+    local_index_path: str = os.path.join(REPO_ROOT, "local_index.npz")
+    # Hybrid backend: BM25 shortlist size and rank fusion constant
+    hybrid_shortlist_size: int = 50
+    hybrid_rrf_k: int = 60
+
+    # Retrieval result cache
+    retrieval_cache_max_entries: int = 1024
+    retrieval_cache_ttl_seconds: float = 3600
+    retrieval_cache_path: str | None = None
+
+    # Retrieval depth: "adaptive" (similarity_top_k is the candidate count and
+    # the depth is chosen per call) or "fixed"
+    retrieval_depth: str = "adaptive"
+    # Estimated tokens of chunks returned per retrieval call
+    retrieval_token_budget: int = 3000
+
+    # Deduplicate, merge and budget retrieved chunks; optionally compress them
+    # to their query-relevant sentences
+    context_packing_enabled: bool = True
+    context_compression: bool = False
+
+    # Per-session memo of retrieved chunks
+    retrieval_memo_enabled: bool = True
+
+    # Semantic answer cache
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_max_entries: int = 512
+
+    # Gemini cached content for the static instruction and tools of each agent
+    prompt_cache_enabled: bool = True
+    prompt_cache_ttl_seconds: int = 3600
+
+    # Map-reduce validation of long RFPs
+    long_rfp_min_words: int = 6000
+    long_rfp_section_words: int = 2500
+    long_rfp_concurrency: int = 8
+
+    # Parallel section-by-section drafting of full RFPs
+    parallel_rfp_creation: bool = True
+    rfp_section_concurrency: int = 6
+
+    # Record/replay cassettes for model and retrieval calls: "off", "record"
+    # or "replay"
+    cassette_mode: str = "off"
+    cassette_dir: str = os.path.join(REPO_ROOT, "cassettes")
+
+    # Local trace export of agent, model and tool spans: off unless a path is
+    # set; "jsonl" or "otlp" (OTLP/JSON lines)
+    trace_export_path: str | None = None
+    trace_export_format: str = "jsonl"
+
+    # Local persistent sessions (SQLite): strings of at least
+    # session_blob_min_chars characters are stored once as shared blobs
+    session_db_path: str = os.path.join(REPO_ROOT, "sessions.db")
+    session_pool_size: int = 4
+    session_blob_min_chars: int = 2048
+
+    # Embeddings: "vertex" or "hashing"
+    embedding_backend: str = "vertex"
+    embedding_model: str = "text-embedding-004"
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> RagSettings:
+    """
+    Get the process-wide settings, loading `.env` on first use.
+
+    The `.env` file is also exported to the environment, because the Google
+    client libraries read GOOGLE_* variables from it directly.
+
+    Returns:
+        RagSettings: The shared settings
+    """
+    load_dotenv()
+    return RagSettings()
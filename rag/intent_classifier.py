@@ -0,0 +1,230 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local Intent Classifier for the RFP System
+
+This module provides a small in-process classifier that detects the intent of
+a user turn without calling a model. It is trained on the "Intent Detection
+Patterns" written in the Smart Orchestrator prompt, so the prompt stays the
+single source of truth for which phrasings map to which intent.
+
+The model is a TF-IDF nearest-centroid classifier (a linear model over
+unigram and bigram features) implemented in pure Python, so it adds no
+runtime dependency and classifies a turn in microseconds.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from .prompts import return_instructions_smart_orchestrator
+
+# Intent labels, one per pattern group in the Smart Orchestrator prompt
+RFP_CREATION = "rfp_creation"
+RFP_VALIDATION = "rfp_validation"
+RFP_GUIDELINES = "rfp_guidelines"
+DOCUMENT_QUERY = "document_query"
+
+# Maps the pattern group headings in the prompt to intent labels
+_PATTERN_HEADINGS = {
+    "RFP Creation Intent": RFP_CREATION,
+    "RFP Validation Intent": RFP_VALIDATION,
+    "RFP Guidelines/Information Intent": RFP_GUIDELINES,
+    "Document Query Intent": DOCUMENT_QUERY,
+}
+
+_PATTERNS_SECTION = re.compile(
+    r"\*\*Intent Detection Patterns:\*\*(.*?)\*\*Response Strategy:\*\*", re.S
+)
+_HEADING = re.compile(r"\*\*(.+?):\*\*")
+_QUOTED = re.compile(r'"([^"]+)"')
+_PLACEHOLDER = re.compile(r"\[[^\]]*\]|\.\.\.")
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("ing", "ion", "ed", "es", "e", "s")
+
+# Only the opening of a turn is classified; a pasted RFP after the request
+# would otherwise dominate the features.
+MAX_CLASSIFIED_CHARS = 300
+
+
+def _stem(token: str) -> str:
+    """Strips one common English suffix so 'validate' and 'validation' match."""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    return token
+
+
+def _features(text: str) -> list[str]:
+    """Returns the stemmed unigram and bigram features of a text."""
+    tokens = [_stem(token) for token in _TOKEN.findall(text.lower())]
+    bigrams = [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    return tokens + bigrams
+
+
+def extract_intent_patterns(prompt: str) -> dict[str, list[str]]:
+    """
+    Extract the example phrasings for each intent from an orchestrator prompt.
+
+    Args:
+        prompt (str): Prompt text containing an "Intent Detection Patterns" section
+
+    Returns:
+        dict: Mapping of intent label to the example phrasings listed for it
+
+    Raises:
+        ValueError: If the prompt has no "Intent Detection Patterns" section
+    """
+    section = _PATTERNS_SECTION.search(prompt)
+    if not section:
+        raise ValueError("Prompt does not contain an 'Intent Detection Patterns' section")
+
+    patterns: dict[str, list[str]] = {}
+    label = None
+    for line in section.group(1).splitlines():
+        heading = _HEADING.search(line)
+        if heading:
+            label = _PATTERN_HEADINGS.get(heading.group(1))
+            continue
+        quoted = _QUOTED.search(line)
+        if label and quoted:
+            example = _PLACEHOLDER.sub(" ", quoted.group(1)).strip()
+            patterns.setdefault(label, []).append(example)
+    return patterns
+
+
+@dataclass
+class IntentPrediction:
+    """The result of classifying one user turn."""
+
+    intent: str
+    confidence: float
+    scores: dict[str, float] = field(default_factory=dict)
+
+
+class IntentClassifier:
+    """TF-IDF nearest-centroid intent classifier."""
+
+    def __init__(
+        self,
+        examples: dict[str, list[str]],
+        temperature: float = 10.0,
+        min_similarity: float = 0.3,
+    ):
+        """
+        Train the classifier on example phrasings.
+
+        Args:
+            examples (dict): Mapping of intent label to example phrasings
+            temperature (float): Softmax temperature applied to the cosine
+                similarities when turning them into probabilities
+            min_similarity (float): Similarity of the implicit "no intent"
+                class; inputs that match no intent better than this get a
+                low confidence
+        """
+        if not examples:
+            raise ValueError("At least one intent with examples is required")
+
+        self.temperature = temperature
+        self.min_similarity = min_similarity
+        documents = [
+            (label, Counter(_features(example)))
+            for label, phrasings in examples.items()
+            for example in phrasings
+        ]
+
+        document_frequency = Counter()
+        for _, counts in documents:
+            document_frequency.update(counts.keys())
+        total = len(documents)
+        # Smoothed IDF, the same formula scikit-learn's TfidfVectorizer uses
+        self.idf = {
+            term: math.log((1 + total) / (1 + df)) + 1
+            for term, df in document_frequency.items()
+        }
+
+        centroids: dict[str, Counter] = {label: Counter() for label in examples}
+        for label, counts in documents:
+            centroids[label].update(self._vectorize(counts))
+        self.centroids = {
+            label: self._normalize(centroid) for label, centroid in centroids.items()
+        }
+
+    @classmethod
+    def from_prompt(cls, prompt: str | None = None, **kwargs) -> "IntentClassifier":
+        """
+        Train a classifier on the intent patterns of an orchestrator prompt.
+
+        Args:
+            prompt (str, optional): Prompt text; defaults to the Smart
+                Orchestrator instructions
+
+        Returns:
+            IntentClassifier: The trained classifier
+        """
+        if prompt is None:
+            prompt = return_instructions_smart_orchestrator()
+        return cls(extract_intent_patterns(prompt), **kwargs)
+
+    @property
+    def intents(self) -> list[str]:
+        """The intent labels this classifier can predict."""
+        return list(self.centroids)
+
+    def _vectorize(self, counts: Counter) -> dict[str, float]:
+        vector = {
+            term: count * self.idf[term]
+            for term, count in counts.items()
+            if term in self.idf
+        }
+        return self._normalize(vector)
+
+    @staticmethod
+    def _normalize(vector: dict[str, float]) -> dict[str, float]:
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        if not norm:
+            return {}
+        return {term: value / norm for term, value in vector.items()}
+
+    def classify(self, text: str) -> IntentPrediction:
+        """
+        Classify the intent of a user turn.
+
+        Args:
+            text (str): The user's message
+
+        Returns:
+            IntentPrediction: The most likely intent, its probability and the
+                probabilities of every intent (the remainder is the "no
+                intent" probability)
+        """
+        vector = self._vectorize(Counter(_features(text[:MAX_CLASSIFIED_CHARS])))
+        similarities = {
+            label: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+            for label, centroid in self.centroids.items()
+        }
+
+        # Softmax over the cosine similarities plus an implicit "no intent"
+        # class, so small talk and unseen phrasings come out low confidence.
+        exponents = {
+            label: math.exp(self.temperature * similarity)
+            for label, similarity in similarities.items()
+        }
+        total = sum(exponents.values()) + math.exp(self.temperature * self.min_similarity)
+        scores = {label: value / total for label, value in exponents.items()}
+
+        intent = max(scores, key=scores.get)
+        return IntentPrediction(intent=intent, confidence=scores[intent], scores=scores)
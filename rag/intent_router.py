@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Intent Router Agent for the RFP System
+
+The router classifies each user turn with the local intent classifier and
+hands it directly to the matching specialist agent, so confident turns skip
+the Smart Orchestrator's routing call entirely. Turns the classifier is not
+confident about continue with the specialist that answered the previous turn
+(follow-ups such as project details in a creation flow), or fall back to the
+LLM-based Smart Orchestrator when the conversation has no specialist yet.
+"""
+
+import logging
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.genai import types
+from typing_extensions import override
+
+from .intent_classifier import IntentClassifier
+
+logger = logging.getLogger(__name__)
+
+
+def content_text(content: types.Content | None) -> str:
+    """Returns the concatenated text parts of a message."""
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+class IntentRouterAgent(BaseAgent):
+    """Routes each turn to a specialist sub-agent without a model call."""
+
+    classifier: IntentClassifier
+    """The local intent classifier."""
+
+    routes: dict[str, str]
+    """Maps intent labels to the name of the sub-agent that handles them."""
+
+    fallback_agent_name: str
+    """Name of the LLM-based sub-agent used when the classifier is unsure."""
+
+    confidence_threshold: float = 0.6
+    """Minimum routed probability for dispatching directly to a specialist."""
+
+    def select_agent(self, ctx: InvocationContext) -> BaseAgent:
+        """
+        Choose the sub-agent that should handle the current turn.
+
+        Args:
+            ctx (InvocationContext): The invocation context of the turn
+
+        Returns:
+            BaseAgent: The sub-agent to run
+        """
+        prediction = self.classifier.classify(content_text(ctx.user_content))
+
+        # Several intents can share a specialist (guidelines and document
+        # queries both go to the query agent), so confidence is summed per
+        # target agent rather than taken per intent.
+        agent_scores: dict[str, float] = {}
+        for intent, score in prediction.scores.items():
+            agent_name = self.routes.get(intent, self.fallback_agent_name)
+            agent_scores[agent_name] = agent_scores.get(agent_name, 0.0) + score
+        agent_name = max(agent_scores, key=agent_scores.get)
+        confidence = agent_scores[agent_name]
+
+        if confidence < self.confidence_threshold:
+            agent_name = self._previous_agent_name(ctx) or self.fallback_agent_name
+
+        logger.debug(
+            "Routing turn to %s (intent=%s, confidence=%.2f)",
+            agent_name,
+            prediction.intent,
+            confidence,
+        )
+        return self.find_sub_agent(agent_name)
+
+    def _previous_agent_name(self, ctx: InvocationContext) -> str | None:
+        """Returns the sub-agent that authored the most recent reply, if any."""
+        sub_agent_names = {agent.name for agent in self.sub_agents}
+        for event in reversed(ctx.session.events):
+            if event.author in sub_agent_names:
+                return event.author
+        return None
+
+    @override
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        agent = self.select_agent(ctx)
+        async for event in agent.run_async(ctx):
+            yield event
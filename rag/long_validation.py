@@ -0,0 +1,399 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Map-Reduce Validation for Long RFPs
+
+An 80-page RFP does not fit in one useful validation turn. For long RFPs
+the validation agent hands over to `LongRfpValidator`:
+- Map: the RFP is split at its section headings into parts of bounded
+  size. Every part is reviewed by its own model call, in parallel, with
+  guideline excerpts retrieved for that section only.
+- Reduce: the per-section reviews and the deterministic pre-validation
+  findings are merged, without another model call, into the usual
+  validation report (score, strengths, missing requirements,
+  recommendations).
+
+Wall-clock time is that of the slowest section rather than the whole
+document. Section reviews that hit rate limits are retried; a section
+that still fails is listed in the report instead of failing the review.
+
+Configuration (see `rag.config.RagSettings`):
+- LONG_RFP_MIN_WORDS: RFPs at least this long use map-reduce (default 6000)
+- LONG_RFP_SECTION_WORDS: Maximum words per reviewed part (default 2500)
+- LONG_RFP_CONCURRENCY: Parts reviewed at the same time (default 8)
+
+Run from the repository root to review a file directly:
+    python -m rag.long_validation big_rfp.pdf
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from .batch_validation import is_rate_limited, read_document
+from .config import get_settings
+from .prompts import return_instructions_rfp_section_validation
+from .rfp_prevalidation import Findings, RfpRuleEngine, split_sections
+from .shared_libraries.cassettes import create_genai_client
+from .shared_libraries.retrieval import MODEL_CHUNK_FIELDS, get_retrieval_client
+
+logger = logging.getLogger(__name__)
+
+# Parts smaller than this are merged into the following section
+_MIN_PART_WORDS = 150
+# Points deducted from the score for every required section that is missing
+_MISSING_SECTION_PENALTY = 0.5
+
+
+class SectionReview(BaseModel):
+    """Structured review of one RFP part, as returned by the model."""
+
+    score: float = Field(ge=0, le=10)
+    strengths: list[str] = []
+    issues: list[str] = []
+    missing: list[str] = []
+    recommendations: list[str] = []
+    citations: list[str] = []
+
+
+@dataclass
+class RfpPart:
+    """A contiguous piece of an RFP reviewed by one model call."""
+
+    heading: str
+    text: str
+
+    @property
+    def words(self) -> int:
+        return len(self.text.split())
+
+
+@dataclass
+class PartResult:
+    heading: str
+    words: int
+    review: SectionReview | None = None
+    error: str | None = None
+    latency_seconds: float = 0.0
+
+
+@dataclass
+class LongValidationResult:
+    """Merged outcome of a map-reduce validation."""
+
+    score: float
+    parts: list[PartResult]
+    findings: Findings
+    elapsed_seconds: float = 0.0
+    report: str = field(default="", repr=False)
+
+
+def split_parts(text: str, max_words: int = 2500, min_words: int = _MIN_PART_WORDS) -> list[RfpPart]:
+    """
+    Split an RFP into parts at section headings.
+
+    Sections shorter than `min_words` are merged into the next section, and
+    sections longer than `max_words` are split into numbered pieces.
+
+    Args:
+        text (str): The RFP
+        max_words (int): Maximum words per part
+        min_words (int): Minimum words for a part of its own
+
+    Returns:
+        list: Parts in document order
+    """
+    parts: list[RfpPart] = []
+    pending_headings: list[str] = []
+    pending_text: list[str] = []
+    for heading, body in split_sections(text):
+        heading = heading or "Preamble"
+        pending_headings.append(heading)
+        pending_text.append(f"{heading}\n{body}" if body else heading)
+        words = sum(len(chunk.split()) for chunk in pending_text)
+        if words < min_words:
+            continue
+        label = " / ".join(pending_headings)
+        body_words = "\n\n".join(pending_text).split()
+        if len(body_words) <= max_words:
+            parts.append(RfpPart(label, "\n\n".join(pending_text)))
+        else:
+            pieces = range(0, len(body_words), max_words)
+            for number, start in enumerate(pieces, start=1):
+                parts.append(RfpPart(f"{label} ({number}/{len(pieces)})", " ".join(body_words[start:start + max_words])))
+        pending_headings, pending_text = [], []
+    if pending_text:
+        if parts and parts[-1].words + sum(len(chunk.split()) for chunk in pending_text) <= max_words:
+            last = parts[-1]
+            parts[-1] = RfpPart(" / ".join([last.heading, *pending_headings]), "\n\n".join([last.text, *pending_text]))
+        else:
+            parts.append(RfpPart(" / ".join(pending_headings), "\n\n".join(pending_text)))
+    return parts
+
+
+def _dedupe(items: list[str]) -> list[str]:
+    seen = set()
+    unique = []
+    for item in items:
+        key = item.strip().lower().rstrip(".")
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(item.strip())
+    return unique
+
+
+def merge_reviews(parts: list[PartResult], findings: Findings) -> tuple[float, str]:
+    """
+    Merge section reviews and pre-validation findings into one report.
+
+    The score is the mean of the section scores weighted by section length,
+    less a fixed penalty per missing required section.
+
+    Args:
+        parts (list): Section results in document order
+        findings (Findings): Pre-validation findings for the whole RFP
+
+    Returns:
+        tuple: Overall score and the report in the validation agent's format
+    """
+    reviewed = [part for part in parts if part.review]
+    if reviewed:
+        weighted = sum(part.review.score * part.words for part in reviewed)
+        score = weighted / max(sum(part.words for part in reviewed), 1)
+    else:
+        score = 0.0
+    score = round(max(0.0, score - _MISSING_SECTION_PENALTY * len(findings.missing_sections)), 1)
+
+    def collect(attribute: str) -> list[str]:
+        return _dedupe([
+            f"{part.heading}: {item}" for part in reviewed for item in getattr(part.review, attribute)
+        ])
+
+    missing = [f"Required section missing: {name}" for name in findings.missing_sections] + collect("missing")
+    issues = list(findings.issues) + collect("issues")
+    issues += [f"{part.heading}: not reviewed ({part.error})" for part in parts if part.error]
+    citations = _dedupe([citation for part in reviewed for citation in part.review.citations])
+
+    def bullets(items: list[str]) -> str:
+        return "\n".join(f"- {item}" for item in items) or "- None"
+
+    report = (
+        "**RFP Validation Report**\n\n"
+        f"**Overall Compliance Score: {score:g}/10**\n\n"
+        f"**Strengths:**\n{bullets(collect('strengths'))}\n\n"
+        f"**Areas for Improvement:**\n{bullets(issues)}\n\n"
+        f"**Missing Requirements:**\n{bullets(missing)}\n\n"
+        f"**Recommendations:**\n{bullets(collect('recommendations'))}\n\n"
+        f"**Citations:**\n{bullets(citations)}\n\n"
+        "**Section Scores:**\n"
+        + bullets([
+            f"{part.heading}: {part.review.score:g}/10" if part.review else f"{part.heading}: not reviewed"
+            for part in parts
+        ])
+    )
+    return score, report
+
+
+class LongRfpValidator:
+    """Validates long RFPs section by section, in parallel."""
+
+    def __init__(
+        self,
+        model: str | None = None,
+        min_words: int | None = None,
+        section_words: int | None = None,
+        concurrency: int | None = None,
+        similarity_top_k: int = 8,
+        vector_distance_threshold: float | None = 0.5,
+        max_attempts: int = 4,
+        backoff_seconds: float = 2.0,
+        client=None,
+        retrieval_client=None,
+    ):
+        """
+        Create a long RFP validator. Unset options come from the settings.
+
+        Args:
+            model (str, optional): Model reviewing the sections
+            min_words (int, optional): RFPs at least this long use map-reduce
+            section_words (int, optional): Maximum words per reviewed part
+            concurrency (int, optional): Parts reviewed at the same time
+            similarity_top_k (int): Guideline chunks retrieved per part
+            vector_distance_threshold (float, optional): Retrieval distance cut-off
+            max_attempts (int): Attempts per part when rate limited
+            backoff_seconds (float): First retry delay, doubled on each retry
+            client (google.genai.Client, optional): Model client; created on
+                first use if None (see `create_genai_client`)
+            retrieval_client (RetrievalClient, optional): Guideline retrieval;
+                the process-wide client if None
+        """
+        settings = get_settings()
+        self.model = model or settings.agent_model
+        self.min_words = min_words or settings.long_rfp_min_words
+        self.section_words = section_words or settings.long_rfp_section_words
+        self.concurrency = concurrency or settings.long_rfp_concurrency
+        self.similarity_top_k = similarity_top_k
+        self.vector_distance_threshold = vector_distance_threshold
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self._client = client
+        self._retrieval_client = retrieval_client
+        self.engine = RfpRuleEngine()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = create_genai_client()
+        return self._client
+
+    @property
+    def retrieval_client(self):
+        return self._retrieval_client or get_retrieval_client()
+
+    def is_long(self, text: str) -> bool:
+        """True if an RFP is long enough for map-reduce validation."""
+        return len(text.split()) >= self.min_words
+
+    async def _guidelines(self, part: RfpPart) -> list[dict]:
+        heading = part.heading.split(" / ")[0].split(" (")[0]
+        query = f"RFP guidelines and requirements for the {heading} section"
+        chunks = await self.retrieval_client.retrieve_async(
+            query, self.similarity_top_k, self.vector_distance_threshold
+        )
+        return [{key: chunk[key] for key in MODEL_CHUNK_FIELDS if chunk.get(key) is not None} for chunk in chunks]
+
+    async def _review(self, part: RfpPart) -> SectionReview:
+        guidelines = await self._guidelines(part)
+        excerpts = "\n\n".join(
+            f"[{chunk.get('title', 'guidelines')}] {chunk['text']}" for chunk in guidelines
+        ) or "No guideline excerpts were found for this section."
+        prompt = (
+            f"Section: {part.heading}\n\n"
+            f"Guideline excerpts:\n{excerpts}\n\n"
+            f"Section text:\n{part.text}"
+        )
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=return_instructions_rfp_section_validation(),
+                response_mime_type="application/json",
+                response_schema=SectionReview,
+            ),
+        )
+        if isinstance(response.parsed, SectionReview):
+            return response.parsed
+        return SectionReview.model_validate_json(response.text)
+
+    async def _review_with_retries(self, part: RfpPart, semaphore: asyncio.Semaphore) -> PartResult:
+        async with semaphore:
+            start = time.perf_counter()
+            result = PartResult(part.heading, part.words)
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    result.review = await self._review(part)
+                    break
+                except Exception as e:
+                    if not is_rate_limited(e) or attempt == self.max_attempts:
+                        logger.warning("Reviewing section %r failed: %s", part.heading, e)
+                        result.error = f"{type(e).__name__}: {e}"
+                        break
+                    await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+            result.latency_seconds = time.perf_counter() - start
+            return result
+
+    async def validate(self, text: str) -> LongValidationResult:
+        """
+        Validate an RFP section by section and merge the reviews.
+
+        Args:
+            text (str): The RFP
+
+        Returns:
+            LongValidationResult: Score, report and per-section results
+        """
+        start = time.perf_counter()
+        findings = self.engine.check(text)
+        parts = split_parts(text, self.section_words)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._review_with_retries(part, semaphore) for part in parts))
+        score, report = merge_reviews(list(results), findings)
+        elapsed = time.perf_counter() - start
+        if results:
+            latencies = [result.latency_seconds for result in results]
+            logger.info(
+                "Validated %d sections in %.1fs (slowest %.1fs, median %.1fs)",
+                len(results), elapsed, max(latencies), statistics.median(latencies),
+            )
+        return LongValidationResult(score, list(results), findings, elapsed, report)
+
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        """Answers a turn that submits a long RFP with the map-reduce report.
+
+        Only the first model call of a turn, whose last content is the
+        user's message, is considered; shorter messages go to the model.
+        """
+        if not llm_request.contents or llm_request.contents[-1].role != "user":
+            return None
+        parts = llm_request.contents[-1].parts or []
+        text = "\n".join(part.text for part in parts if part.text)
+        if not self.is_long(text):
+            return None
+        result = await self.validate(text)
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=result.report)]))
+
+
+_long_rfp_validator: LongRfpValidator | None = None
+
+
+def get_long_rfp_validator() -> LongRfpValidator:
+    """Get the process-wide long RFP validator, creating it on first use."""
+    global _long_rfp_validator
+    if _long_rfp_validator is None:
+        _long_rfp_validator = LongRfpValidator()
+    return _long_rfp_validator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a long RFP section by section.")
+    parser.add_argument("rfp", help="RFP as .md, .txt or .pdf")
+    parser.add_argument("--concurrency", type=int, default=None, help="Sections reviewed at the same time")
+    parser.add_argument("--section-words", type=int, default=None, help="Maximum words per reviewed part")
+    args = parser.parse_args()
+
+    validator = LongRfpValidator(concurrency=args.concurrency, section_words=args.section_words)
+    result = asyncio.run(validator.validate(read_document(args.rfp)))
+    print(result.report)
+    latencies = [part.latency_seconds for part in result.parts]
+    if latencies:
+        print(
+            f"\n{len(result.parts)} sections in {result.elapsed_seconds:.1f}s "
+            f"(slowest section {max(latencies):.1f}s, sum of sections {sum(latencies):.1f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
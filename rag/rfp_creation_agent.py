@@ -12,36 +12,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
 from google.adk.agents import Agent
-from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
-from vertexai.preview import rag
-from dotenv import load_dotenv
+from .config import get_settings
 from .prompts import return_instructions_rfp_creation
+from .sectioned_creation import SectionedRfpWriter
+from .shared_libraries.prompt_cache import get_prompt_cache
+from .shared_libraries.retrieval import RagRetrievalTool
 
-load_dotenv()
+settings = get_settings()
+prompt_cache = get_prompt_cache()
 
 # RFP Creation Agent - Creates RFPs based on project details and guidelines
-rfp_creation_retrieval = VertexAiRagRetrieval(
+rfp_creation_retrieval = RagRetrievalTool(
     name='retrieve_rfp_guidelines',
     description=(
         'Use this tool to retrieve RFP guidelines and requirements from the Digital Projects RFPs document. '
         'This helps ensure the created RFP follows all necessary guidelines and includes required sections.'
     ),
-    rag_resources=[
-        rag.RagResource(
-            rag_corpus=os.environ.get("RAG_CORPUS")
-        )
-    ],
     similarity_top_k=15,
     vector_distance_threshold=0.5,
+    token_budget=4000,
+)
+
+# Drafts full RFPs section by section once the creation agent has the project details
+rfp_section_writer = SectionedRfpWriter(
+    name='rfp_section_writer',
+    description='Drafts the full RFP from the gathered project details, writing its sections in parallel',
+    model=settings.agent_model,
+    concurrency=settings.rfp_section_concurrency,
 )
+section_writers = [rfp_section_writer] if settings.parallel_rfp_creation else []
 
 rfp_creation_agent = Agent(
-    model='gemini-2.5-flash',
+    model=settings.agent_model,
     name='rfp_creation_agent',
-    instruction=return_instructions_rfp_creation(),
+    instruction=return_instructions_rfp_creation(
+        section_writer_name=rfp_section_writer.name if section_writers else None
+    ),
     tools=[
         rfp_creation_retrieval,
-    ]
+    ],
+    sub_agents=section_writers,
+    before_model_callback=prompt_cache.before_model_callback,
+    after_model_callback=prompt_cache.after_model_callback,
 )
@@ -12,36 +12,33 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
 from google.adk.agents import Agent
-from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
-from vertexai.preview import rag
-from dotenv import load_dotenv
+from .config import get_settings
 from .prompts import return_instructions_rfp_orchestrator
+from .shared_libraries.prompt_cache import get_prompt_cache
+from .shared_libraries.retrieval import RagRetrievalTool
 
-load_dotenv()
+settings = get_settings()
+prompt_cache = get_prompt_cache()
 
 # RFP Orchestrator Agent - Routes between different RFP functionalities
-rfp_orchestrator_retrieval = VertexAiRagRetrieval(
+rfp_orchestrator_retrieval = RagRetrievalTool(
     name='retrieve_rfp_guidelines',
     description=(
         'Use this tool to retrieve RFP guidelines and requirements from the Digital Projects RFPs document. '
         'This helps provide context and guidance for RFP-related tasks.'
     ),
-    rag_resources=[
-        rag.RagResource(
-            rag_corpus=os.environ.get("RAG_CORPUS")
-        )
-    ],
     similarity_top_k=10,
     vector_distance_threshold=0.6,
 )
 
 rfp_orchestrator_agent = Agent(
-    model='gemini-2.5-flash',
+    model=settings.agent_model,
     name='rfp_orchestrator_agent',
     instruction=return_instructions_rfp_orchestrator(),
     tools=[
         rfp_orchestrator_retrieval,
-    ]
+    ],
+    before_model_callback=prompt_cache.before_model_callback,
+    after_model_callback=prompt_cache.after_model_callback,
 )
@@ -0,0 +1,353 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Deterministic RFP Pre-Validation
+
+Mechanical checks that do not need a model: which sections an RFP has,
+which of the required sections are missing, and what budget, dates and
+durations it states. The required sections are the ones the creation
+prompt tells the creation agent to include.
+
+`PreValidator` runs before the validation agent's model calls and attaches
+a compact findings block to the submitted RFP, so the model only has to
+make the judgment calls. `quick_check` runs the engine on its own, without
+any model call:
+
+    python -m rag.rfp_prevalidation my_rfp.md
+"""
+
+import argparse
+import json
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .prompts import return_instructions_rfp_creation
+
+FINDINGS_HEADER = "Pre-validation findings (deterministic checks):"
+
+_REQUIRED_LIST = re.compile(r"Generate a well-structured RFP that includes:\s*\n((?:\s*-\s*.+\n)+)")
+
+# Words that say nothing about which section a heading is
+_GENERIC_WORDS = frozenset({"and", "of", "the", "project", "information", "requirements", "guidelines"})
+
+# Common alternative headings for the required sections, by keyword
+_SYNONYMS = {
+    "budget": ("cost", "pricing", "price", "financial", "fees"),
+    "timeline": ("schedule", "milestones", "deadlines", "dates"),
+    "evaluation": ("award", "scoring", "selection"),
+    "terms": ("legal", "contract", "contractual"),
+    "contact": ("contacts", "inquiries", "enquiries", "questions"),
+    "submission": ("proposal", "instructions"),
+    "scope": ("deliverables",),
+    "executive": ("introduction", "background"),
+    "overview": ("objectives", "goals"),
+    "technical": ("architecture", "functional"),
+}
+
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*#*$")
+_BOLD_HEADING = re.compile(r"^\*\*(.+?)\*\*:?$")
+_NUMBERED_HEADING = re.compile(r"^(?:\d+(?:\.\d+)*|[IVX]+)[.)]?\s+([A-Z][^.!?]*?):?$")
+_COLON_HEADING = re.compile(r"^([A-Z][A-Za-z&/ ,-]{2,60}):$")
+_WORD = re.compile(r"[a-z]+")
+
+_MONTHS = (
+    "jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+    "sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+)
+_DATE_PATTERNS = (
+    (re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b"), "ymd"),
+    (re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b"), "dmy"),
+    (re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTHS})\.?,?\s+(\d{{4}})\b", re.IGNORECASE), "d_month_y"),
+    (re.compile(rf"\b({_MONTHS})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b", re.IGNORECASE), "month_d_y"),
+)
+_CURRENCY = r"(?:SAR|SR|USD|EUR|GBP|US\$|\$|€|£|riyals?|dollars?)"
+_AMOUNT = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SCALE = r"(?:million|thousand|billion|[mk]\b|mn\b|bn\b)"
+_BUDGET = re.compile(
+    rf"(?:{_CURRENCY}\s?(?:{_AMOUNT})(?:\s?{_SCALE})?|(?:{_AMOUNT})(?:\s?{_SCALE})?\s?{_CURRENCY})",
+    re.IGNORECASE,
+)
+_DURATION = re.compile(r"\b(\d+)\s*(?:-\s*)?(days?|weeks?|months?|years?)\b", re.IGNORECASE)
+_PERCENT = re.compile(r"(\d{1,3}(?:\.\d+)?)\s?%")
+
+
+def required_sections(prompt: str | None = None) -> list[str]:
+    """
+    Extract the sections the creation prompt requires every RFP to have.
+
+    Args:
+        prompt (str, optional): Creation prompt; `return_instructions_rfp_creation()`
+            by default
+
+    Returns:
+        list: Section names in prompt order
+    """
+    match = _REQUIRED_LIST.search(prompt or return_instructions_rfp_creation())
+    if not match:
+        return []
+    return [line.strip().lstrip("-").strip() for line in match.group(1).splitlines() if line.strip()]
+
+
+def _keywords(name: str) -> set[str]:
+    words = {word for word in _WORD.findall(name.lower()) if word not in _GENERIC_WORDS}
+    for word in list(words):
+        words.update(_SYNONYMS.get(word, ()))
+    return words
+
+
+def heading_of(line: str) -> str | None:
+    """Returns the heading text if a line looks like a section heading."""
+    line = line.strip()
+    if not line or len(line) > 80:
+        return None
+    for pattern in (_MARKDOWN_HEADING, _BOLD_HEADING, _NUMBERED_HEADING, _COLON_HEADING):
+        match = pattern.match(line)
+        if match:
+            return match.group(1).strip("*: ").strip()
+    letters = [char for char in line if char.isalpha()]
+    if len(letters) >= 4 and all(char.isupper() for char in letters) and len(line.split()) <= 8:
+        return line.strip(": ")
+    return None
+
+
+def split_sections(text: str) -> list[tuple[str | None, str]]:
+    """
+    Split an RFP into (heading, body) pairs at heading lines.
+
+    Args:
+        text (str): The RFP
+
+    Returns:
+        list: Sections in document order; text before the first heading has
+            heading None
+    """
+    sections: list[tuple[str | None, list[str]]] = [(None, [])]
+    for line in text.splitlines():
+        heading = heading_of(line)
+        if heading:
+            sections.append((heading, []))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, "\n".join(lines).strip()) for heading, lines in sections if heading or "".join(lines).strip()]
+
+
+def _parse_date(match: re.Match, kind: str) -> str | None:
+    try:
+        if kind == "ymd":
+            year, month, day = (int(group) for group in match.groups())
+            return date(year, month, day).isoformat()
+        if kind == "dmy":
+            day, month, year = (int(group) for group in match.groups())
+            return date(year, month, day).isoformat()
+        if kind == "d_month_y":
+            day, month, year = match.groups()
+        else:
+            month, day, year = match.groups()
+        return datetime.strptime(f"{day} {month[:3]} {year}", "%d %b %Y").date().isoformat()
+    except ValueError:
+        return None
+
+
+def extract_dates(text: str) -> list[str]:
+    """Returns the valid dates in a text as sorted, unique ISO strings."""
+    found = set()
+    for pattern, kind in _DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            parsed = _parse_date(match, kind)
+            if parsed:
+                found.add(parsed)
+    return sorted(found)
+
+
+def _unique(values: list[str]) -> list[str]:
+    return list(dict.fromkeys(value.strip() for value in values))
+
+
+@dataclass
+class Findings:
+    """Facts established by the deterministic checks."""
+
+    word_count: int
+    sections: list[str]
+    required_present: dict[str, str] = field(default_factory=dict)
+    missing_sections: list[str] = field(default_factory=list)
+    empty_sections: list[str] = field(default_factory=list)
+    budget_amounts: list[str] = field(default_factory=list)
+    dates: list[str] = field(default_factory=list)
+    durations: list[str] = field(default_factory=list)
+    issues: list[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def looks_like_rfp(self) -> bool:
+        """True if the text has enough RFP structure to be worth checking."""
+        return len(self.required_present) >= 2
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_prompt(self) -> str:
+        """Renders the findings compactly for the model, leaving out timing."""
+        data = {key: value for key, value in self.to_dict().items() if key != "elapsed_ms" and value}
+        return f"{FINDINGS_HEADER}\n{json.dumps(data, ensure_ascii=False, separators=(',', ':'))}"
+
+
+class RfpRuleEngine:
+    """Checks an RFP's structure and extracts its budget, dates and durations."""
+
+    def __init__(self, required: list[str] | None = None, min_section_words: int = 5):
+        """
+        Create a rule engine.
+
+        Args:
+            required (list, optional): Required section names; read from the
+                creation prompt by default
+            min_section_words (int): Sections with fewer words are reported empty
+        """
+        self.required = required if required is not None else required_sections()
+        self.min_section_words = min_section_words
+        self._keywords = {name: _keywords(name) for name in self.required}
+
+    def match_required(self, heading: str) -> str | None:
+        """Returns the required section a heading stands for, if any."""
+        words = set(_WORD.findall(heading.lower()))
+        best, best_overlap = None, 0
+        for name, keywords in self._keywords.items():
+            overlap = len(words & keywords)
+            if overlap > best_overlap:
+                best, best_overlap = name, overlap
+        return best
+
+    def check(self, text: str) -> Findings:
+        """
+        Run every check on an RFP.
+
+        Args:
+            text (str): The RFP
+
+        Returns:
+            Findings: Sections, missing sections, extracted facts and issues
+        """
+        start = time.perf_counter()
+        sections = split_sections(text)
+        findings = Findings(word_count=len(text.split()), sections=[h for h, _ in sections if h])
+
+        bodies: dict[str, str] = {}
+        for heading, body in sections:
+            if heading is None:
+                continue
+            required = self.match_required(heading)
+            if required and required not in findings.required_present:
+                findings.required_present[required] = heading
+                bodies[required] = body
+            if len(body.split()) < self.min_section_words:
+                findings.empty_sections.append(heading)
+        findings.missing_sections = [name for name in self.required if name not in findings.required_present]
+
+        findings.budget_amounts = _unique([match.group(0) for match in _BUDGET.finditer(text)])
+        findings.dates = extract_dates(text)
+        findings.durations = _unique([match.group(0) for match in _DURATION.finditer(text)])
+
+        budget_section = next((name for name in bodies if "budget" in self._keywords[name]), None)
+        if budget_section and not _BUDGET.search(bodies[budget_section]):
+            findings.issues.append(f"'{findings.required_present[budget_section]}' states no amount")
+        timeline_section = next((name for name in bodies if "timeline" in self._keywords[name]), None)
+        if timeline_section:
+            body = bodies[timeline_section]
+            if not extract_dates(body) and not _DURATION.search(body):
+                findings.issues.append(f"'{findings.required_present[timeline_section]}' states no dates or durations")
+        evaluation_section = next((name for name in bodies if "evaluation" in self._keywords[name]), None)
+        if evaluation_section:
+            weights = [float(value) for value in _PERCENT.findall(bodies[evaluation_section])]
+            if weights and abs(sum(weights) - 100) > 0.5:
+                findings.issues.append(f"Evaluation weights add up to {sum(weights):g}%, not 100%")
+
+        findings.elapsed_ms = (time.perf_counter() - start) * 1000
+        return findings
+
+
+_default_engine: RfpRuleEngine | None = None
+
+
+def quick_check(text: str) -> Findings:
+    """Runs the default rule engine on an RFP without any model call."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = RfpRuleEngine()
+    return _default_engine.check(text)
+
+
+def _last_user_text(llm_request: LlmRequest) -> tuple[int, str]:
+    """Returns the index and text of the last user message with text."""
+    for index in range(len(llm_request.contents) - 1, -1, -1):
+        content = llm_request.contents[index]
+        if content.role != "user" or not content.parts:
+            continue
+        text = "\n".join(part.text for part in content.parts if part.text)
+        if text.strip():
+            return index, text
+    return -1, ""
+
+
+class PreValidator:
+    """Before model callback attaching rule engine findings to a submitted RFP."""
+
+    def __init__(self, engine: RfpRuleEngine | None = None):
+        """
+        Args:
+            engine (RfpRuleEngine, optional): Rule engine; the default one if None
+        """
+        self.engine = engine or RfpRuleEngine()
+
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        """Appends the findings to the user message holding the RFP.
+
+        The findings are recomputed for every model call of the turn (they
+        take well under a millisecond), so follow-up calls after a tool
+        result see them too. Only the request is changed, not the session.
+        """
+        index, text = _last_user_text(llm_request)
+        if index < 0 or FINDINGS_HEADER in text:
+            return None
+        findings = self.engine.check(text)
+        if not findings.looks_like_rfp:
+            return None
+        content = llm_request.contents[index]
+        llm_request.contents[index] = types.Content(
+            role=content.role,
+            parts=[*content.parts, types.Part(text=findings.to_prompt())],
+        )
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the deterministic RFP checks without a model.")
+    parser.add_argument("rfp", help="Text or Markdown file with the RFP")
+    args = parser.parse_args()
+    with open(args.rfp, encoding="utf-8") as f:
+        findings = quick_check(f.read())
+    print(json.dumps(findings.to_dict(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
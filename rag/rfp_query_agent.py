@@ -0,0 +1,63 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.agents import Agent
+from .config import get_settings
+from .prompts import return_instructions_root
+from .shared_libraries.embeddings import get_embedder
+from .shared_libraries.prompt_cache import get_prompt_cache
+from .shared_libraries.retrieval import RagRetrievalTool
+from .shared_libraries.semantic_cache import SemanticAnswerCache, SemanticCache
+
+settings = get_settings()
+prompt_cache = get_prompt_cache()
+
+# RFP Query Agent - Answers guideline and document questions with a short prompt
+rfp_query_retrieval = RagRetrievalTool(
+    name='retrieve_rag_documentation',
+    description=(
+        'Use this tool to retrieve documentation and reference materials for the question from the RAG corpus,'
+    ),
+    similarity_top_k=10,
+    vector_distance_threshold=0.6,
+)
+
+# Serves repeated guideline questions without calling the model
+rfp_query_answer_cache = SemanticAnswerCache(
+    cache=SemanticCache(
+        embedder=get_embedder(),
+        similarity_threshold=settings.semantic_cache_threshold,
+        max_entries=settings.semantic_cache_max_entries,
+    ),
+    corpus=settings.rag_corpus,
+    instruction=return_instructions_root(),
+)
+
+rfp_query_agent = Agent(
+    model=settings.agent_model,
+    name='rfp_query_agent',
+    instruction=return_instructions_root(),
+    tools=[
+        rfp_query_retrieval,
+    ],
+    # A semantic cache hit skips the model call, and with it the prompt cache
+    before_model_callback=[
+        rfp_query_answer_cache.before_model_callback,
+        prompt_cache.before_model_callback,
+    ],
+    after_model_callback=[
+        rfp_query_answer_cache.after_model_callback,
+        prompt_cache.after_model_callback,
+    ],
+)
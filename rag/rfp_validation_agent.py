@@ -12,36 +12,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import os
 from google.adk.agents import Agent
-from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
-from vertexai.preview import rag
-from dotenv import load_dotenv
+from .config import get_settings
+from .long_validation import get_long_rfp_validator
 from .prompts import return_instructions_rfp_validation
+from .rfp_prevalidation import PreValidator
+from .shared_libraries.prompt_cache import get_prompt_cache
+from .shared_libraries.retrieval import RagRetrievalTool
 
-load_dotenv()
+settings = get_settings()
+prompt_cache = get_prompt_cache()
+pre_validator = PreValidator()
+long_rfp_validator = get_long_rfp_validator()
 
 # RFP Validation Agent - Validates RFPs against guidelines
-rfp_validation_retrieval = VertexAiRagRetrieval(
+rfp_validation_retrieval = RagRetrievalTool(
     name='retrieve_rfp_validation_guidelines',
     description=(
         'Use this tool to retrieve RFP validation guidelines and requirements from the Digital Projects RFPs document. '
         'This helps validate if the provided RFP meets all necessary requirements and follows proper guidelines.'
     ),
-    rag_resources=[
-        rag.RagResource(
-            rag_corpus=os.environ.get("RAG_CORPUS")
-        )
-    ],
     similarity_top_k=15,
     vector_distance_threshold=0.5,
+    token_budget=4000,
 )
 
 rfp_validation_agent = Agent(
-    model='gemini-2.5-flash',
+    model=settings.agent_model,
     name='rfp_validation_agent',
     instruction=return_instructions_rfp_validation(),
     tools=[
         rfp_validation_retrieval,
-    ]
+    ],
+    before_model_callback=[
+        long_rfp_validator.before_model_callback,
+        pre_validator.before_model_callback,
+        prompt_cache.before_model_callback,
+    ],
+    after_model_callback=prompt_cache.after_model_callback,
 )
@@ -0,0 +1,253 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parallel Section-by-Section RFP Drafting
+
+Writing a full RFP in one generation is slow and fails as a whole.
+`SectionedRfpWriter` is a sub-agent of the RFP Creation Agent, which
+transfers to it once it has gathered the project details:
+1. Plan: one structured model call turns the conversation into the RFP
+   title and its ordered sections, each with a brief and a guideline query.
+   The required sections are the ones the creation prompt lists.
+2. Write: every section is retrieved for and written by its own model call,
+   concurrently. Each section is streamed to the caller as a partial event
+   as soon as it is done, and a failing section is retried on its own.
+   A section that still fails is marked in the draft, which names the
+   sections to ask for again.
+3. Assemble: the sections are joined in plan order into the final response.
+
+Configuration (see `rag.config.RagSettings`):
+- PARALLEL_RFP_CREATION: Draft full RFPs with the section writer (default true)
+- RFP_SECTION_CONCURRENCY: Sections written at the same time (default 6)
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.genai import types
+from pydantic import BaseModel
+from typing_extensions import override
+
+from .intent_router import content_text
+from .prompts import return_instructions_rfp_section_planning, return_instructions_rfp_section_writing
+from .rfp_prevalidation import required_sections
+from .shared_libraries.cassettes import create_genai_client
+from .shared_libraries.retrieval import get_retrieval_client
+
+logger = logging.getLogger(__name__)
+
+# Characters of conversation given to the planner and writers
+_MAX_CONVERSATION_CHARS = 20000
+
+
+class SectionPlan(BaseModel):
+    heading: str
+    brief: str
+    query: str
+
+
+class RfpPlan(BaseModel):
+    """Title and ordered sections of an RFP, as returned by the planner."""
+
+    title: str
+    sections: list[SectionPlan]
+
+
+def conversation_text(ctx: InvocationContext, max_chars: int = _MAX_CONVERSATION_CHARS) -> str:
+    """Returns the text of the session so far as "author: text" lines, most recent last."""
+    lines = [
+        f"{event.author}: {text}"
+        for event in ctx.session.events
+        if (text := content_text(event.content))
+    ]
+    user_text = content_text(ctx.user_content)
+    if user_text and (not lines or not lines[-1].endswith(user_text)):
+        lines.append(f"user: {user_text}")
+    return "\n\n".join(lines)[-max_chars:]
+
+
+class SectionedRfpWriter(BaseAgent):
+    """Plans an RFP and drafts its sections concurrently, streaming each one."""
+
+    model: str
+    """Model planning and writing the sections."""
+
+    concurrency: int = 6
+    """Sections written at the same time."""
+
+    max_attempts: int = 3
+    """Attempts per section before it is reported as failed."""
+
+    backoff_seconds: float = 2.0
+    """First retry delay, doubled on each retry."""
+
+    similarity_top_k: int = 8
+    """Guideline chunks retrieved per section."""
+
+    vector_distance_threshold: float | None = 0.5
+    """Retrieval distance cut-off."""
+
+    client: Any = None
+    """google.genai client; created on first use if None (see
+    `rag.shared_libraries.cassettes.create_genai_client`)."""
+
+    retrieval_client: Any = None
+    """Guideline retrieval; the process-wide client if None."""
+
+    model_tracer: Any = None
+    """`AgentTracer` recording a span per model call; set by `AgentTracer.instrument`."""
+
+    def _genai(self):
+        if self.client is None:
+            self.client = create_genai_client()
+        return self.client
+
+    async def _generate(
+        self, contents: str, config: types.GenerateContentConfig, invocation_id: str | None
+    ) -> types.GenerateContentResponse:
+        if self.model_tracer is None or invocation_id is None:
+            return await self._genai().aio.models.generate_content(model=self.model, contents=contents, config=config)
+        with self.model_tracer.model_call(invocation_id, self.name, self.model) as record_usage:
+            response = await self._genai().aio.models.generate_content(
+                model=self.model, contents=contents, config=config
+            )
+            record_usage(response)
+            return response
+
+    async def plan(self, conversation: str, invocation_id: str | None = None) -> RfpPlan:
+        """
+        Plan the title and sections of the RFP discussed in a conversation.
+
+        Args:
+            conversation (str): The conversation with the project details
+            invocation_id (str, optional): The invocation, to trace the call
+
+        Returns:
+            RfpPlan: Title and ordered sections
+        """
+        response = await self._generate(
+            f"Conversation:\n{conversation}",
+            types.GenerateContentConfig(
+                system_instruction=return_instructions_rfp_section_planning(required_sections()),
+                response_mime_type="application/json",
+                response_schema=RfpPlan,
+            ),
+            invocation_id,
+        )
+        if isinstance(response.parsed, RfpPlan):
+            return response.parsed
+        return RfpPlan.model_validate_json(response.text)
+
+    async def write_section(
+        self, plan: RfpPlan, section: SectionPlan, conversation: str, invocation_id: str | None = None
+    ) -> str:
+        """
+        Retrieve guidelines for one section and write it.
+
+        Args:
+            plan (RfpPlan): The full plan, for the title
+            section (SectionPlan): The section to write
+            conversation (str): The conversation with the project details
+            invocation_id (str, optional): The invocation, to trace the call
+
+        Returns:
+            str: The section in Markdown
+        """
+        retrieval = self.retrieval_client or get_retrieval_client()
+        chunks = await retrieval.retrieve_async(section.query, self.similarity_top_k, self.vector_distance_threshold)
+        excerpts = "\n\n".join(f"[{chunk.get('title', 'guidelines')}] {chunk['text']}" for chunk in chunks)
+        prompt = (
+            f"RFP title: {plan.title}\n"
+            f"Section: {section.heading}\n"
+            f"Brief: {section.brief}\n\n"
+            f"Project details from the conversation:\n{conversation}\n\n"
+            f"Guideline excerpts:\n{excerpts or 'No guideline excerpts were found for this section.'}"
+        )
+        response = await self._generate(
+            prompt,
+            types.GenerateContentConfig(system_instruction=return_instructions_rfp_section_writing()),
+            invocation_id,
+        )
+        text = (response.text or "").strip()
+        if not text:
+            raise ValueError("empty section")
+        return text
+
+    async def _write_with_retries(
+        self, index: int, plan: RfpPlan, conversation: str, semaphore: asyncio.Semaphore, invocation_id: str
+    ) -> tuple[int, str | None, str | None]:
+        section = plan.sections[index]
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with semaphore:
+                    return index, await self.write_section(plan, section, conversation, invocation_id), None
+            except Exception as e:
+                logger.warning("Writing section %r failed (attempt %d): %s", section.heading, attempt, e)
+                if attempt == self.max_attempts:
+                    return index, None, f"{type(e).__name__}: {e}"
+            # Back off without holding a slot, so other sections keep going
+            await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    def _event(self, ctx: InvocationContext, text: str, partial: bool = False) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            partial=partial,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+        )
+
+    @override
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        conversation = conversation_text(ctx)
+        plan = await self.plan(conversation, ctx.invocation_id)
+        outline = ", ".join(section.heading for section in plan.sections)
+        yield self._event(ctx, f"Drafting **{plan.title}** ({len(plan.sections)} sections): {outline}\n\n", partial=True)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(self._write_with_retries(index, plan, conversation, semaphore, ctx.invocation_id))
+            for index in range(len(plan.sections))
+        ]
+        written: dict[int, str] = {}
+        failed: dict[int, str] = {}
+        try:
+            for task in asyncio.as_completed(tasks):
+                index, text, error = await task
+                if text is None:
+                    failed[index] = error
+                    continue
+                written[index] = text
+                yield self._event(ctx, f"{text}\n\n", partial=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        body = [
+            written.get(index) or f"## {section.heading}\n\n_This section could not be drafted ({failed[index]})._"
+            for index, section in enumerate(plan.sections)
+        ]
+        if failed:
+            headings = ", ".join(plan.sections[index].heading for index in sorted(failed))
+            body.append(
+                f"_Not drafted: {headings}. Ask me to write these sections, "
+                "or to draft the whole RFP again._"
+            )
+        yield self._event(ctx, f"# {plan.title}\n\n" + "\n\n".join(body))
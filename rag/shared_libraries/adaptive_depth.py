@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Adaptive Retrieval Depth
+
+A fixed `similarity_top_k` sends 10-15 chunks for a simple lookup, and
+may still be too few for a broad drafting question. In adaptive mode a
+retrieval tool's `similarity_top_k` is the number of candidates fetched,
+and the number actually sent is chosen per call from the candidates'
+distances:
+- Knee: the largest jump in distance after the first `min_k` candidates,
+  if it stands out from the overall spread, ends the result.
+- Token budget: chunks are added, closest first, until the tool's token
+  budget is reached.
+- Flat scores: if every candidate is about equally close, the cut-off is
+  probably further out, so the search is widened once to twice as many
+  candidates.
+
+Every call's chosen depth is recorded, and `DepthStats.stats()` summarises
+them per tool for tuning.
+
+Configuration (see `rag.config.RagSettings`):
+- RETRIEVAL_DEPTH: "adaptive" (default) or "fixed"
+- RETRIEVAL_TOKEN_BUDGET: Default token budget per retrieval (default 3000)
+"""
+
+import logging
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+# A jump counts as a knee if it is at least this share of the whole spread
+DEFAULT_KNEE_RATIO = 0.3
+# Candidates whose distances all lie within this spread are "flat"
+DEFAULT_FLAT_SPREAD = 0.05
+DEFAULT_MIN_K = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text, at about four characters per token."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class DepthChoice:
+    """How many candidates a call keeps, and why."""
+
+    depth: int
+    reason: str  # "knee", "budget" or "all"
+    tokens: int
+
+
+def choose_depth(
+    chunks: list[dict],
+    min_k: int = DEFAULT_MIN_K,
+    token_budget: int | None = None,
+    knee_ratio: float = DEFAULT_KNEE_RATIO,
+) -> DepthChoice:
+    """
+    Choose how many of the candidates, in retrieval order, to keep.
+
+    The knee is only looked for when the candidates come sorted by distance;
+    rank-fused results (hybrid backend) are cut by the token budget alone.
+
+    Args:
+        chunks (list): Candidates in retrieval order, with "text" and,
+            ideally, "distance"
+        min_k (int): Candidates always kept, token budget permitting
+        token_budget (int, optional): Maximum estimated tokens of kept chunks
+        knee_ratio (float): Minimum share of the spread for a jump to count
+
+    Returns:
+        DepthChoice: The depth, the reason for it and the estimated tokens
+    """
+    depth, reason = len(chunks), "all"
+    distances = [chunk.get("distance") for chunk in chunks]
+    if len(chunks) > min_k and None not in distances and distances == sorted(distances):
+        spread = distances[-1] - distances[0]
+        if spread > 0:
+            gap, cut = max((distances[i] - distances[i - 1], i) for i in range(min_k, len(chunks)))
+            if gap >= knee_ratio * spread:
+                depth, reason = cut, "knee"
+
+    tokens = 0
+    for index, chunk in enumerate(chunks[:depth]):
+        chunk_tokens = estimate_tokens(chunk.get("text") or "")
+        if token_budget is not None and index > 0 and tokens + chunk_tokens > token_budget:
+            depth, reason = index, "budget"
+            break
+        tokens += chunk_tokens
+    return DepthChoice(depth, reason, tokens)
+
+
+def is_flat(chunks: list[dict], flat_spread: float = DEFAULT_FLAT_SPREAD) -> bool:
+    """True if all candidates have distances and lie within `flat_spread` of each other."""
+    distances = [chunk.get("distance") for chunk in chunks]
+    if len(chunks) < 2 or None in distances:
+        return False
+    return max(distances) - min(distances) <= flat_spread
+
+
+@dataclass
+class DepthRecord:
+    """One retrieval call in adaptive mode."""
+
+    tool: str
+    candidates: int
+    depth: int
+    reason: str
+    tokens: int
+    widened: bool
+    latency_ms: float
+
+
+class DepthStats:
+    """Records the depth chosen by adaptive retrieval calls."""
+
+    def __init__(self, max_records: int = 1000):
+        """
+        Args:
+            max_records (int): Most recent calls kept for `stats` and `records`
+        """
+        self._records: deque[DepthRecord] = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def record(self, record: DepthRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+        logger.debug(
+            "%s kept %d of %d chunks (%s, ~%d tokens%s) in %.0fms",
+            record.tool, record.depth, record.candidates, record.reason, record.tokens,
+            ", widened" if record.widened else "", record.latency_ms,
+        )
+
+    def records(self) -> list[dict]:
+        """Returns the recorded calls, oldest first."""
+        with self._lock:
+            return [asdict(record) for record in self._records]
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Summarise the recorded calls per tool.
+
+        Returns:
+            dict: Tool name -> calls, mean candidates, depth, tokens and
+                latency, widened calls and calls per cut-off reason
+        """
+        with self._lock:
+            records = list(self._records)
+        summary: dict[str, dict] = {}
+        for tool in dict.fromkeys(record.tool for record in records):
+            calls = [record for record in records if record.tool == tool]
+            reasons: dict[str, int] = {}
+            for record in calls:
+                reasons[record.reason] = reasons.get(record.reason, 0) + 1
+            summary[tool] = {
+                "calls": len(calls),
+                "mean_candidates": sum(r.candidates for r in calls) / len(calls),
+                "mean_depth": sum(r.depth for r in calls) / len(calls),
+                "mean_tokens": sum(r.tokens for r in calls) / len(calls),
+                "mean_latency_ms": sum(r.latency_ms for r in calls) / len(calls),
+                "widened": sum(r.widened for r in calls),
+                "reasons": reasons,
+            }
+        return summary
+
+
+_depth_stats = DepthStats()
+
+
+def get_depth_stats() -> DepthStats:
+    """Get the process-wide adaptive retrieval statistics."""
+    return _depth_stats
@@ -0,0 +1,354 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Bulk Corpus Ingestion
+
+Uploads many documents to a RAG corpus concurrently. Used by
+`prepare_corpus_and_data.py --dir/--manifest`.
+
+- Uploads run on a bounded thread pool (`rag.upload_file` is blocking).
+- An adaptive rate limiter paces requests across all workers. It slows down
+  multiplicatively whenever the embedding quota is exhausted and speeds up
+  again additively after successes; throttled files are retried rather than
+  dropped. `rag.upload_file` reports quota errors as a `RuntimeError` carrying
+  the API error, so `is_quota_error` looks at the error's payload and causes,
+  not only at its type.
+- Every finished upload is appended to a JSONL checkpoint, so an interrupted
+  run skips the files that already made it into the corpus.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from google.api_core.exceptions import ResourceExhausted
+
+DEFAULT_EXTENSIONS = (".pdf", ".txt", ".md", ".html", ".docx", ".pptx")
+
+# HTTP 429 as a status, not just the number anywhere in the text
+_QUOTA_MESSAGE = re.compile(
+    r"RESOURCE_EXHAUSTED|Resource exhausted|Quota exceeded|^429\b|\b429 Too Many Requests"
+    r"|\b(?:HTTP|status|code)\W{0,3}429\b",
+    re.IGNORECASE,
+)
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """
+    True if a call failed because the quota is exhausted.
+
+    Also used for model and Agent Engine calls. `rag.upload_file` wraps API failures in `RuntimeError`, either with the
+    JSON error (code 429, status RESOURCE_EXHAUSTED) as an argument or with
+    the original exception as `__cause__`; both are recognised.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, ResourceExhausted):
+            return True
+        if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+            return True
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) == 429:
+            return True
+        for arg in error.args:
+            if isinstance(arg, dict) and (arg.get("code") == 429 or arg.get("status") == "RESOURCE_EXHAUSTED"):
+                return True
+            if isinstance(arg, str) and _QUOTA_MESSAGE.search(arg):
+                return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+@dataclass
+class IngestItem:
+    """A local file to upload and how it is named in the corpus."""
+
+    path: str
+    display_name: str
+    description: str = ""
+
+    @property
+    def signature(self) -> str:
+        """Identifies this version of the file, so edited files are re-uploaded."""
+        stat = os.stat(self.path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def collect_directory(directory: str, extensions: tuple[str, ...] = DEFAULT_EXTENSIONS) -> list[IngestItem]:
+    """
+    List the uploadable files below a directory.
+
+    Args:
+        directory (str): Directory to walk recursively
+        extensions (tuple): File extensions to include
+
+    Returns:
+        list: Items sorted by path, named after their path relative to the directory
+    """
+    items = []
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.lower().endswith(extensions):
+                path = os.path.join(root, filename)
+                items.append(IngestItem(path=os.path.abspath(path), display_name=os.path.relpath(path, directory)))
+    return sorted(items, key=lambda item: item.path)
+
+
+def read_manifest(manifest_path: str) -> list[IngestItem]:
+    """
+    Read a JSONL manifest of files to upload.
+
+    Each line is an object with a "path" and optionally a "display_name" and
+    "description". Relative paths are resolved against the manifest's directory.
+
+    Args:
+        manifest_path (str): Path to the manifest
+
+    Returns:
+        list: Items in manifest order
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    items = []
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            path = os.path.join(base, entry["path"])
+            items.append(
+                IngestItem(
+                    path=os.path.abspath(path),
+                    display_name=entry.get("display_name") or os.path.basename(path),
+                    description=entry.get("description", ""),
+                )
+            )
+    return items
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe request pacer with additive increase, multiplicative decrease."""
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        min_rate: float = 0.1,
+        max_rate: float = 20.0,
+        increase: float = 0.1,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Create a rate limiter.
+
+        Args:
+            rate (float): Initial requests per second
+            min_rate (float): Lowest rate backed off to
+            max_rate (float): Highest rate ramped up to
+            increase (float): Requests per second added after each success
+            decrease_factor (float): Factor the rate is multiplied by when
+                the quota is exhausted
+            clock (callable): Monotonic time source, replaceable in tests
+            sleep (callable): Sleep function, replaceable in tests
+        """
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until the caller may send its next request."""
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            self._sleep(slot - now)
+
+    def on_success(self) -> None:
+        """Speeds up after a request went through."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttled(self) -> None:
+        """Slows down after the quota was exhausted."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            # Hold back every worker, not only the one that was throttled
+            self._next_slot = max(self._next_slot, self._clock() + 1.0 / self.rate)
+
+
+class Checkpoint:
+    """Append-only JSONL record of files already uploaded to a corpus."""
+
+    def __init__(self, path: str | None):
+        """
+        Load a checkpoint.
+
+        Args:
+            path (str, optional): Checkpoint file; nothing is recorded if None
+        """
+        self.path = path
+        self._records: dict[tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A partially written last line from an interrupted run
+                        continue
+                    self._records[(record["corpus"], record["path"])] = record
+            # Rewrite without the partial line, so new records start on a fresh line
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in self._records.values():
+                    f.write(json.dumps(record) + "\n")
+            os.replace(tmp_path, path)
+
+    def is_done(self, corpus_name: str, item: IngestItem) -> bool:
+        """True if this version of the file was already uploaded to the corpus."""
+        record = self._records.get((corpus_name, item.path))
+        return record is not None and record["signature"] == item.signature
+
+    def record(self, corpus_name: str, item: IngestItem, rag_file_name: str | None) -> None:
+        """Marks a file as uploaded."""
+        record = {
+            "corpus": corpus_name,
+            "path": item.path,
+            "signature": item.signature,
+            "rag_file": rag_file_name,
+        }
+        with self._lock:
+            self._records[(corpus_name, item.path)] = record
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+
+@dataclass
+class IngestSummary:
+    """Outcome of a bulk ingestion run."""
+
+    total: int = 0
+    uploaded: int = 0
+    skipped: int = 0
+    throttled: int = 0
+    bytes_uploaded: int = 0
+    elapsed_seconds: float = 0.0
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    def format(self) -> str:
+        """Renders the summary for the console."""
+        elapsed = self.elapsed_seconds or 1e-9
+        lines = [
+            f"Files: {self.total} total, {self.uploaded} uploaded, "
+            f"{self.skipped} already in checkpoint, {self.failed} failed",
+            f"Throughput: {self.uploaded / elapsed:.2f} files/s, "
+            f"{self.bytes_uploaded / elapsed / 1e6:.2f} MB/s over {self.elapsed_seconds:.1f}s",
+            f"Quota retries: {self.throttled}",
+        ]
+        lines.extend(f"  FAILED {path}: {error}" for path, error in self.errors.items())
+        return "\n".join(lines)
+
+
+def ingest(
+    corpus_name: str,
+    items: Iterable[IngestItem],
+    upload: Callable[[IngestItem], Any],
+    concurrency: int = 4,
+    limiter: AdaptiveRateLimiter | None = None,
+    checkpoint: Checkpoint | None = None,
+    max_attempts: int = 8,
+) -> IngestSummary:
+    """
+    Upload files concurrently, retrying on exhausted quota.
+
+    Args:
+        corpus_name (str): Resource name of the target corpus
+        items (iterable): Files to upload; may be a generator, e.g. of
+            finished downloads, in which case uploads start as items arrive
+        upload (callable): Uploads one item and returns the created RAG file;
+            raises an error recognised by `is_quota_error` when the quota is
+            exhausted
+        concurrency (int): Maximum number of uploads in flight
+        limiter (AdaptiveRateLimiter, optional): Shared request pacer
+        checkpoint (Checkpoint, optional): Record of finished uploads
+        max_attempts (int): Attempts per file before it is reported as failed
+
+    Returns:
+        IngestSummary: Counts, throughput and per-file errors
+    """
+    limiter = limiter or AdaptiveRateLimiter()
+    checkpoint = checkpoint or Checkpoint(None)
+    summary = IngestSummary()
+    summary_lock = threading.Lock()
+
+    def upload_one(item: IngestItem) -> None:
+        for attempt in range(1, max_attempts + 1):
+            limiter.acquire()
+            try:
+                rag_file = upload(item)
+            except Exception as e:
+                if not is_quota_error(e):
+                    with summary_lock:
+                        summary.errors[item.path] = str(e)
+                    return
+                # The retry waits in acquire() for the slowed-down rate
+                limiter.on_throttled()
+                with summary_lock:
+                    summary.throttled += 1
+                    if attempt == max_attempts:
+                        summary.errors[item.path] = f"quota exhausted after {max_attempts} attempts: {e}"
+                        return
+                continue
+            limiter.on_success()
+            checkpoint.record(corpus_name, item, getattr(rag_file, "name", None))
+            with summary_lock:
+                summary.uploaded += 1
+                summary.bytes_uploaded += os.path.getsize(item.path)
+            print(f"Uploaded {item.display_name}")
+            return
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = []
+        for item in items:
+            summary.total += 1
+            if checkpoint.is_done(corpus_name, item):
+                summary.skipped += 1
+            else:
+                futures.append(executor.submit(upload_one, item))
+        # Surface unexpected worker exceptions here
+        for future in futures:
+            future.result()
+    summary.elapsed_seconds = time.perf_counter() - start
+    return summary
@@ -0,0 +1,352 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Record/Replay Cassettes for Model and Retrieval Calls
+
+Eval and regression runs send the same Gemini requests and retrieval
+queries again and again. With cassettes, each call is keyed by a SHA-256
+hash of its request (model, contents, config and tools; or corpora, query
+and retrieval settings):
+- In "record" mode the live service is called and the response is written
+  to a gzipped JSON cassette named after the key.
+- In "replay" mode the response is read from its cassette without any
+  network access, and a missing cassette raises `CassetteMiss`.
+
+Cassettes are content-addressed, so identical requests share one file,
+whichever agent or test sent them. Responses from the prompt cache depend on
+server-side state, so prompt caching is off while cassettes are in use.
+
+The long RFP validator and the section writer call the Gemini client
+directly rather than through an ADK model; they get their client from
+`create_genai_client`, which records and replays the same way.
+
+Configuration (see `rag.config.RagSettings`):
+- CASSETTE_MODE: "off" (default), "record" or "replay"
+- CASSETTE_DIR: Directory holding the cassettes (default "cassettes")
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from pydantic import BaseModel
+
+from ..config import get_settings
+from .retrieval import RetrievalClient
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ("off", "record", "replay")
+LLM_KIND = "llm"
+RETRIEVAL_KIND = "retrieval"
+
+# Config fields that differ between runs without changing the response
+_VOLATILE_CONFIG_FIELDS = {"cached_content", "http_options"}
+
+
+class CassetteMiss(LookupError):
+    """A replayed call has no recorded cassette."""
+
+
+def request_key(request: dict) -> str:
+    """Returns the SHA-256 hash of a request's canonical JSON."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """Directory of gzipped JSON cassettes, addressed by request hash."""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): Directory holding the cassettes; created on first write
+        """
+        self.directory = directory
+
+    def path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, key[:2], f"{key}.json.gz")
+
+    def get(self, kind: str, key: str) -> Any | None:
+        """Returns the recorded response, or None if there is no cassette."""
+        try:
+            with gzip.open(self.path(kind, key), "rt", encoding="utf-8") as f:
+                return json.load(f)["response"]
+        except FileNotFoundError:
+            return None
+
+    def put(self, kind: str, key: str, response: Any, description: str = "") -> None:
+        """
+        Write a cassette atomically, so concurrent runs never read a partial file.
+
+        Args:
+            kind (str): LLM_KIND or RETRIEVAL_KIND
+            key (str): The request hash
+            response: JSON-serialisable response
+            description (str): Short, human-readable summary of the request
+        """
+        path = self.path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump({"request": description, "response": response}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def miss(self, kind: str, key: str, description: str) -> CassetteMiss:
+        return CassetteMiss(
+            f"No {kind} cassette for {description!r} (key {key[:12]}) in {self.directory}. "
+            "Re-record with CASSETTE_MODE=record."
+        )
+
+
+def _check_mode(mode: str) -> str:
+    if mode not in CASSETTE_MODES[1:]:
+        raise ValueError(f"Unknown cassette mode '{mode}'. Use 'record' or 'replay'.")
+    return mode
+
+
+def llm_request_fields(llm_request: LlmRequest, model: str) -> dict:
+    """The parts of an LLM request that determine its response."""
+    config = llm_request.config.model_dump(mode="json", exclude_none=True) if llm_request.config else {}
+    return {
+        "model": llm_request.model or model,
+        "contents": [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents],
+        "config": {key: value for key, value in config.items() if key not in _VOLATILE_CONFIG_FIELDS},
+    }
+
+
+def _describe_llm_request(fields: dict) -> str:
+    for content in reversed(fields["contents"]):
+        for part in content.get("parts", []):
+            if part.get("text"):
+                return f"{fields['model']}: {part['text'][:80]}"
+    return fields["model"]
+
+
+class CassetteLlm(BaseLlm):
+    """ADK model that records or replays another model's responses."""
+
+    store: Any
+    """The `CassetteStore`."""
+
+    mode: str = "replay"
+    """"record" or "replay"."""
+
+    inner: BaseLlm | None = None
+    """The live model; resolved from `model` on the first recorded call if None."""
+
+    def _live(self) -> BaseLlm:
+        if self.inner is None:
+            self.inner = LLMRegistry.new_llm(self.model)
+        return self.inner
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        fields = llm_request_fields(llm_request, self.model)
+        fields["stream"] = stream
+        key = request_key(fields)
+        description = _describe_llm_request(fields)
+
+        if self.mode == "replay":
+            recorded = self.store.get(LLM_KIND, key)
+            if recorded is None:
+                raise self.store.miss(LLM_KIND, key, description)
+            for response in recorded:
+                yield LlmResponse.model_validate(response)
+            return
+
+        responses = []
+        async for response in self._live().generate_content_async(llm_request, stream):
+            responses.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+        self.store.put(LLM_KIND, key, responses, description)
+        logger.debug("Recorded %d LLM responses for %s", len(responses), description)
+
+
+def _genai_config_fields(config: types.GenerateContentConfig | None) -> dict:
+    if config is None:
+        return {}
+    fields = config.model_dump(exclude_none=True)
+    schema = fields.get("response_schema")
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        fields["response_schema"] = schema.model_json_schema()
+    return {key: value for key, value in fields.items() if key not in _VOLATILE_CONFIG_FIELDS}
+
+
+class CassetteGenaiClient:
+    """
+    Stand-in for a `google.genai.Client` that records or replays
+    `client.aio.models.generate_content` calls.
+
+    Replayed responses are rebuilt from their JSON, so `response.parsed` is
+    None and callers parse `response.text`.
+    """
+
+    def __init__(self, store: CassetteStore, mode: str, inner: Any = None):
+        """
+        Args:
+            store (CassetteStore): Where cassettes are read and written
+            mode (str): "record" or "replay"
+            inner (google.genai.Client, optional): The live client; only
+                needed to record
+        """
+        self.store = store
+        self.mode = _check_mode(mode)
+        self.inner = inner
+        if self.mode == "record" and inner is None:
+            raise ValueError("Recording model cassettes needs the live Gemini client.")
+        self.aio = SimpleNamespace(models=self)
+
+    async def generate_content(
+        self, *, model: str, contents: Any, config: types.GenerateContentConfig | None = None
+    ) -> types.GenerateContentResponse:
+        fields = {
+            "model": model,
+            "contents": contents if isinstance(contents, str) else [
+                content.model_dump(mode="json", exclude_none=True) for content in contents
+            ],
+            "config": _genai_config_fields(config),
+        }
+        key = request_key(fields)
+        description = f"{model}: {contents[:80]}" if isinstance(contents, str) else model
+
+        if self.mode == "replay":
+            recorded = self.store.get(LLM_KIND, key)
+            if recorded is None:
+                raise self.store.miss(LLM_KIND, key, description)
+            return types.GenerateContentResponse.model_validate(recorded)
+
+        response = await self.inner.aio.models.generate_content(model=model, contents=contents, config=config)
+        self.store.put(
+            LLM_KIND, key, response.model_dump(mode="json", exclude_none=True, exclude={"parsed"}), description
+        )
+        return response
+
+
+def create_genai_client():
+    """
+    Create a Gemini client for code that calls the model directly.
+
+    With CASSETTE_MODE "record" or "replay" the client is a
+    `CassetteGenaiClient`; replaying does not create a live client at all.
+
+    Returns:
+        google.genai.Client | CassetteGenaiClient: The client
+    """
+    from google import genai
+
+    settings = get_settings()
+    if settings.cassette_mode == "off":
+        return genai.Client()
+    inner = genai.Client() if settings.cassette_mode == "record" else None
+    return CassetteGenaiClient(CassetteStore(settings.cassette_dir), settings.cassette_mode, inner=inner)
+
+
+class CassetteRetrievalClient(RetrievalClient):
+    """Retrieval backend that records or replays another backend's results."""
+
+    def __init__(
+        self,
+        store: CassetteStore,
+        mode: str,
+        corpora: list[str],
+        inner: RetrievalClient | None = None,
+    ):
+        """
+        Args:
+            store (CassetteStore): Where cassettes are read and written
+            mode (str): "record" or "replay"
+            corpora (list): Identifiers of the searched corpora, part of the key
+            inner (RetrievalClient, optional): The live backend; only needed
+                to record
+        """
+        super().__init__(cache=None)
+        self.store = store
+        self.mode = _check_mode(mode)
+        self.corpora = corpora
+        self.inner = inner
+        if self.mode == "record" and inner is None:
+            raise ValueError("Recording retrieval cassettes needs the live retrieval client.")
+
+    def _query(self, query, similarity_top_k, vector_distance_threshold) -> list[dict]:
+        key = request_key({
+            "corpora": self.corpora,
+            "query": query,
+            "similarity_top_k": similarity_top_k,
+            "vector_distance_threshold": vector_distance_threshold,
+        })
+        if self.mode == "replay":
+            chunks = self.store.get(RETRIEVAL_KIND, key)
+            if chunks is None:
+                raise self.store.miss(RETRIEVAL_KIND, key, query[:80])
+            return chunks
+        chunks = self.inner.retrieve(query, similarity_top_k, vector_distance_threshold)
+        self.store.put(RETRIEVAL_KIND, key, chunks, query[:80])
+        return chunks
+
+
+def _walk(agent: BaseAgent):
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+def use_cassettes(agent: BaseAgent, store: CassetteStore, mode: str) -> BaseAgent:
+    """
+    Record or replay the model calls of every LLM agent in a tree.
+
+    Agents already using cassettes are left as they are, so this can be
+    applied to overlapping trees.
+
+    Args:
+        agent (BaseAgent): Root of the agent tree
+        store (CassetteStore): Where cassettes are read and written
+        mode (str): "record" or "replay"
+
+    Returns:
+        BaseAgent: The same agent
+    """
+    _check_mode(mode)
+    for node in _walk(agent):
+        # Agents without a model of their own use their parent's
+        if not isinstance(node, LlmAgent) or not node.model or isinstance(node.model, CassetteLlm):
+            continue
+        if isinstance(node.model, BaseLlm):
+            node.model = CassetteLlm(model=node.model.model, inner=node.model, store=store, mode=mode)
+        else:
+            node.model = CassetteLlm(model=node.model, store=store, mode=mode)
+    return agent
+
+
+def apply_configured_cassettes(agent: BaseAgent) -> BaseAgent:
+    """Apply `use_cassettes` if CASSETTE_MODE is "record" or "replay"; returns the agent."""
+    settings = get_settings()
+    if settings.cassette_mode == "off":
+        return agent
+    return use_cassettes(agent, CassetteStore(settings.cassette_dir), settings.cassette_mode)
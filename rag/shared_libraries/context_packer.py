@@ -0,0 +1,275 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Retrieval Context Packing
+
+Guideline chunks overlap by design, so a retrieval often returns the same
+passage several times. `ContextPacker` runs between a retrieval tool and
+the model:
+1. Near-duplicates are dropped: chunks whose word 5-shingles mostly match
+   a closer chunk's add nothing.
+2. Adjacent chunks of the same document and section (consecutive chunk IDs
+   or overlapping text) are merged into one, with the overlap removed.
+3. Optionally, each chunk is compressed to its heading and the sentences
+   that mention the query's terms.
+4. Chunks are kept, closest first, until the tool's token budget is
+   reached; the last one is truncated if enough of the budget is left.
+
+Chunks keep their title, source, section and pages, so citations still work.
+
+Configuration (see `rag.config.RagSettings`):
+- CONTEXT_PACKING_ENABLED: Pack retrieval results (default true)
+- CONTEXT_COMPRESSION: Also compress chunks to relevant sentences (default false)
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+
+from .adaptive_depth import estimate_tokens
+from .retrieval_memo import query_terms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+# Shortest overlap, in words, that makes two chunks adjacent
+_MIN_OVERLAP_WORDS = 8
+_MAX_OVERLAP_WORDS = 150
+# The last chunk is truncated rather than dropped if this many tokens are left
+_MIN_TRUNCATED_TOKENS = 60
+
+_CHUNK_NUMBER = re.compile(r"#(\d+)$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[tuple[str, ...]]:
+    """Returns the word n-grams of a text, or the whole text for shorter texts."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def remove_near_duplicates(chunks: list[dict], threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> list[dict]:
+    """
+    Drop chunks whose shingles mostly match an earlier (closer) chunk's.
+
+    Exact shingle sets are compared; at the tens of chunks a retrieval
+    returns, this is cheaper than estimating the overlap with MinHash.
+
+    Args:
+        chunks (list): Chunks in retrieval order
+        threshold (float): Jaccard similarity at which a chunk is dropped
+
+    Returns:
+        list: The remaining chunks, in order
+    """
+    kept: list[tuple[dict, set]] = []
+    for chunk in chunks:
+        chunk_shingles = shingles(chunk.get("text") or "")
+        if all(_jaccard(chunk_shingles, other) < threshold for _, other in kept):
+            kept.append((chunk, chunk_shingles))
+    return [chunk for chunk, _ in kept]
+
+
+def _chunk_number(chunk: dict) -> int | None:
+    match = _CHUNK_NUMBER.search(str(chunk.get("id") or ""))
+    return int(match.group(1)) if match else None
+
+
+def _body_words(chunk: dict) -> list[str]:
+    """Words of a chunk's text without the leading section heading."""
+    text = chunk.get("text") or ""
+    section = chunk.get("section")
+    if section and text.startswith(section):
+        text = text[len(section):]
+    return text.split()
+
+
+def _join(first: dict, second: dict) -> dict | None:
+    """Merges `second` after `first` if they are adjacent, else returns None."""
+    first_number, second_number = _chunk_number(first), _chunk_number(second)
+    first_words = (first.get("text") or "").split()
+    second_words = _body_words(second)
+    overlap = 0
+    for size in range(min(_MAX_OVERLAP_WORDS, len(first_words), len(second_words)), 0, -1):
+        if first_words[-size:] == second_words[:size]:
+            overlap = size
+            break
+    consecutive = first_number is not None and second_number == first_number + 1
+    if not consecutive and overlap < _MIN_OVERLAP_WORDS:
+        return None
+    merged = dict(first)
+    merged["text"] = " ".join([first.get("text") or "", *second_words[overlap:]]).strip()
+    pages = [chunk.get(key) for chunk in (first, second) for key in ("page", "page_end") if chunk.get(key)]
+    if pages:
+        merged["page"], merged["page_end"] = min(pages), max(pages)
+    distances = [chunk["distance"] for chunk in (first, second) if chunk.get("distance") is not None]
+    if distances:
+        merged["distance"] = min(distances)
+    return merged
+
+
+def merge_adjacent(chunks: list[dict]) -> list[dict]:
+    """
+    Merge adjacent chunks of the same document and section.
+
+    A merged chunk takes the place of its best-ranked part.
+
+    Args:
+        chunks (list): Chunks in retrieval order
+
+    Returns:
+        list: Chunks with adjacent ones merged, in order
+    """
+    def key(chunk: dict) -> tuple:
+        return chunk.get("source_uri") or chunk.get("title"), chunk.get("section")
+
+    merged_chunks = []
+    consumed: set[int] = set()
+    for i, chunk in enumerate(chunks):
+        if i in consumed:
+            continue
+        merged = chunk
+        changed = True
+        while changed:
+            changed = False
+            for j in range(i + 1, len(chunks)):
+                if j in consumed or key(chunks[j]) != key(chunk):
+                    continue
+                joined = _join(merged, chunks[j]) or _join(chunks[j], merged)
+                if joined:
+                    merged = {**joined, "id": merged.get("id", joined.get("id"))}
+                    consumed.add(j)
+                    changed = True
+        merged_chunks.append(merged)
+    return merged_chunks
+
+
+def compress(chunk: dict, terms: frozenset[str], min_sentences: int = 2) -> dict:
+    """
+    Reduce a chunk to its heading and the sentences mentioning the query terms.
+
+    Args:
+        chunk (dict): The chunk
+        terms (frozenset): Query terms, from `query_terms`
+        min_sentences (int): Leading sentences kept when none mention a term
+
+    Returns:
+        dict: The chunk with its text compressed
+    """
+    text = chunk.get("text") or ""
+    heading = ""
+    section = chunk.get("section")
+    if section and text.startswith(section):
+        heading, text = section, text[len(section):].strip()
+    sentences = _SENTENCE_END.split(text)
+    relevant = [sentence for sentence in sentences if terms & set(_WORD.findall(sentence.lower()))]
+    kept = relevant or sentences[:min_sentences]
+    return {**chunk, "text": "\n".join(filter(None, [heading, " ".join(kept)]))}
+
+
+def fit_budget(chunks: list[dict], token_budget: int) -> list[dict]:
+    """
+    Keep chunks in order until the token budget is used up.
+
+    Args:
+        chunks (list): Chunks in order of relevance
+        token_budget (int): Maximum estimated tokens of chunk texts
+
+    Returns:
+        list: The chunks that fit, the last one possibly truncated
+    """
+    fitted, used = [], 0
+    for chunk in chunks:
+        text = chunk.get("text") or ""
+        tokens = estimate_tokens(text)
+        if used + tokens <= token_budget:
+            fitted.append(chunk)
+            used += tokens
+            continue
+        remaining = token_budget - used
+        if remaining >= _MIN_TRUNCATED_TOKENS:
+            fitted.append({**chunk, "text": text[:remaining * 4].rsplit(" ", 1)[0] + " …"})
+        break
+    return fitted
+
+
+@dataclass
+class PackStats:
+    """Size of one retrieval result before and after packing."""
+
+    chunks_in: int
+    chunks_out: int
+    tokens_in: int
+    tokens_out: int
+
+
+class ContextPacker:
+    """Deduplicates, merges, optionally compresses and budgets retrieved chunks."""
+
+    def __init__(
+        self,
+        token_budget: int | None = None,
+        compress: bool = False,
+        duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+    ):
+        """
+        Args:
+            token_budget (int, optional): Maximum estimated tokens of packed
+                chunks; unlimited if None
+            compress (bool): Reduce chunks to their query-relevant sentences
+            duplicate_threshold (float): Shingle similarity at which a chunk
+                counts as a duplicate
+        """
+        self.token_budget = token_budget
+        self.compress = compress
+        self.duplicate_threshold = duplicate_threshold
+
+    def pack(self, query: str, chunks: list[dict]) -> tuple[list[dict], PackStats]:
+        """
+        Pack the chunks retrieved for a query.
+
+        Args:
+            query (str): The retrieval query
+            chunks (list): Retrieved chunks in order of relevance
+
+        Returns:
+            tuple: The packed chunks and the packing statistics
+        """
+        tokens_in = sum(estimate_tokens(chunk.get("text") or "") for chunk in chunks)
+        packed = merge_adjacent(remove_near_duplicates(chunks, self.duplicate_threshold))
+        if self.compress:
+            terms = query_terms(query)
+            packed = [compress(chunk, terms) for chunk in packed]
+        if self.token_budget is not None:
+            packed = fit_budget(packed, self.token_budget)
+        stats = PackStats(
+            chunks_in=len(chunks),
+            chunks_out=len(packed),
+            tokens_in=tokens_in,
+            tokens_out=sum(estimate_tokens(chunk.get("text") or "") for chunk in packed),
+        )
+        logger.debug(
+            "Packed %d chunks (~%d tokens) into %d (~%d tokens) for %r",
+            stats.chunks_in, stats.tokens_in, stats.chunks_out, stats.tokens_out, query,
+        )
+        return packed, stats
@@ -0,0 +1,158 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Cached Corpus Resolution
+
+Finding a corpus by display name with `rag.list_corpora()` pages through
+every corpus in the project. `CorpusResolver` keeps a local index of
+display name -> resource name per project and location, next to the `.env`
+file, and checks a remembered corpus with a single `rag.get_corpus` call.
+Only names that are not in the index, or whose corpus was deleted or
+renamed, trigger a scan, and one scan resolves all of them.
+
+Used by `prepare_corpus_and_data.create_or_get_corpus`.
+"""
+
+import json
+import os
+import re
+from typing import Any, Callable, Iterable
+
+from google.api_core.exceptions import NotFound
+
+_NOT_FOUND_MESSAGE = re.compile(r"NOT_FOUND|^404\b|\b404 Not Found", re.IGNORECASE)
+
+
+def is_not_found(error: BaseException) -> bool:
+    """
+    True if a corpus lookup failed because the corpus does not exist.
+
+    `rag.get_corpus` wraps the API's `NotFound` in a `RuntimeError`, with the
+    original error as `__cause__` and in its arguments.
+    """
+    pending, seen = [error], set()
+    while pending:
+        error = pending.pop()
+        if error is None or id(error) in seen:
+            continue
+        seen.add(id(error))
+        if isinstance(error, NotFound) or getattr(error, "code", None) == 404:
+            return True
+        if any(isinstance(arg, str) and _NOT_FOUND_MESSAGE.search(arg) for arg in error.args):
+            return True
+        pending += [arg for arg in error.args if isinstance(arg, BaseException)]
+        pending += [error.__cause__, error.__context__]
+    return False
+
+
+class CorpusResolver:
+    """Resolves corpus display names to corpora, backed by a local index."""
+
+    def __init__(
+        self,
+        index_path: str | None,
+        scope: str,
+        get_corpus: Callable[[str], Any],
+        list_corpora: Callable[[], Iterable[Any]],
+    ):
+        """
+        Create a resolver.
+
+        Args:
+            index_path (str, optional): JSON index file; kept in memory only if None
+            scope (str): Project and location the names belong to, e.g.
+                "my-project/us-central1"
+            get_corpus (callable): Fetches a corpus by resource name, raising
+                an error recognised by `is_not_found` if it does not exist
+            list_corpora (callable): Lists every corpus in the scope
+        """
+        self.index_path = index_path
+        self.scope = scope
+        self._get_corpus = get_corpus
+        self._list_corpora = list_corpora
+        self._index: dict[str, dict[str, str]] = {}
+        if index_path and os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                self._index = json.load(f)
+        self.scans = 0
+
+    @property
+    def _names(self) -> dict[str, str]:
+        return self._index.setdefault(self.scope, {})
+
+    def resolve(self, display_name: str) -> Any | None:
+        """Returns the corpus with this display name, or None if there is none."""
+        return self.resolve_many([display_name])[display_name]
+
+    def resolve_many(self, display_names: Iterable[str]) -> dict[str, Any | None]:
+        """
+        Resolve several display names, scanning the project at most once.
+
+        Args:
+            display_names (iterable): Display names to resolve
+
+        Returns:
+            dict: Display name -> corpus, or None for names without a corpus
+        """
+        resolved: dict[str, Any | None] = {}
+        missing = set()
+        for display_name in dict.fromkeys(display_names):
+            corpus = self._lookup(display_name)
+            if corpus is None:
+                missing.add(display_name)
+            else:
+                resolved[display_name] = corpus
+
+        if missing:
+            self.scans += 1
+            for corpus in self._list_corpora():
+                if corpus.display_name in missing:
+                    missing.discard(corpus.display_name)
+                    resolved[corpus.display_name] = corpus
+                    self._names[corpus.display_name] = corpus.name
+                    if not missing:
+                        break
+            for display_name in missing:
+                resolved[display_name] = None
+                self._names.pop(display_name, None)
+            self._save()
+        return resolved
+
+    def remember(self, corpus: Any) -> None:
+        """Adds a corpus to the index, e.g. right after creating it."""
+        self._names[corpus.display_name] = corpus.name
+        self._save()
+
+    def _lookup(self, display_name: str) -> Any | None:
+        """Validates an indexed corpus with one `get_corpus` call."""
+        resource_name = self._names.get(display_name)
+        if resource_name is None:
+            return None
+        try:
+            corpus = self._get_corpus(resource_name)
+        except Exception as e:
+            if not is_not_found(e):
+                raise
+            return None
+        # A renamed corpus no longer answers to this display name
+        return corpus if corpus.display_name == display_name else None
+
+    def _save(self) -> None:
+        if not self.index_path:
+            return
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,260 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental Corpus Sync
+
+Keeps a RAG corpus in step with a local set of documents while only
+re-embedding what changed. A local sync state file remembers the content
+hash and RAG file of every document the sync uploaded. Each run diffs the
+local files against that state and against `rag.list_files`, then:
+- uploads files that are new, changed, or missing from the corpus,
+- deletes the replaced RAG file once its new version is uploaded, and
+- deletes the RAG files of documents that were removed locally.
+
+Files in the corpus that the sync never uploaded are left alone, unless they
+share a display name with a local document, in which case they are replaced.
+
+Used by `prepare_corpus_and_data.py --sync`.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from .bulk_ingest import AdaptiveRateLimiter, IngestItem, IngestSummary, ingest
+
+
+def hash_file(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SyncState:
+    """Content hashes and RAG files of synced documents, persisted as JSON.
+
+    Uploads are recorded as they finish, so an interrupted sync loses no work.
+    """
+
+    def __init__(self, path: str | None):
+        """
+        Load the sync state.
+
+        Args:
+            path (str, optional): JSON file; kept in memory only if None
+        """
+        self.path = path
+        # corpus name -> display name -> {"path", "sha256", "rag_file"}
+        self._corpora: dict[str, dict[str, dict]] = {}
+        # (path, size and mtime) -> content hash
+        self._hashes: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._corpora = json.load(f)
+
+    def content_hash(self, item: IngestItem) -> str:
+        """Hashes a file, reusing the hash while its size and mtime are unchanged."""
+        key = (item.path, item.signature)
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached is None:
+            cached = hash_file(item.path)
+            with self._lock:
+                self._hashes[key] = cached
+        return cached
+
+    def entries(self, corpus_name: str) -> dict[str, dict]:
+        """Returns a copy of the synced documents of a corpus by display name."""
+        with self._lock:
+            return dict(self._corpora.get(corpus_name, {}))
+
+    def is_done(self, corpus_name: str, item: IngestItem) -> bool:
+        """True if this content was already uploaded under the item's display name."""
+        entry = self.entries(corpus_name).get(item.display_name)
+        return entry is not None and entry["sha256"] == self.content_hash(item)
+
+    def record(self, corpus_name: str, item: IngestItem, rag_file_name: str | None) -> None:
+        """Records an uploaded document."""
+        entry = {"path": item.path, "sha256": self.content_hash(item), "rag_file": rag_file_name}
+        with self._lock:
+            self._corpora.setdefault(corpus_name, {})[item.display_name] = entry
+            self._save()
+
+    def forget(self, corpus_name: str, display_name: str) -> None:
+        """Drops a document that was deleted from the corpus."""
+        with self._lock:
+            self._corpora.get(corpus_name, {}).pop(display_name, None)
+            self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._corpora, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class SyncPlan:
+    """What a sync has to change in the corpus."""
+
+    # Items to upload, with the RAG files they replace
+    uploads: list[tuple[IngestItem, list[str]]] = field(default_factory=list)
+    # Display names and RAG files of documents removed locally
+    removals: list[tuple[str, list[str]]] = field(default_factory=list)
+    unchanged: int = 0
+
+
+def plan_sync(
+    corpus_name: str,
+    items: list[IngestItem],
+    remote_files: list[Any],
+    state: SyncState,
+) -> SyncPlan:
+    """
+    Diff local documents against the sync state and the corpus.
+
+    Args:
+        corpus_name (str): Resource name of the corpus
+        items (list): The local documents the corpus should contain
+        remote_files (list): RAG files from `rag.list_files`, with `name`
+            and `display_name`
+        state (SyncState): Documents uploaded by earlier syncs
+
+    Returns:
+        SyncPlan: Uploads, removals and the number of unchanged documents
+    """
+    remote_by_display_name: dict[str, list[str]] = {}
+    for remote_file in remote_files:
+        remote_by_display_name.setdefault(remote_file.display_name, []).append(remote_file.name)
+
+    plan = SyncPlan()
+    entries = state.entries(corpus_name)
+    for item in items:
+        remote_names = remote_by_display_name.get(item.display_name, [])
+        entry = entries.get(item.display_name)
+        if state.is_done(corpus_name, item) and remote_names == [entry["rag_file"]]:
+            plan.unchanged += 1
+        else:
+            plan.uploads.append((item, remote_names))
+
+    local_names = {item.display_name for item in items}
+    for display_name, entry in entries.items():
+        if display_name not in local_names:
+            plan.removals.append((display_name, remote_by_display_name.get(display_name, [])))
+    return plan
+
+
+@dataclass
+class SyncSummary:
+    """Outcome of a sync run."""
+
+    unchanged: int
+    ingest: IngestSummary
+    deleted: int = 0
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def format(self) -> str:
+        """Renders the summary for the console."""
+        lines = [
+            f"Sync: {self.unchanged} unchanged, {self.ingest.uploaded} uploaded, "
+            f"{self.deleted} RAG files deleted",
+            self.ingest.format(),
+        ]
+        lines.extend(f"  FAILED delete {name}: {error}" for name, error in self.errors.items())
+        return "\n".join(lines)
+
+
+def sync_corpus(
+    corpus_name: str,
+    items: list[IngestItem],
+    remote_files: list[Any],
+    upload: Callable[[IngestItem], Any],
+    delete: Callable[[str], None],
+    state: SyncState,
+    concurrency: int = 4,
+    limiter: AdaptiveRateLimiter | None = None,
+    delete_removed: bool = True,
+) -> SyncSummary:
+    """
+    Bring the corpus in line with the local documents.
+
+    A replaced RAG file is only deleted after its new version is uploaded, so
+    a document never disappears from the corpus because of a failed upload.
+
+    Args:
+        corpus_name (str): Resource name of the corpus
+        items (list): The local documents the corpus should contain
+        remote_files (list): RAG files currently in the corpus
+        upload (callable): Uploads one item and returns the created RAG file
+        delete (callable): Deletes a RAG file by resource name
+        state (SyncState): Sync state, updated as changes are applied
+        concurrency (int): Maximum number of uploads in flight
+        limiter (AdaptiveRateLimiter, optional): Shared request pacer
+        delete_removed (bool): Delete documents missing locally; disable when
+            the local list may be incomplete, e.g. after failed downloads
+
+    Returns:
+        SyncSummary: Counts and errors
+    """
+    limiter = limiter or AdaptiveRateLimiter()
+    plan = plan_sync(corpus_name, items, remote_files, state)
+
+    # The plan already decided what to upload; an empty checkpoint keeps
+    # ingest from skipping documents whose RAG file went missing remotely.
+    ingest_summary = ingest(
+        corpus_name,
+        [item for item, _ in plan.uploads],
+        lambda item: _upload_and_record(upload, state, corpus_name, item),
+        concurrency=concurrency,
+        limiter=limiter,
+    )
+    summary = SyncSummary(unchanged=plan.unchanged, ingest=ingest_summary)
+
+    def delete_all(names: list[str]) -> bool:
+        ok = True
+        for name in names:
+            limiter.acquire()
+            try:
+                delete(name)
+                summary.deleted += 1
+            except Exception as e:
+                summary.errors[name] = str(e)
+                ok = False
+        return ok
+
+    for item, replaced in plan.uploads:
+        if item.path not in ingest_summary.errors:
+            new_name = state.entries(corpus_name)[item.display_name]["rag_file"]
+            delete_all([name for name in replaced if name != new_name])
+    if delete_removed:
+        for display_name, names in plan.removals:
+            if delete_all(names):
+                state.forget(corpus_name, display_name)
+    return summary
+
+
+def _upload_and_record(upload, state: SyncState, corpus_name: str, item: IngestItem):
+    rag_file = upload(item)
+    state.record(corpus_name, item, getattr(rag_file, "name", None))
+    return rag_file
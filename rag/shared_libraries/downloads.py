@@ -0,0 +1,422 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parallel, Resumable Document Downloads
+
+Fetches the documents to ingest before they are uploaded to the corpus.
+Used by `prepare_corpus_and_data.py --urls`.
+
+- Many URLs are fetched concurrently over one pooled `requests.Session`.
+- Data is written to `<file>.part`; an interrupted download resumes with a
+  Range request, guarded by If-Range so a changed file starts over.
+- Large files on servers that accept byte ranges are split into segments
+  fetched in parallel.
+- A `<file>.meta.json` sidecar stores the ETag, Last-Modified and SHA-256 of
+  each finished file. A file whose ETag/Last-Modified still match is not
+  downloaded again, and an expected SHA-256 is verified after each download.
+- Servers that reject HEAD with a 4xx (e.g. presigned S3/GCS GET URLs) get
+  one plain GET instead, without ranges or segments; the version is taken
+  from the GET response headers.
+- `download_all` yields files as they finish, so uploads can start before
+  the last download completes. Documents that would share a file name
+  (e.g. two URLs ending in /report.pdf) are rejected up front.
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator
+from urllib.parse import unquote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .bulk_ingest import IngestItem
+
+
+class ChecksumMismatch(Exception):
+    """Raised when a downloaded file does not match its expected SHA-256."""
+
+
+@dataclass
+class DownloadSpec:
+    """A document to download and how it is named in the corpus."""
+
+    url: str
+    filename: str | None = None
+    sha256: str | None = None
+    display_name: str | None = None
+    description: str = ""
+
+    @property
+    def local_name(self) -> str:
+        """File name the document is stored under."""
+        name = self.filename or os.path.basename(unquote(urlparse(self.url).path))
+        return name or hashlib.sha256(self.url.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of one download."""
+
+    spec: DownloadSpec
+    path: str
+    # "downloaded", "resumed", "unchanged" or "failed"
+    status: str
+    bytes_transferred: int = 0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "failed"
+
+    def to_ingest_item(self) -> IngestItem:
+        """The downloaded file as an upload for `bulk_ingest.ingest`."""
+        return IngestItem(
+            path=self.path,
+            display_name=self.spec.display_name or self.spec.local_name,
+            description=self.spec.description,
+        )
+
+
+def read_url_list(path: str) -> list[DownloadSpec]:
+    """
+    Read the documents to download from a JSONL file.
+
+    Each line is an object with a "url" and optionally a "filename",
+    "sha256", "display_name" and "description".
+
+    Args:
+        path (str): Path to the JSONL file
+
+    Returns:
+        list: Download specs in file order
+    """
+    specs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                specs.append(
+                    DownloadSpec(
+                        url=entry["url"],
+                        filename=entry.get("filename"),
+                        sha256=entry.get("sha256"),
+                        display_name=entry.get("display_name"),
+                        description=entry.get("description", ""),
+                    )
+                )
+    return specs
+
+
+def _sha256_of(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Downloader:
+    """Downloads documents concurrently into a directory."""
+
+    def __init__(
+        self,
+        dest_dir: str,
+        session: requests.Session | None = None,
+        max_workers: int = 4,
+        segment_size: int = 8 << 20,
+        max_segments: int = 4,
+        chunk_size: int = 1 << 20,
+        max_attempts: int = 3,
+        backoff_seconds: float = 1.0,
+        timeout: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Create a downloader.
+
+        Args:
+            dest_dir (str): Directory files are written to
+            session (requests.Session, optional): Session to use; a pooled
+                session sized for the workers and segments by default
+            max_workers (int): Files downloaded at the same time
+            segment_size (int): Minimum bytes per segment; files of at least
+                two segments are split when the server accepts byte ranges
+            max_segments (int): Maximum parallel segments per file
+            chunk_size (int): Bytes read from the network per write
+            max_attempts (int): Attempts per file before it is reported as failed
+            backoff_seconds (float): Wait before the first retry, doubled per retry
+            timeout (float): Connect/read timeout per request in seconds
+            sleep (callable): Sleep function, replaceable in tests
+        """
+        self.dest_dir = dest_dir
+        self.max_workers = max_workers
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.chunk_size = chunk_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self._sleep = sleep
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers * max_segments)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        os.makedirs(dest_dir, exist_ok=True)
+
+    def download_all(self, specs: Iterable[DownloadSpec]) -> Iterator[DownloadResult]:
+        """
+        Download documents concurrently.
+
+        Args:
+            specs (iterable): Documents to download
+
+        Yields:
+            DownloadResult: One result per document, in completion order
+
+        Raises:
+            ValueError: If two documents would be stored under the same file
+                name; give them distinct `filename`s
+        """
+        specs = list(specs)
+        urls_by_name: dict[str, list[str]] = {}
+        for spec in specs:
+            urls_by_name.setdefault(spec.local_name, []).append(spec.url)
+        duplicates = {name: urls for name, urls in urls_by_name.items() if len(urls) > 1}
+        if duplicates:
+            details = "; ".join(f"{name}: {', '.join(urls)}" for name, urls in sorted(duplicates.items()))
+            raise ValueError(f"Several documents would be stored under the same file name ({details}).")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.download, spec) for spec in specs]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def download(self, spec: DownloadSpec) -> DownloadResult:
+        """
+        Download one document, retrying transient failures.
+
+        Args:
+            spec (DownloadSpec): The document
+
+        Returns:
+            DownloadResult: The outcome; failures are reported, not raised
+        """
+        path = os.path.join(self.dest_dir, spec.local_name)
+        error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                self._sleep(self.backoff_seconds * 2 ** (attempt - 1))
+            try:
+                return self._download_once(spec, path)
+            except requests.HTTPError as e:
+                error = str(e)
+                status = e.response.status_code if e.response is not None else 0
+                if status < 500 and status != 429:
+                    break
+            except (requests.RequestException, ChecksumMismatch, OSError) as e:
+                error = str(e)
+        return DownloadResult(spec=spec, path=path, status="failed", error=error)
+
+    def _download_once(self, spec: DownloadSpec, path: str) -> DownloadResult:
+        part_path = f"{path}.part"
+        meta_path = f"{path}.meta.json"
+        meta = self._read_meta(meta_path)
+
+        head = self.session.head(spec.url, allow_redirects=True, timeout=self.timeout)
+        if 400 <= head.status_code < 500 and head.status_code != 429:
+            # Some servers reject HEAD (e.g. 403/405 from presigned S3 or GCS
+            # GET URLs); fall back to one plain GET
+            return self._download_plain(spec, path, meta)
+        head.raise_for_status()
+        version, size = self._remote_version(head)
+        accepts_ranges = head.headers.get("Accept-Ranges", "").lower() == "bytes"
+        same_version = self._same_version(meta, version, size)
+
+        if same_version and self._is_complete(spec, path, meta):
+            return DownloadResult(spec=spec, path=path, status="unchanged")
+
+        if not same_version or meta.get("complete"):
+            meta = {**version, "size": size, "complete": False}
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            self._write_meta(meta_path, meta)
+
+        if accepts_ranges and size is not None and size >= 2 * self.segment_size:
+            transferred, resumed = self._download_segments(spec, part_path, meta_path, meta, size)
+        else:
+            transferred, resumed = self._download_stream(spec, part_path, meta, accepts_ranges)
+        return self._finish(spec, path, meta, size, transferred, resumed)
+
+    def _download_plain(self, spec: DownloadSpec, path: str, meta: dict) -> DownloadResult:
+        """Downloads in one GET without ranges, taking the version from its headers."""
+        part_path = f"{path}.part"
+        with self.session.get(spec.url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            version, size = self._remote_version(response)
+            if self._same_version(meta, version, size) and self._is_complete(spec, path, meta):
+                return DownloadResult(spec=spec, path=path, status="unchanged")
+            meta = {**version, "size": size, "complete": False}
+            self._write_meta(f"{path}.meta.json", meta)
+            transferred = 0
+            with open(part_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                    transferred += len(chunk)
+        return self._finish(spec, path, meta, size, transferred, resumed=False)
+
+    def _finish(
+        self, spec: DownloadSpec, path: str, meta: dict, size: int | None, transferred: int, resumed: bool
+    ) -> DownloadResult:
+        """Verifies the `.part` file and moves it into place."""
+        part_path = f"{path}.part"
+        meta_path = f"{path}.meta.json"
+        if size is not None and os.path.getsize(part_path) != size:
+            # Keep the partial file; the retry resumes it
+            raise requests.RequestException(f"{spec.url}: download ended early")
+        sha256 = _sha256_of(part_path)
+        if spec.sha256 and sha256 != spec.sha256.lower():
+            os.remove(part_path)
+            os.remove(meta_path)
+            raise ChecksumMismatch(f"{spec.url}: expected sha256 {spec.sha256}, got {sha256}")
+        os.replace(part_path, path)
+        self._write_meta(meta_path, {**meta, "sha256": sha256, "complete": True})
+        return DownloadResult(
+            spec=spec,
+            path=path,
+            status="resumed" if resumed else "downloaded",
+            bytes_transferred=transferred,
+        )
+
+    def _download_stream(
+        self, spec: DownloadSpec, part_path: str, meta: dict, accepts_ranges: bool
+    ) -> tuple[int, bool]:
+        """Downloads in one request, continuing an existing `.part` file if possible."""
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {}
+        validator = meta.get("etag") or meta.get("last_modified")
+        if offset and accepts_ranges and validator:
+            headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+        with self.session.get(spec.url, headers=headers, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            # 206: the server honoured the range; 200: the whole file is sent
+            resumed = response.status_code == 206
+            transferred = 0
+            with open(part_path, "ab" if resumed else "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                    transferred += len(chunk)
+        return transferred, resumed
+
+    def _download_segments(
+        self, spec: DownloadSpec, part_path: str, meta_path: str, meta: dict, size: int
+    ) -> tuple[int, bool]:
+        """Downloads byte ranges in parallel, skipping segments finished earlier."""
+        count = min(self.max_segments, math.ceil(size / self.segment_size))
+        bounds = [(size * i // count, size * (i + 1) // count - 1) for i in range(count)]
+        if meta.get("segment_count") != count or not os.path.exists(part_path):
+            meta["segment_count"] = count
+            meta["segments_done"] = []
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+            self._write_meta(meta_path, meta)
+        done = set(meta["segments_done"])
+        resumed = bool(done)
+        validator = meta.get("etag") or meta.get("last_modified")
+        meta_lock = threading.Lock()
+
+        def fetch(index: int) -> int:
+            start, end = bounds[index]
+            headers = {"Range": f"bytes={start}-{end}"}
+            if validator:
+                headers["If-Range"] = validator
+            transferred = 0
+            with self.session.get(spec.url, headers=headers, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    # The file changed since HEAD; start over on the next attempt
+                    with meta_lock:
+                        meta["segments_done"] = []
+                        meta["segment_count"] = None
+                        self._write_meta(meta_path, meta)
+                    raise requests.RequestException(f"{spec.url}: server ignored the byte range")
+                with open(part_path, "r+b") as f:
+                    f.seek(start)
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        f.write(chunk)
+                        transferred += len(chunk)
+            if transferred != end - start + 1:
+                raise requests.RequestException(f"{spec.url}: segment {index} was truncated")
+            with meta_lock:
+                meta["segments_done"].append(index)
+                self._write_meta(meta_path, meta)
+            return transferred
+
+        pending = [index for index in range(count) if index not in done]
+        with ThreadPoolExecutor(max_workers=len(pending) or 1) as executor:
+            transferred = sum(executor.map(fetch, pending))
+        return transferred, resumed
+
+    @staticmethod
+    def _remote_version(response: requests.Response) -> tuple[dict, int | None]:
+        """The version validators and size from a HEAD or GET response."""
+        version = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        size = int(response.headers["Content-Length"]) if "Content-Length" in response.headers else None
+        return version, size
+
+    @staticmethod
+    def _is_complete(spec: DownloadSpec, path: str, meta: dict) -> bool:
+        """True if the local file finished downloading and matches the expected checksum."""
+        return bool(
+            meta.get("complete")
+            and os.path.exists(path)
+            and (spec.sha256 is None or meta.get("sha256") == spec.sha256.lower())
+        )
+
+    @staticmethod
+    def _same_version(meta: dict, version: dict, size: int | None) -> bool:
+        """True if the remote file is the one described by the local metadata."""
+        if not meta or meta.get("size") != size:
+            return False
+        if version["etag"] and meta.get("etag"):
+            return version["etag"] == meta["etag"]
+        if version["last_modified"] and meta.get("last_modified"):
+            return version["last_modified"] == meta["last_modified"]
+        return False
+
+    @staticmethod
+    def _read_meta(meta_path: str) -> dict:
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _write_meta(meta_path: str, meta: dict) -> None:
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Text Embedders
+
+Embedders turn texts into L2-normalized NumPy vectors, so cosine similarity
+is a plain dot product. Two implementations are provided:
+- VertexTextEmbedder: Vertex AI text-embedding-004, the model the RAG corpus
+  is embedded with
+- HashingEmbedder: A deterministic feature-hashing embedder that needs no
+  network access, for offline runs and tests
+
+Configuration (see `rag.config.RagSettings`):
+- EMBEDDING_BACKEND: "vertex" (default) or "hashing"
+- EMBEDDING_MODEL: Vertex AI embedding model (default text-embedding-004)
+"""
+
+import hashlib
+import re
+import threading
+
+import numpy as np
+
+from ..config import get_settings
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VertexTextEmbedder:
+    """Embeds texts with a Vertex AI text embedding model."""
+
+    def __init__(self, model_name: str = "text-embedding-004", batch_size: int = 64):
+        """
+        Create a Vertex AI embedder. The model is loaded on first use.
+
+        Args:
+            model_name (str): Vertex AI embedding model name
+            batch_size (int): Maximum number of texts sent per request
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+        self._lock = threading.Lock()
+
+    def spec(self) -> dict:
+        """Describes this embedder so an index can recreate it, see `embedder_from_spec`."""
+        return {"backend": "vertex", "model": self.model_name}
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                from vertexai.language_models import TextEmbeddingModel
+
+                self._model = TextEmbeddingModel.from_pretrained(self.model_name)
+            return self._model
+
+    def embed(self, texts: list[str], task_type: str = "RETRIEVAL_QUERY") -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts (list): Texts to embed
+            task_type (str): Vertex AI task type, e.g. RETRIEVAL_QUERY for
+                questions and RETRIEVAL_DOCUMENT for corpus chunks
+
+        Returns:
+            np.ndarray: One L2-normalized float32 row per text
+        """
+        from vertexai.language_models import TextEmbeddingInput
+
+        model = self._get_model()
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = [
+                TextEmbeddingInput(text=text, task_type=task_type)
+                for text in texts[start : start + self.batch_size]
+            ]
+            vectors.extend(embedding.values for embedding in model.get_embeddings(batch))
+        return _normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder using the hashing trick."""
+
+    def __init__(self, dimensions: int = 512):
+        """
+        Create a hashing embedder.
+
+        Args:
+            dimensions (int): Size of the embedding vectors
+        """
+        self.dimensions = dimensions
+
+    def spec(self) -> dict:
+        """Describes this embedder so an index can recreate it, see `embedder_from_spec`."""
+        return {"backend": "hashing", "dimensions": self.dimensions}
+
+    def embed(self, texts: list[str], task_type: str = "RETRIEVAL_QUERY") -> np.ndarray:
+        """
+        Embed texts by hashing their unigrams and bigrams into signed buckets.
+
+        Args:
+            texts (list): Texts to embed
+            task_type (str): Ignored; accepted for interface compatibility
+
+        Returns:
+            np.ndarray: One L2-normalized float32 row per text
+        """
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                sign = 1.0 if value & 1 else -1.0
+                matrix[row, (value >> 1) % self.dimensions] += sign
+        return _normalize_rows(matrix)
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """
+    Get the process-wide embedder selected by EMBEDDING_BACKEND.
+
+    Returns:
+        VertexTextEmbedder | HashingEmbedder: The shared embedder
+
+    Raises:
+        ValueError: If EMBEDDING_BACKEND names an unknown backend
+    """
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            settings = get_settings()
+            backend = settings.embedding_backend
+            if backend == "vertex":
+                _embedder = VertexTextEmbedder(settings.embedding_model)
+            elif backend == "hashing":
+                _embedder = HashingEmbedder()
+            else:
+                raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'. Use 'vertex' or 'hashing'.")
+        return _embedder
+
+
+def embedder_from_spec(spec: dict):
+    """
+    Recreate the embedder described by an embedder's `spec()`.
+
+    Indexes store the spec of the embedder that built them, so queries are
+    always embedded into the same vector space as the documents.
+
+    Args:
+        spec (dict): Output of `VertexTextEmbedder.spec` or `HashingEmbedder.spec`
+
+    Returns:
+        VertexTextEmbedder | HashingEmbedder: The embedder
+
+    Raises:
+        ValueError: If the spec names an unknown backend
+    """
+    if spec["backend"] == "vertex":
+        return VertexTextEmbedder(spec["model"])
+    if spec["backend"] == "hashing":
+        return HashingEmbedder(spec["dimensions"])
+    raise ValueError(f"Unknown embedding backend '{spec['backend']}'")
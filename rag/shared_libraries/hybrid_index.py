@@ -0,0 +1,194 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Hybrid Keyword + Vector Retrieval
+
+RFP questions are full of exact terms ("evaluation criteria", "SLA", "NDA",
+section numbers) that pure vector search treats as loose hints. The hybrid
+backend searches the local index in two stages:
+1. A BM25 inverted index shortlists the chunks that share terms with the
+   query. Only the postings of the query's terms are touched, so the work
+   grows with the matches rather than with the corpus.
+2. Vector similarity is computed for the shortlist only, and the keyword and
+   vector rankings are merged with reciprocal rank fusion.
+
+Queries with no keyword match at all fall back to plain vector search.
+
+Select it with RETRIEVAL_BACKEND=hybrid; it reads the index built by
+`rag.shared_libraries.local_index`.
+
+Configuration (see `rag.config.RagSettings`):
+- HYBRID_SHORTLIST_SIZE: Chunks kept by the keyword stage (default 50)
+- HYBRID_RRF_K: Rank fusion constant; larger values flatten the ranks (default 60)
+"""
+
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+from .local_index import DEFAULT_TOP_K, LocalVectorIndex
+from .retrieval import RetrievalClient
+from .retrieval_cache import RetrievalCache
+
+# Keeps section numbers such as "4.2.1" as a single term
+_TERM = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+_SUFFIXES = ("ing", "ion", "ed", "es", "s")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or "
+    "our should that the their this to we what when where which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Returns the lower-cased, lightly stemmed terms of a text without stopwords."""
+    terms = []
+    for term in _TERM.findall(text.lower()):
+        if term in _STOPWORDS:
+            continue
+        for suffix in _SUFFIXES:
+            if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+                term = term[: -len(suffix)]
+                break
+        terms.append(term)
+    return terms
+
+
+class BM25Index:
+    """Inverted index over chunk texts with Okapi BM25 scoring."""
+
+    def __init__(self, texts: list[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            texts (list): One text per chunk; positions are the chunk ids
+            k1 (float): Term frequency saturation
+            b (float): Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+        postings: dict[str, tuple[list[int], list[int]]] = {}
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            terms = tokenize(text)
+            lengths[doc_id] = len(terms)
+            for term, count in Counter(terms).items():
+                doc_ids, counts = postings.setdefault(term, ([], []))
+                doc_ids.append(doc_id)
+                counts.append(count)
+
+        average_length = float(lengths.mean()) if self.size else 0.0
+        # Per-document denominator term, precomputed once for every query
+        self._length_norm = k1 * (1 - b + b * lengths / (average_length or 1.0))
+        self._postings = {
+            term: (np.asarray(doc_ids, dtype=np.int32), np.asarray(counts, dtype=np.float32))
+            for term, (doc_ids, counts) in postings.items()
+        }
+        self._idf = {
+            term: math.log(1 + (self.size - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            for term, (doc_ids, _) in self._postings.items()
+        }
+
+    def search(self, query: str, limit: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the chunks with the highest BM25 score for a query.
+
+        Args:
+            query (str): The query
+            limit (int): Maximum number of chunks returned
+
+        Returns:
+            tuple: Chunk ids and their scores, best first; empty if no chunk
+                contains a query term
+        """
+        accumulated = None
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+            doc_ids, counts = self._postings[term]
+            term_scores = self._idf[term] * counts * (self.k1 + 1) / (counts + self._length_norm[doc_ids])
+            if accumulated is None:
+                accumulated = np.zeros(self.size, dtype=np.float32)
+            np.add.at(accumulated, doc_ids, term_scores)
+
+        if accumulated is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        matched = np.flatnonzero(accumulated)
+        scores = accumulated[matched]
+        if len(matched) > limit:
+            keep = np.argpartition(-scores, limit - 1)[:limit]
+            matched, scores = matched[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return matched[order], scores[order]
+
+
+class HybridRagClient(RetrievalClient):
+    """Retrieval client combining a BM25 shortlist with vector scoring."""
+
+    def __init__(
+        self,
+        index: LocalVectorIndex,
+        shortlist_size: int = 50,
+        rrf_k: int = 60,
+        cache: RetrievalCache | None = None,
+    ):
+        """
+        Create a hybrid client over a local index.
+
+        Args:
+            index (LocalVectorIndex): Chunks and embeddings to search
+            shortlist_size (int): Chunks kept by the keyword stage
+            rrf_k (int): Reciprocal rank fusion constant
+            cache (RetrievalCache, optional): Result cache; no caching if None
+        """
+        super().__init__(cache)
+        self.index = index
+        self.keywords = BM25Index([chunk["text"] for chunk in index.chunks])
+        self.shortlist_size = shortlist_size
+        self.rrf_k = rrf_k
+        sources = sorted({chunk["source_uri"] for chunk in index.chunks})
+        self.corpora = [f"hybrid:{source}" for source in sources]
+
+    def _query(
+        self,
+        query: str,
+        similarity_top_k: int | None,
+        vector_distance_threshold: float | None,
+    ) -> list[dict]:
+        shortlist, _ = self.keywords.search(query, self.shortlist_size)
+        if not len(shortlist):
+            return self.index.search([query], similarity_top_k, vector_distance_threshold)[0]
+
+        query_embedding = self.index.embedder.embed([query], task_type="RETRIEVAL_QUERY")[0]
+        distances = 1.0 - self.index.embeddings[shortlist] @ query_embedding
+
+        # The shortlist is already in keyword order; rank it by vector distance too
+        keyword_ranks = np.arange(len(shortlist))
+        vector_ranks = np.empty(len(shortlist), dtype=np.int64)
+        vector_ranks[np.argsort(distances, kind="stable")] = keyword_ranks
+        fused = 1.0 / (self.rrf_k + 1 + keyword_ranks) + 1.0 / (self.rrf_k + 1 + vector_ranks)
+
+        hits = []
+        for position in np.argsort(-fused, kind="stable"):
+            distance = float(distances[position])
+            if vector_distance_threshold is not None and distance >= vector_distance_threshold:
+                continue
+            hits.append({**self.index.chunks[shortlist[position]], "distance": distance})
+            if len(hits) == (similarity_top_k or DEFAULT_TOP_K):
+                break
+        return hits
@@ -0,0 +1,256 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local In-Process Vector Index
+
+An offline alternative to Vertex AI RAG Engine. The index is built from the
+same guidelines PDF that `prepare_corpus_and_data.py` uploads, chunked by
+`pdf_chunker` (or from chunk files it wrote). Chunk embeddings are held in
+one NumPy matrix, and a batch of queries is answered with a single matrix
+product followed by a top-k selection.
+
+Distances follow Vertex AI RAG Engine's convention (cosine distance,
+1 - cosine similarity), so `similarity_top_k` and `vector_distance_threshold`
+mean the same thing for both backends.
+
+Build the index (run from the repository root):
+    python -m rag.shared_libraries.local_index
+    python -m rag.shared_libraries.local_index --pdf a.pdf --pdf b.pdf --embedding-backend hashing
+    python -m rag.shared_libraries.local_index --chunks chunks/a.chunks.jsonl
+
+Then select it with RETRIEVAL_BACKEND=local in `.env`.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from ..config import REPO_ROOT, get_settings
+from .embeddings import HashingEmbedder, VertexTextEmbedder, embedder_from_spec, get_embedder
+from .pdf_chunker import DEFAULT_CHUNK_SIZE, DEFAULT_OVERLAP, chunk_pdfs, read_chunk_file
+from .retrieval import RetrievalClient
+from .retrieval_cache import RetrievalCache
+
+GUIDELINES_PDF_PATH = os.path.join(REPO_ROOT, "Guideline of Digital Projects RFPs_1.pdf")
+
+DEFAULT_TOP_K = 10
+
+
+class LocalVectorIndex:
+    """Chunk texts and their embeddings, searchable by cosine distance."""
+
+    def __init__(self, chunks: list[dict], embeddings: np.ndarray, embedder):
+        """
+        Args:
+            chunks (list): Chunk dicts with "id", "title", "source_uri",
+                "section", "page" and "text"
+            embeddings (np.ndarray): One L2-normalized row per chunk
+            embedder: The embedder the rows were produced with
+        """
+        if len(chunks) != embeddings.shape[0]:
+            raise ValueError("Every chunk needs exactly one embedding row")
+        self.chunks = chunks
+        self.embeddings = embeddings.astype(np.float32, copy=False)
+        self.embedder = embedder
+
+    @classmethod
+    def build(
+        cls,
+        pdf_paths: list[str],
+        embedder=None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        overlap: int = DEFAULT_OVERLAP,
+        max_workers: int | None = None,
+    ) -> "LocalVectorIndex":
+        """
+        Parse, chunk and embed PDFs.
+
+        Args:
+            pdf_paths (list): PDFs to index
+            embedder (optional): Embedder for the chunks; the configured one
+                by default
+            chunk_size (int): Words per chunk
+            overlap (int): Words shared by consecutive chunks of a section
+            max_workers (int, optional): Processes used to parse the PDFs
+
+        Returns:
+            LocalVectorIndex: The index
+        """
+        results = chunk_pdfs(pdf_paths, chunk_size, overlap, max_workers)
+        return cls.from_chunks([chunk for chunks in results.values() for chunk in chunks], embedder)
+
+    @classmethod
+    def from_chunks(cls, chunks: list[dict], embedder=None) -> "LocalVectorIndex":
+        """
+        Embed ready-made chunks, e.g. read from `pdf_chunker` chunk files.
+
+        Args:
+            chunks (list): Chunk dicts with at least "title", "source_uri" and "text"
+            embedder (optional): Embedder for the chunks; the configured one
+                by default
+
+        Returns:
+            LocalVectorIndex: The index
+        """
+        embedder = embedder or get_embedder()
+        embeddings = embedder.embed([chunk["text"] for chunk in chunks], task_type="RETRIEVAL_DOCUMENT")
+        return cls(chunks, embeddings.reshape(len(chunks), -1), embedder)
+
+    def save(self, path: str) -> None:
+        """Writes the index to a compressed `.npz` file."""
+        metadata = {"embedder": self.embedder.spec(), "chunks": self.chunks}
+        with open(path, "wb") as f:
+            np.savez_compressed(f, embeddings=self.embeddings, metadata=np.array(json.dumps(metadata)))
+
+    @classmethod
+    def load(cls, path: str) -> "LocalVectorIndex":
+        """
+        Read an index written by `save`.
+
+        The query embedder is recreated from the spec stored in the index, so
+        queries and chunks share one vector space.
+
+        Raises:
+            FileNotFoundError: If the index has not been built
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Local index not found at {path}. "
+                "Build it with: python -m rag.shared_libraries.local_index"
+            )
+        with np.load(path) as data:
+            metadata = json.loads(str(data["metadata"]))
+            embeddings = data["embeddings"]
+        return cls(metadata["chunks"], embeddings, embedder_from_spec(metadata["embedder"]))
+
+    def search(
+        self,
+        queries: list[str],
+        similarity_top_k: int | None = None,
+        vector_distance_threshold: float | None = None,
+    ) -> list[list[dict]]:
+        """
+        Find the closest chunks for a batch of queries.
+
+        Args:
+            queries (list): Query texts
+            similarity_top_k (int, optional): Chunks per query (default 10)
+            vector_distance_threshold (float, optional): Only return chunks
+                with a cosine distance below this
+
+        Returns:
+            list: For each query, chunk dicts (with "distance") closest first
+        """
+        if not queries or not self.chunks:
+            return [[] for _ in queries]
+
+        query_embeddings = self.embedder.embed(queries, task_type="RETRIEVAL_QUERY")
+        distances = 1.0 - query_embeddings @ self.embeddings.T
+        top_k = min(similarity_top_k or DEFAULT_TOP_K, len(self.chunks))
+
+        # argpartition finds the top k in O(n); only those k are sorted
+        candidates = np.argpartition(distances, top_k - 1, axis=1)[:, :top_k]
+        rows = np.arange(len(queries))[:, None]
+        order = np.argsort(distances[rows, candidates], axis=1)
+        top = candidates[rows, order]
+
+        results = []
+        for row, indices in enumerate(top):
+            hits = []
+            for index in indices:
+                distance = float(distances[row, index])
+                if vector_distance_threshold is not None and distance >= vector_distance_threshold:
+                    break
+                hits.append({**self.chunks[index], "distance": distance})
+            results.append(hits)
+        return results
+
+
+class LocalRagClient(RetrievalClient):
+    """Retrieval client backed by a `LocalVectorIndex`."""
+
+    def __init__(self, index: LocalVectorIndex, cache: RetrievalCache | None = None):
+        """
+        Args:
+            index (LocalVectorIndex): The index to search
+            cache (RetrievalCache, optional): Result cache; no caching if None
+        """
+        super().__init__(cache)
+        self.index = index
+        sources = sorted({chunk["source_uri"] for chunk in index.chunks})
+        self.corpora = [f"local:{source}" for source in sources]
+
+    def _query(
+        self,
+        query: str,
+        similarity_top_k: int | None,
+        vector_distance_threshold: float | None,
+    ) -> list[dict]:
+        return self.index.search([query], similarity_top_k, vector_distance_threshold)[0]
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Build the local retrieval index.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument(
+        "--pdf",
+        action="append",
+        dest="pdfs",
+        help=f"PDF to index; repeatable (default: {os.path.basename(GUIDELINES_PDF_PATH)})",
+    )
+    source.add_argument(
+        "--chunks",
+        action="append",
+        help="Chunk file written by rag.shared_libraries.pdf_chunker; repeatable",
+    )
+    parser.add_argument("--output", default=settings.local_index_path, help="Index file to write")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Words per chunk")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP, help="Words shared by consecutive chunks")
+    parser.add_argument(
+        "--embedding-backend",
+        choices=["vertex", "hashing"],
+        default=settings.embedding_backend,
+        help="Embedder for the chunks (the index remembers it for queries)",
+    )
+    args = parser.parse_args()
+
+    inputs = args.chunks or args.pdfs or [GUIDELINES_PDF_PATH]
+    missing = [path for path in inputs if not os.path.exists(path)]
+    if missing:
+        print(f"Error: File not found: {', '.join(missing)}")
+        return
+
+    if args.embedding_backend == "hashing":
+        embedder = HashingEmbedder()
+    else:
+        embedder = VertexTextEmbedder(settings.embedding_model)
+    start = time.perf_counter()
+    if args.chunks:
+        chunks = [chunk for path in args.chunks for chunk in read_chunk_file(path)]
+        index = LocalVectorIndex.from_chunks(chunks, embedder)
+    else:
+        index = LocalVectorIndex.build(inputs, embedder, args.chunk_size, args.overlap)
+    index.save(args.output)
+    print(
+        f"Indexed {len(index.chunks)} chunks from {len(inputs)} file(s) "
+        f"in {time.perf_counter() - start:.1f}s -> {args.output}"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Offline Stand-ins for the Model and Retrieval
+
+Runs the real agents without Gemini or Vertex AI RAG Engine, to measure
+the framework's own overhead and to test agent flows offline:
+- `ScriptedLlm` is an ADK model that replays canned responses. On a new
+  question it calls the agent's retrieval tool; once the tool has answered
+  it returns the agent's canned answer. Explicit responses, including
+  function calls, can be queued with `script`. Simulated latency is added
+  per call.
+- `FakeRetrievalClient` is a retrieval backend returning canned guideline
+  chunks with simulated latency, so the real `RagRetrievalTool` pipeline
+  (adaptive depth, packing, session memo) still runs.
+- `offline` points an agent tree at both for the duration of a block, and
+  switches off the services that would otherwise go to the network
+  (prompt caching, Vertex embeddings for the semantic answer cache).
+
+Used by `benchmarks/agent_benchmark.py`.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import AsyncGenerator, Iterator
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+from .embeddings import HashingEmbedder
+from .prompt_cache import get_prompt_cache
+from .retrieval import RagRetrievalTool, RetrievalClient
+from .semantic_cache import SemanticAnswerCache, SemanticCache
+
+_AGENT_NAME_LABEL = "adk_agent_name"
+
+DEFAULT_CHUNKS = [
+    {
+        "id": "guidelines#1",
+        "title": "Guideline of Digital Projects RFPs.pdf",
+        "section": "2 RFP STRUCTURE",
+        "page": 3,
+        "text": "2 RFP STRUCTURE\nEvery RFP contains an executive summary, scope of work, technical "
+        "requirements, evaluation criteria, submission guidelines, timeline, budget and terms.",
+    },
+    {
+        "id": "guidelines#7",
+        "title": "Guideline of Digital Projects RFPs.pdf",
+        "section": "5 EVALUATION CRITERIA",
+        "page": 9,
+        "text": "5 EVALUATION CRITERIA\nTechnical and financial evaluation weights are stated in the RFP "
+        "and add up to 100 percent.",
+    },
+    {
+        "id": "guidelines#12",
+        "title": "Guideline of Digital Projects RFPs.pdf",
+        "section": "7 TIMELINE",
+        "page": 14,
+        "text": "7 TIMELINE\nThe RFP states the proposal deadline, the expected award date and the "
+        "milestones of the delivery phase.",
+    },
+]
+
+
+def _text(content: types.Content | None) -> str:
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+class ScriptedLlm(BaseLlm):
+    """ADK model replaying canned responses and tool calls with simulated latency."""
+
+    model: str = "scripted"
+
+    responses: dict[str, str] = {}
+    """Final answer per agent name."""
+
+    default_response: str = "This is a scripted answer based on the retrieved guidelines."
+    """Final answer for agents without an entry in `responses`."""
+
+    script: list[types.Content | str] = []
+    """Responses returned, in order, before falling back to the default behaviour."""
+
+    call_tools: bool = True
+    """Call the agent's retrieval tool before answering a new question."""
+
+    latency_seconds: float = 0.0
+    """Simulated latency of every call."""
+
+    requests: int = 0
+    """Calls served so far."""
+
+    simulated_seconds: float = 0.0
+    """Total simulated latency so far."""
+
+    def _respond(self, llm_request: LlmRequest) -> types.Content:
+        if self.script:
+            response = self.script.pop(0)
+            return response if isinstance(response, types.Content) else types.Content(
+                role="model", parts=[types.Part(text=response)]
+            )
+
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered_by_tool = bool(last and any(part.function_response for part in last.parts or []))
+        question = _text(last) if last and last.role == "user" else ""
+        retrieval_tool = next((name for name in llm_request.tools_dict if name.startswith("retrieve")), None)
+        if self.call_tools and question and retrieval_tool and not answered_by_tool:
+            call = types.FunctionCall(name=retrieval_tool, args={"query": question[:200]})
+            return types.Content(role="model", parts=[types.Part(function_call=call)])
+
+        labels = (llm_request.config.labels if llm_request.config else None) or {}
+        text = self.responses.get(labels.get(_AGENT_NAME_LABEL, ""), self.default_response)
+        return types.Content(role="model", parts=[types.Part(text=text)])
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests += 1
+        if self.latency_seconds:
+            self.simulated_seconds += self.latency_seconds
+            await asyncio.sleep(self.latency_seconds)
+        content = self._respond(llm_request)
+        prompt_chars = sum(len(_text(c)) for c in llm_request.contents)
+        yield LlmResponse(
+            content=content,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // 4 + 1,
+                candidates_token_count=len(_text(content)) // 4 + 1,
+            ),
+        )
+
+
+class FakeRetrievalClient(RetrievalClient):
+    """Retrieval backend returning canned chunks, closest first, with simulated latency."""
+
+    def __init__(self, chunks: list[dict] | None = None, latency_seconds: float = 0.0):
+        """
+        Args:
+            chunks (list, optional): Chunks returned for every query;
+                `DEFAULT_CHUNKS` if None
+            latency_seconds (float): Simulated latency of every query
+        """
+        super().__init__(cache=None)
+        self.corpora = ["fake"]
+        self.chunks = DEFAULT_CHUNKS if chunks is None else chunks
+        self.latency_seconds = latency_seconds
+        self.queries: list[str] = []
+        self.simulated_seconds = 0.0
+
+    def _query(self, query, similarity_top_k, vector_distance_threshold) -> list[dict]:
+        self.queries.append(query)
+        if self.latency_seconds:
+            self.simulated_seconds += self.latency_seconds
+            time.sleep(self.latency_seconds)
+        chunks = self.chunks[:similarity_top_k] if similarity_top_k else self.chunks
+        return [{**chunk, "distance": 0.1 + 0.05 * rank} for rank, chunk in enumerate(chunks)]
+
+
+def _walk(agent: BaseAgent) -> Iterator[BaseAgent]:
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+def _callbacks(agent: LlmAgent) -> list:
+    callbacks = []
+    for callback in (agent.before_model_callback, agent.after_model_callback):
+        if isinstance(callback, list):
+            callbacks.extend(callback)
+        elif callback is not None:
+            callbacks.append(callback)
+    return callbacks
+
+
+@contextmanager
+def offline(agent: BaseAgent, llm: BaseLlm, retrieval: RetrievalClient) -> Iterator[None]:
+    """
+    Run an agent tree on stand-ins for the duration of a block.
+
+    Every LLM agent in the tree uses `llm`, and every retrieval tool uses
+    `retrieval`. Prompt caching is switched off, and semantic answer caches
+    use an empty store embedding with `HashingEmbedder`, so scripted answers
+    never reach the real cache. Everything is restored on exit.
+
+    Args:
+        agent (BaseAgent): Root of the agent tree
+        llm (BaseLlm): Model for all LLM agents, e.g. a `ScriptedLlm`
+        retrieval (RetrievalClient): Retrieval backend, e.g. a `FakeRetrievalClient`
+    """
+    saved: list[tuple[object, str, object]] = []
+
+    def swap(target: object, attribute: str, value: object) -> None:
+        saved.append((target, attribute, getattr(target, attribute)))
+        setattr(target, attribute, value)
+
+    prompt_cache = get_prompt_cache()
+    swap(prompt_cache, "enabled", False)
+    embedder = HashingEmbedder()
+    answer_caches: set[int] = set()
+    for node in _walk(agent):
+        if not isinstance(node, LlmAgent):
+            continue
+        swap(node, "model", llm)
+        for tool in node.tools:
+            if isinstance(tool, RagRetrievalTool):
+                swap(tool, "_client", retrieval)
+        for callback in _callbacks(node):
+            owner = getattr(callback, "__self__", None)
+            if isinstance(owner, SemanticAnswerCache) and id(owner) not in answer_caches:
+                answer_caches.add(id(owner))
+                cache = SemanticCache(embedder, owner.cache.similarity_threshold, owner.cache.max_entries)
+                swap(owner, "cache", cache)
+    try:
+        yield
+    finally:
+        for target, attribute, value in reversed(saved):
+            setattr(target, attribute, value)
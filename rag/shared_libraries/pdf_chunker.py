@@ -0,0 +1,259 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local PDF Parsing and Chunking
+
+Parses PDFs locally and splits them into section-aware chunks for the local
+vector index (`local_index`). Documents uploaded to Vertex AI RAG Engine are
+chunked by the service instead, so chunk files are not imported there.
+- Text extraction, the expensive part, runs in a process pool over page
+  ranges, so both many PDFs and single large PDFs use every core.
+- Chunks never span a section heading. Each chunk starts with its heading
+  and records its document title, section and page range, which is all a
+  citation needs.
+- Chunks are written as compact JSONL files, one per document. Chunk IDs
+  and file names use `document_key`, so PDFs with the same file name in
+  different folders never collide.
+
+Run from the repository root:
+    python -m rag.shared_libraries.pdf_chunker guidelines.pdf other.pdf --output-dir chunks
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+DEFAULT_CHUNK_SIZE = 300
+DEFAULT_OVERLAP = 50
+PAGES_PER_TASK = 16
+
+# "3.2 Evaluation Criteria", "4. Scope of Work"
+_NUMBERED_HEADING = re.compile(r"^\d+(?:\.\d+)*\.?\s+[A-Z][^.:;]*$")
+_MAX_HEADING_WORDS = 12
+
+
+def document_key(pdf_path: str) -> str:
+    """Path-unique key of a PDF: its file name stem plus a short hash of its absolute path."""
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    digest = hashlib.sha256(os.path.abspath(pdf_path).encode("utf-8")).hexdigest()[:8]
+    return f"{stem}-{digest}"
+
+
+def is_heading(line: str) -> bool:
+    """True for short numbered or all-caps lines such as "3.2 Evaluation Criteria"."""
+    if len(line.split()) > _MAX_HEADING_WORDS or line.endswith((".", ",", ";")):
+        return False
+    if _NUMBERED_HEADING.match(line):
+        return True
+    letters = [char for char in line if char.isalpha()]
+    return len(letters) >= 4 and all(char.isupper() for char in letters)
+
+
+def extract_pages(pdf_path: str, start: int = 0, stop: int | None = None) -> list[str]:
+    """
+    Extract the text of a range of pages.
+
+    Args:
+        pdf_path (str): Path to the PDF
+        start (int): First page (0-based)
+        stop (int, optional): Page after the last one; the end of the PDF if None
+
+    Returns:
+        list: The text of each page in the range
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return [page.extract_text() or "" for page in reader.pages[start:stop]]
+
+
+def _page_count(pdf_path: str) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(pdf_path).pages)
+
+
+@dataclass
+class Section:
+    """A heading and the words below it, with the page of every word."""
+
+    heading: str | None
+    words: list[str] = field(default_factory=list)
+    pages: list[int] = field(default_factory=list)
+
+
+def split_sections(pages: list[str]) -> list[Section]:
+    """
+    Split page texts into sections at heading lines.
+
+    Args:
+        pages (list): Text of each page, in order
+
+    Returns:
+        list: Sections with at least one word, in document order
+    """
+    sections = [Section(heading=None)]
+    for page_number, text in enumerate(pages, start=1):
+        for line in text.splitlines():
+            line = " ".join(line.split())
+            if not line:
+                continue
+            if is_heading(line):
+                sections.append(Section(heading=line))
+                continue
+            words = line.split()
+            sections[-1].words.extend(words)
+            sections[-1].pages.extend([page_number] * len(words))
+    return [section for section in sections if section.words]
+
+
+def chunk_sections(
+    sections: list[Section],
+    title: str,
+    source_uri: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    doc_id: str | None = None,
+) -> list[dict]:
+    """
+    Split sections into overlapping word windows that stay within a section.
+
+    Args:
+        sections (list): Sections from `split_sections`
+        title (str): Document title recorded on every chunk
+        source_uri (str): Document location recorded on every chunk
+        chunk_size (int): Maximum words per chunk, excluding the heading
+        overlap (int): Words shared by consecutive chunks of a section
+        doc_id (str, optional): Unique document key prefixing the chunk IDs;
+            the title if None
+
+    Returns:
+        list: Chunk dicts with "id", "title", "source_uri", "section",
+            "page", "page_end" and "text"
+    """
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+    step = chunk_size - overlap
+    doc_id = doc_id or title
+    chunks = []
+    for section in sections:
+        for start in range(0, max(len(section.words) - overlap, 1), step):
+            end = min(start + chunk_size, len(section.words))
+            body = " ".join(section.words[start:end])
+            chunks.append({
+                "id": f"{doc_id}#{len(chunks)}",
+                "title": title,
+                "source_uri": source_uri,
+                "section": section.heading,
+                "page": section.pages[start],
+                "page_end": section.pages[end - 1],
+                "text": f"{section.heading}\n{body}" if section.heading else body,
+            })
+    return chunks
+
+
+def chunk_pdfs(
+    pdf_paths: list[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    max_workers: int | None = None,
+) -> dict[str, list[dict]]:
+    """
+    Parse and chunk PDFs, extracting page ranges in parallel processes.
+
+    Args:
+        pdf_paths (list): PDFs to process
+        chunk_size (int): Maximum words per chunk
+        overlap (int): Words shared by consecutive chunks of a section
+        max_workers (int, optional): Worker processes; one per core if None,
+            and no pool at all when set to 1
+
+    Returns:
+        dict: PDF path -> its chunks, in the order of `pdf_paths`
+    """
+    tasks = []
+    for pdf_path in pdf_paths:
+        page_count = _page_count(pdf_path)
+        for start in range(0, max(page_count, 1), PAGES_PER_TASK):
+            tasks.append((pdf_path, start, start + PAGES_PER_TASK))
+
+    if max_workers == 1 or len(tasks) == 1:
+        page_ranges = [extract_pages(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            page_ranges = list(executor.map(extract_pages, *zip(*tasks)))
+
+    pages: dict[str, list[str]] = {pdf_path: [] for pdf_path in pdf_paths}
+    for (pdf_path, _, _), page_range in zip(tasks, page_ranges):
+        pages[pdf_path].extend(page_range)
+
+    return {
+        pdf_path: chunk_sections(
+            split_sections(pages[pdf_path]),
+            title=os.path.basename(pdf_path),
+            source_uri=os.path.abspath(pdf_path),
+            chunk_size=chunk_size,
+            overlap=overlap,
+            doc_id=document_key(pdf_path),
+        )
+        for pdf_path in pdf_paths
+    }
+
+
+def write_chunk_file(chunks: list[dict], path: str) -> None:
+    """Writes chunks as compact JSONL, leaving out empty fields."""
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            record = {key: value for key, value in chunk.items() if value is not None}
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def read_chunk_file(path: str) -> list[dict]:
+    """Reads chunks written by `write_chunk_file`."""
+    with open(path, encoding="utf-8") as f:
+        return [{"section": None, **json.loads(line)} for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse and chunk PDFs into JSONL chunk files.")
+    parser.add_argument("pdfs", nargs="+", help="PDFs to chunk")
+    parser.add_argument("--output-dir", default="chunks", help="Directory for the .chunks.jsonl files")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Words per chunk")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP, help="Words shared by consecutive chunks")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    missing = [path for path in args.pdfs if not os.path.exists(path)]
+    if missing:
+        print(f"Error: PDF not found: {', '.join(missing)}")
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    start = time.perf_counter()
+    results = chunk_pdfs(args.pdfs, args.chunk_size, args.overlap, args.workers)
+    for pdf_path, chunks in results.items():
+        output_path = os.path.join(args.output_dir, f"{document_key(pdf_path)}.chunks.jsonl")
+        write_chunk_file(chunks, output_path)
+        print(f"{pdf_path}: {len(chunks)} chunks -> {output_path}")
+    print(f"Chunked {len(results)} PDF(s) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,11 +16,21 @@ from google.auth import default
 from google.api_core.exceptions import ResourceExhausted
 import vertexai
 from vertexai.preview import rag
+import argparse
 import os
+import sys
 from dotenv import load_dotenv, set_key
 import requests
 import tempfile
 
+if not __package__:
+  # Run as a script: python rag/shared_libraries/prepare_corpus_and_data.py
+  sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from rag.shared_libraries.bulk_ingest import AdaptiveRateLimiter, Checkpoint, collect_directory, ingest, read_manifest
+from rag.shared_libraries.corpus_resolver import CorpusResolver
+from rag.shared_libraries.corpus_sync import SyncState, sync_corpus
+from rag.shared_libraries.downloads import Downloader, read_url_list
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -45,6 +55,10 @@ CORPUS_DESCRIPTION = "Guideline of Digital projects RFPs"
 PDF_URL = "https://www.w3.org/WAI/ER/tests/xhtml/testfiles/resources/pdf/dummy.pdf"
 PDF_FILENAME = "dummy.pdf"
 ENV_FILE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
+CORPUS_INDEX_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".corpus_index.json"))
+CHECKPOINT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".ingest_checkpoint.jsonl"))
+DOWNLOAD_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".downloads"))
+SYNC_STATE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".corpus_sync_state.json"))
 
 
 # --- Start of the script ---
@@ -60,19 +74,22 @@ def create_or_get_corpus():
   embedding_model_config = rag.EmbeddingModelConfig(
       publisher_model="publishers/google/models/text-embedding-004"
   )
-  existing_corpora = rag.list_corpora()
-  corpus = None
-  for existing_corpus in existing_corpora:
-    if existing_corpus.display_name == CORPUS_DISPLAY_NAME:
-      corpus = existing_corpus
-      print(f"Found existing corpus with display name '{CORPUS_DISPLAY_NAME}'")
-      break
-  if corpus is None:
+  resolver = CorpusResolver(
+      CORPUS_INDEX_PATH,
+      scope=f"{PROJECT_ID}/{LOCATION}",
+      get_corpus=lambda name: rag.get_corpus(name=name),
+      list_corpora=rag.list_corpora,
+  )
+  corpus = resolver.resolve(CORPUS_DISPLAY_NAME)
+  if corpus is not None:
+    print(f"Found existing corpus with display name '{CORPUS_DISPLAY_NAME}'")
+  else:
     corpus = rag.create_corpus(
         display_name=CORPUS_DISPLAY_NAME,
         description=CORPUS_DESCRIPTION,
         embedding_model_config=embedding_model_config,
     )
+    resolver.remember(corpus)
     print(f"Created new corpus with display name '{CORPUS_DISPLAY_NAME}'")
   return corpus
 
@@ -113,6 +130,72 @@ def upload_pdf_to_corpus(corpus_name, pdf_path, display_name, description):
     print(f"Error uploading file {display_name}: {e}")
     return None
 
+def download_documents(url_list_path, download_dir, concurrency, failures):
+  """Downloads the listed documents, yielding each one as soon as it is ready to upload."""
+  specs = read_url_list(url_list_path)
+  print(f"Downloading {len(specs)} documents to {download_dir}...")
+  downloader = Downloader(download_dir, max_workers=concurrency)
+  for result in downloader.download_all(specs):
+    if result.ok:
+      print(f"{result.status.capitalize()}: {result.spec.url}")
+      yield result.to_ingest_item()
+    else:
+      print(f"Error downloading {result.spec.url}: {result.error}")
+      failures.append(result)
+
+
+def bulk_upload_to_corpus(corpus_name, items, concurrency, rate, checkpoint_path):
+  """Uploads many files concurrently, retrying when the quota is exhausted."""
+  print(f"Uploading files with up to {concurrency} concurrent uploads...")
+
+  def upload(item):
+    return rag.upload_file(
+        corpus_name=corpus_name,
+        path=item.path,
+        display_name=item.display_name,
+        description=item.description,
+    )
+
+  summary = ingest(
+      corpus_name,
+      items,
+      upload,
+      concurrency=concurrency,
+      limiter=AdaptiveRateLimiter(rate=rate),
+      checkpoint=Checkpoint(checkpoint_path),
+  )
+  print(summary.format())
+  return summary
+
+
+def sync_files_to_corpus(corpus_name, items, concurrency, rate, state_path, delete_removed=True):
+  """Uploads new and changed files and deletes files removed locally."""
+  remote_files = list(rag.list_files(corpus_name=corpus_name))
+  print(f"Syncing {len(items)} local files with {len(remote_files)} files in the corpus...")
+
+  def upload(item):
+    return rag.upload_file(
+        corpus_name=corpus_name,
+        path=item.path,
+        display_name=item.display_name,
+        description=item.description,
+    )
+
+  summary = sync_corpus(
+      corpus_name,
+      items,
+      remote_files,
+      upload,
+      lambda name: rag.delete_file(name=name),
+      SyncState(state_path),
+      concurrency=concurrency,
+      limiter=AdaptiveRateLimiter(rate=rate),
+      delete_removed=delete_removed,
+  )
+  print(summary.format())
+  return summary
+
+
 def update_env_file(corpus_name, env_file_path):
     """Updates the .env file with the corpus name."""
     try:
@@ -129,13 +212,80 @@ def list_corpus_files(corpus_name):
     print(f"File: {file.display_name} - {file.name}")
 
 
+def parse_args():
+  parser = argparse.ArgumentParser(description="Create the RAG corpus and upload documents to it.")
+  source = parser.add_mutually_exclusive_group()
+  source.add_argument("--dir", help="Upload every document below this directory")
+  source.add_argument(
+      "--manifest",
+      help='JSONL file with one {"path", "display_name", "description"} object per line',
+  )
+  source.add_argument(
+      "--urls",
+      help='JSONL file with one {"url", "sha256", "display_name", "description"} object per line; '
+      "documents are uploaded as their downloads finish",
+  )
+  parser.add_argument("--download-dir", default=DOWNLOAD_DIR, help="Where --urls documents are stored")
+  parser.add_argument(
+      "--sync",
+      action="store_true",
+      help="Only upload new or changed files and delete files removed locally",
+  )
+  parser.add_argument(
+      "--sync-state",
+      default=SYNC_STATE_PATH,
+      help="File recording the content hash of every synced file",
+  )
+  parser.add_argument("--concurrency", type=int, default=4, help="Maximum uploads in flight")
+  parser.add_argument("--rate", type=float, default=2.0, help="Initial uploads per second")
+  parser.add_argument(
+      "--checkpoint",
+      default=CHECKPOINT_PATH,
+      help="File recording finished uploads, so an interrupted run can resume",
+  )
+  args = parser.parse_args()
+  if args.sync and not (args.dir or args.manifest or args.urls):
+    parser.error("--sync needs --dir, --manifest or --urls")
+  return args
+
+
 def main():
+  args = parse_args()
   initialize_vertex_ai()
   corpus = create_or_get_corpus()
 
   # Update the .env file with the corpus name
   update_env_file(corpus.name, ENV_FILE_PATH)
-  
+
+  if args.urls:
+    failures = []
+    items = download_documents(args.urls, args.download_dir, args.concurrency, failures)
+    if args.sync:
+      # Sync needs the complete list to find removed documents
+      items = list(items)
+      if failures:
+        print("Some downloads failed; documents missing locally are not deleted from the corpus.")
+      sync_files_to_corpus(
+          corpus.name, items, args.concurrency, args.rate, args.sync_state, delete_removed=not failures
+      )
+    else:
+      bulk_upload_to_corpus(corpus.name, items, args.concurrency, args.rate, args.checkpoint)
+    list_corpus_files(corpus_name=corpus.name)
+    return
+
+  if args.dir or args.manifest:
+    items = collect_directory(args.dir) if args.dir else read_manifest(args.manifest)
+    missing = [item.path for item in items if not os.path.exists(item.path)]
+    if missing:
+      print(f"Error: Files not found: {', '.join(missing)}")
+      return
+    if args.sync:
+      sync_files_to_corpus(corpus.name, items, args.concurrency, args.rate, args.sync_state)
+    else:
+      bulk_upload_to_corpus(corpus.name, items, args.concurrency, args.rate, args.checkpoint)
+    list_corpus_files(corpus_name=corpus.name)
+    return
+
   # Upload your local PDF to the corpus
   local_file_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "Guideline of Digital Projects RFPs_1.pdf"))
   display_name = "Guideline of Digital Projects RFPs_1.pdf"
@@ -0,0 +1,323 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Static Prompt Prefix Caching
+
+Every agent resends its instruction (several thousand tokens for the
+orchestrator, creation and validation prompts) and its tool declarations
+on every model call. `PromptCache` registers that static prefix once as
+Gemini cached content and points later requests at it:
+- Caches are keyed by a hash of the model, instruction and tools, and
+  named after it, so they are reused across sessions and found again by
+  other processes.
+- A cache is extended before it expires; a deleted cache is recreated.
+- Requests sent with `cached_content` may not also carry a system
+  instruction or tools, so both are moved into the cache together.
+- Prompt tokens served from the cache and tokens sent uncached are
+  recorded per agent from the response usage metadata.
+
+When a prefix cannot be cached (for example, because it is below the
+model's minimum cacheable size) the request is sent unchanged, and the
+prefix is not tried again. Other failures (quota, permissions, outages)
+send the request unchanged and try again on the next call.
+
+Configuration (see `rag.config.RagSettings`):
+- PROMPT_CACHE_ENABLED: Attach cached prompt prefixes (default true)
+- PROMPT_CACHE_TTL_SECONDS: Lifetime of a cached prefix (default 3600)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Callable
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import errors, types
+from pydantic import BaseModel
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_DISPLAY_NAME_PREFIX = "rfp-prompt-"
+
+
+@dataclass
+class _CacheHandle:
+    name: str
+    expire_time: float
+
+
+@dataclass
+class TokenStats:
+    """Prompt tokens of one agent's model calls."""
+
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def uncached_tokens(self) -> int:
+        return self.prompt_tokens - self.cached_tokens
+
+
+def _jsonable(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def prefix_key(model: str, config: types.GenerateContentConfig) -> str:
+    """
+    Hash the static prefix of a request.
+
+    Args:
+        model (str): Model name
+        config (types.GenerateContentConfig): Request config with the system
+            instruction and tools
+
+    Returns:
+        str: Hex digest identifying the model, instruction and tools
+    """
+    payload = {
+        "model": model,
+        "system_instruction": _jsonable(config.system_instruction),
+        "tools": _jsonable(config.tools),
+        "tool_config": _jsonable(config.tool_config),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _is_uncacheable(error: errors.APIError) -> bool:
+    """
+    True if the API rejected a prefix itself (e.g. below the minimum size),
+    rather than the call failing (quota, permissions, outages).
+    """
+    message = (error.message or "").lower()
+    return error.status == "INVALID_ARGUMENT" or "too few tokens" in message or "too small" in message
+
+
+class PromptCache:
+    """Before/after model callbacks that serve static prompt prefixes from cached content."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+        client=None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Create a prompt cache.
+
+        Args:
+            enabled (bool): Attach cached prefixes; token usage is recorded either way
+            ttl_seconds (int): Lifetime of a cached prefix
+            refresh_margin_seconds (int): Extend a cache this long before it expires
+            client (google.genai.Client, optional): Client for the caches API;
+                created from the environment on first use if None
+            clock (callable): Wall-clock time source, replaceable in tests
+        """
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._client = client
+        self._clock = clock
+        self._handles: dict[str, _CacheHandle] = {}
+        # Prefixes the API refused to cache, e.g. too small
+        self._uncacheable: set[str] = set()
+        # Per event loop: an asyncio lock binds to the loop that first waits
+        # on it, and the process-wide cache outlives each `asyncio.run`
+        self._key_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._key_locks_lock = threading.Lock()
+        self._stats: dict[str, TokenStats] = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client()
+        return self._client
+
+    async def cached_content_name(self, model: str, config: types.GenerateContentConfig) -> str | None:
+        """
+        Get the cached content holding a request's static prefix, creating
+        or extending it as needed.
+
+        Args:
+            model (str): Model name
+            config (types.GenerateContentConfig): Request config
+
+        Returns:
+            str | None: Resource name of the cached content, or None if the
+                prefix cannot be cached
+        """
+        key = prefix_key(model, config)
+        if key in self._uncacheable:
+            return None
+        async with self._key_lock(key):
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = await self._find(key)
+            if handle is not None and handle.expire_time - self._clock() < self.refresh_margin_seconds:
+                handle = await self._extend(handle)
+            if handle is None:
+                handle = await self._create(key, model, config)
+            if handle is None:
+                self._handles.pop(key, None)
+                return None
+            self._handles[key] = handle
+            return handle.name
+
+    def _key_lock(self, key: str) -> asyncio.Lock:
+        """The lock serialising cache creation for a prefix on the running loop."""
+        loop = asyncio.get_running_loop()
+        with self._key_locks_lock:
+            return self._key_locks.setdefault(loop, {}).setdefault(key, asyncio.Lock())
+
+    async def _find(self, key: str) -> _CacheHandle | None:
+        """Looks for a cache another process created for the same prefix."""
+        display_name = f"{_DISPLAY_NAME_PREFIX}{key[:32]}"
+        try:
+            async for cached in await self.client.aio.caches.list():
+                if cached.display_name == display_name:
+                    return _CacheHandle(cached.name, cached.expire_time.timestamp())
+        except errors.APIError as e:
+            logger.debug("Listing cached contents failed: %s", e)
+        return None
+
+    async def _extend(self, handle: _CacheHandle) -> _CacheHandle | None:
+        try:
+            cached = await self.client.aio.caches.update(
+                name=handle.name,
+                config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s"),
+            )
+        except errors.APIError as e:
+            # Usually deleted or already expired; a new cache is created instead
+            logger.debug("Extending cached content %s failed: %s", handle.name, e)
+            return None
+        return _CacheHandle(cached.name, cached.expire_time.timestamp())
+
+    async def _create(self, key: str, model: str, config: types.GenerateContentConfig) -> _CacheHandle | None:
+        try:
+            cached = await self.client.aio.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    display_name=f"{_DISPLAY_NAME_PREFIX}{key[:32]}",
+                    system_instruction=config.system_instruction,
+                    tools=config.tools,
+                    tool_config=config.tool_config,
+                    ttl=f"{self.ttl_seconds}s",
+                ),
+            )
+        except errors.APIError as e:
+            if not _is_uncacheable(e):
+                logger.warning("Creating cached content failed, retrying on the next call: %s", e)
+                return None
+            logger.warning("Prompt prefix for %s cannot be cached, sending it uncached: %s", model, e)
+            self._uncacheable.add(key)
+            return None
+        logger.info("Cached prompt prefix %s for %s as %s", key[:12], model, cached.name)
+        return _CacheHandle(cached.name, cached.expire_time.timestamp())
+
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        """Replaces the instruction and tools of a request with their cached content."""
+        config = llm_request.config
+        if not self.enabled or not config or not config.system_instruction or config.cached_content:
+            return None
+        name = await self.cached_content_name(llm_request.model, config)
+        if name:
+            config.cached_content = name
+            config.system_instruction = None
+            config.tools = None
+            config.tool_config = None
+        return None
+
+    async def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse | None:
+        """Records cached and uncached prompt tokens of the call."""
+        usage = llm_response.usage_metadata
+        if llm_response.partial or not usage or usage.prompt_token_count is None:
+            return None
+        cached = usage.cached_content_token_count or 0
+        with self._stats_lock:
+            stats = self._stats.setdefault(callback_context.agent_name, TokenStats())
+            stats.requests += 1
+            stats.prompt_tokens += usage.prompt_token_count
+            stats.cached_tokens += cached
+        logger.info(
+            "%s prompt tokens: %d cached, %d uncached",
+            callback_context.agent_name,
+            cached,
+            usage.prompt_token_count - cached,
+        )
+        return None
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Get prompt token usage per agent.
+
+        Returns:
+            dict: Agent name -> requests, prompt, cached and uncached tokens
+                and the cached share
+        """
+        with self._stats_lock:
+            return {
+                agent_name: {
+                    "requests": stats.requests,
+                    "prompt_tokens": stats.prompt_tokens,
+                    "cached_tokens": stats.cached_tokens,
+                    "uncached_tokens": stats.uncached_tokens,
+                    "cached_ratio": stats.cached_tokens / stats.prompt_tokens if stats.prompt_tokens else 0.0,
+                }
+                for agent_name, stats in self._stats.items()
+            }
+
+
+_prompt_cache: PromptCache | None = None
+_prompt_cache_lock = threading.Lock()
+
+
+def get_prompt_cache() -> PromptCache:
+    """
+    Get the process-wide prompt cache, creating it on first use.
+
+    Returns:
+        PromptCache: The cache shared by all agents in the process
+    """
+    global _prompt_cache
+    with _prompt_cache_lock:
+        if _prompt_cache is None:
+            settings = get_settings()
+            _prompt_cache = PromptCache(
+                # Cassettes key requests by content, which cached prefixes would change
+                enabled=settings.prompt_cache_enabled and settings.cassette_mode == "off",
+                ttl_seconds=settings.prompt_cache_ttl_seconds,
+            )
+        return _prompt_cache
@@ -0,0 +1,358 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared Retrieval Client and Tool
+
+Every agent retrieves from the same corpus, so retrieval goes through one
+process-wide client that owns the backend (Vertex AI RAG Engine, or a local
+in-process index searched by vectors or hybrid keyword + vector) and the
+retrieval cache. Each agent only declares a lightweight `RagRetrievalTool` with its own
+name, description and retrieval depth.
+
+Gemini 2 models normally run `VertexAiRagRetrieval` server-side as a
+built-in tool, which the client can neither observe nor cache.
+`RagRetrievalTool` always declares itself as a function instead, so every
+retrieval goes through the shared client. Results include each chunk's title
+and source so the agents can still cite them. Within a session, chunks the
+model has already been given are only referenced again (see
+`retrieval_memo`).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from google.adk.tools.retrieval.base_retrieval_tool import BaseRetrievalTool
+from google.adk.tools.tool_context import ToolContext
+from typing_extensions import override
+
+from ..config import get_settings
+from .adaptive_depth import DepthRecord, choose_depth, get_depth_stats, is_flat
+from .context_packer import ContextPacker
+from .retrieval_cache import RetrievalCache, get_retrieval_cache
+from .retrieval_memo import RetrievalMemo
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Chunk fields passed to the model; clients may attach more (ids, distances)
+MODEL_CHUNK_FIELDS = ("title", "source_uri", "section", "page", "text")
+# With the per-session memo, chunks also carry their ID and whether the
+# model has already seen them
+MEMO_CHUNK_FIELDS = ("id", *MODEL_CHUNK_FIELDS, "already_retrieved")
+
+
+class RetrievalClient:
+    """Base class for retrieval backends, adding the shared result cache.
+
+    Subclasses implement `_query` and set `corpora`, the identifiers of the
+    searched corpora that are part of the cache key.
+    """
+
+    corpora: list[str]
+
+    def __init__(self, cache: RetrievalCache | None = None):
+        """
+        Args:
+            cache (RetrievalCache, optional): Result cache; no caching if None
+        """
+        self.cache = cache
+
+    def _query(
+        self,
+        query: str,
+        similarity_top_k: int | None,
+        vector_distance_threshold: float | None,
+    ) -> list[dict]:
+        raise NotImplementedError
+
+    def retrieve(
+        self,
+        query: str,
+        similarity_top_k: int | None = None,
+        vector_distance_threshold: float | None = None,
+    ) -> list[dict]:
+        """
+        Retrieve the chunks most relevant to a query.
+
+        Args:
+            query (str): The retrieval query
+            similarity_top_k (int, optional): Number of chunks to return
+            vector_distance_threshold (float, optional): Only return chunks
+                closer than this distance
+
+        Returns:
+            list: Chunks as dicts with at least "title", "source_uri" and "text"
+        """
+        if self.cache is None:
+            return self._query(query, similarity_top_k, vector_distance_threshold)
+
+        key = RetrievalCache.make_key(
+            self.corpora, query, similarity_top_k, vector_distance_threshold
+        )
+        chunks = self.cache.get(key, _MISSING)
+        if chunks is not _MISSING:
+            logger.debug("Retrieval cache hit for %r", query)
+            return chunks
+
+        chunks = self._query(query, similarity_top_k, vector_distance_threshold)
+        # Empty results are not cached so a newly ingested document is
+        # picked up on the next call.
+        if chunks:
+            self.cache.put(key, chunks)
+        return chunks
+
+    async def retrieve_async(
+        self,
+        query: str,
+        similarity_top_k: int | None = None,
+        vector_distance_threshold: float | None = None,
+    ) -> list[dict]:
+        """Runs `retrieve` in a worker thread so the event loop is not blocked."""
+        return await asyncio.to_thread(
+            self.retrieve, query, similarity_top_k, vector_distance_threshold
+        )
+
+
+class VertexRagClient(RetrievalClient):
+    """Retrieves chunks from Vertex AI RAG Engine."""
+
+    def __init__(self, corpora: list[str], cache: RetrievalCache | None = None):
+        """
+        Create a Vertex AI RAG Engine client.
+
+        Args:
+            corpora (list): Resource names of the corpora to retrieve from
+            cache (RetrievalCache, optional): Result cache; no caching if None
+        """
+        super().__init__(cache)
+        self.corpora = corpora
+
+    def _query(
+        self,
+        query: str,
+        similarity_top_k: int | None,
+        vector_distance_threshold: float | None,
+    ) -> list[dict]:
+        from vertexai.preview import rag
+
+        response = rag.retrieval_query(
+            text=query,
+            rag_resources=[rag.RagResource(rag_corpus=corpus) for corpus in self.corpora],
+            similarity_top_k=similarity_top_k,
+            vector_distance_threshold=vector_distance_threshold,
+        )
+        return [
+            {
+                "title": context.source_display_name,
+                "source_uri": context.source_uri,
+                "text": context.text,
+                "distance": context.distance,
+            }
+            for context in response.contexts.contexts
+        ]
+
+
+_retrieval_client = None
+_retrieval_client_lock = threading.Lock()
+
+
+def _create_backend_client(settings) -> RetrievalClient:
+    backend = settings.retrieval_backend
+    if backend == "vertex":
+        return VertexRagClient(
+            corpora=[settings.rag_corpus],
+            cache=get_retrieval_cache(),
+        )
+    if backend == "local":
+        from .local_index import LocalRagClient, LocalVectorIndex
+
+        return LocalRagClient(
+            LocalVectorIndex.load(settings.local_index_path),
+            cache=get_retrieval_cache(),
+        )
+    if backend == "hybrid":
+        from .hybrid_index import HybridRagClient
+        from .local_index import LocalVectorIndex
+
+        return HybridRagClient(
+            LocalVectorIndex.load(settings.local_index_path),
+            shortlist_size=settings.hybrid_shortlist_size,
+            rrf_k=settings.hybrid_rrf_k,
+            cache=get_retrieval_cache(),
+        )
+    raise ValueError(
+        f"Unknown RETRIEVAL_BACKEND '{backend}'. Use 'vertex', 'local' or 'hybrid'."
+    )
+
+
+def get_retrieval_client() -> RetrievalClient:
+    """
+    Get the process-wide retrieval client, creating it on first use.
+
+    The backend is selected by the RETRIEVAL_BACKEND setting: "vertex" for
+    Vertex AI RAG Engine, "local" for vector search over the in-process index
+    built by `rag.shared_libraries.local_index`, or "hybrid" for keyword
+    shortlisting plus vector scoring over the same index. With CASSETTE_MODE
+    "record" or "replay" the backend is wrapped in a
+    `rag.shared_libraries.cassettes.CassetteRetrievalClient`; replaying does
+    not create the backend at all.
+
+    Returns:
+        RetrievalClient: The client shared by all retrieval tools
+
+    Raises:
+        ValueError: If RETRIEVAL_BACKEND names an unknown backend
+    """
+    global _retrieval_client
+    with _retrieval_client_lock:
+        if _retrieval_client is None:
+            settings = get_settings()
+            if settings.cassette_mode == "off":
+                _retrieval_client = _create_backend_client(settings)
+            else:
+                from .cassettes import CassetteRetrievalClient, CassetteStore
+
+                corpora = (
+                    [settings.rag_corpus] if settings.retrieval_backend == "vertex"
+                    else [f"{settings.retrieval_backend}:{os.path.basename(settings.local_index_path)}"]
+                )
+                _retrieval_client = CassetteRetrievalClient(
+                    CassetteStore(settings.cassette_dir),
+                    settings.cassette_mode,
+                    corpora=corpora,
+                    inner=_create_backend_client(settings) if settings.cassette_mode == "record" else None,
+                )
+        return _retrieval_client
+
+
+class RagRetrievalTool(BaseRetrievalTool):
+    """Retrieval tool that delegates to the shared retrieval client."""
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        description: str,
+        similarity_top_k: int | None = None,
+        vector_distance_threshold: float | None = None,
+        client=None,
+        memo: bool | None = None,
+        adaptive: bool | None = None,
+        token_budget: int | None = None,
+        pack: bool | None = None,
+        compress: bool | None = None,
+    ):
+        """
+        Create a retrieval tool.
+
+        Args:
+            name (str): Tool name shown to the model
+            description (str): Tool description shown to the model
+            similarity_top_k (int, optional): Number of chunks to retrieve
+            vector_distance_threshold (float, optional): Distance cut-off
+            client (optional): Retrieval client; the process-wide client is
+                used if None
+            memo (bool, optional): Answer repeated queries and skip chunks
+                already seen in the session from a `RetrievalMemo`; the
+                RETRIEVAL_MEMO_ENABLED setting if None
+            adaptive (bool, optional): Treat `similarity_top_k` as the number
+                of candidates and choose the depth per call (see
+                `adaptive_depth`); RETRIEVAL_DEPTH == "adaptive" if None
+            token_budget (int, optional): Estimated tokens of chunks returned
+                per call; RETRIEVAL_TOKEN_BUDGET if None
+            pack (bool, optional): Deduplicate, merge and budget chunks with a
+                `ContextPacker`; CONTEXT_PACKING_ENABLED if None
+            compress (bool, optional): Also compress packed chunks to their
+                query-relevant sentences; CONTEXT_COMPRESSION if None
+        """
+        super().__init__(name=name, description=description)
+        settings = get_settings()
+        self.similarity_top_k = similarity_top_k
+        self.vector_distance_threshold = vector_distance_threshold
+        self._client = client
+        self.memo = settings.retrieval_memo_enabled if memo is None else memo
+        self.adaptive = settings.retrieval_depth == "adaptive" if adaptive is None else adaptive
+        self.token_budget = token_budget or settings.retrieval_token_budget
+        pack = settings.context_packing_enabled if pack is None else pack
+        self.packer = ContextPacker(
+            token_budget=self.token_budget,
+            compress=settings.context_compression if compress is None else compress,
+        ) if pack else None
+
+    @property
+    def client(self):
+        """The retrieval client used by this tool."""
+        return self._client or get_retrieval_client()
+
+    async def _retrieve_adaptive(self, query: str) -> list[dict]:
+        """Fetches candidates, widening once if they are flat, and keeps the chosen depth."""
+        start = time.perf_counter()
+        top_k = self.similarity_top_k or 10
+        candidates = await self.client.retrieve_async(query, top_k, self.vector_distance_threshold)
+        widened = len(candidates) >= top_k and is_flat(candidates)
+        if widened:
+            candidates = await self.client.retrieve_async(query, top_k * 2, self.vector_distance_threshold)
+        choice = choose_depth(candidates, token_budget=self.token_budget)
+        get_depth_stats().record(DepthRecord(
+            tool=self.name,
+            candidates=len(candidates),
+            depth=choice.depth,
+            reason=choice.reason,
+            tokens=choice.tokens,
+            widened=widened,
+            latency_ms=(time.perf_counter() - start) * 1000,
+        ))
+        return candidates[:choice.depth]
+
+    @override
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        query = args["query"]
+        memo = RetrievalMemo(tool_context.state) if self.memo and tool_context is not None else None
+        settings_key = f"{self.similarity_top_k}|{self.vector_distance_threshold}"
+        if memo is not None:
+            remembered = memo.lookup(query, settings_key)
+            if remembered:
+                logger.debug("Retrieval memo hit for %r", query)
+                return remembered
+
+        if self.adaptive:
+            chunks = await self._retrieve_adaptive(query)
+        else:
+            chunks = await self.client.retrieve_async(
+                query, self.similarity_top_k, self.vector_distance_threshold
+            )
+        if self.packer is not None and chunks:
+            chunks, _ = self.packer.pack(query, chunks)
+        if memo is not None and chunks:
+            return [
+                {field: chunk[field] for field in MEMO_CHUNK_FIELDS if chunk.get(field) is not None}
+                for chunk in memo.record(query, settings_key, chunks)
+            ]
+        if not chunks:
+            return (
+                "No matching result found with the config: "
+                f"similarity_top_k={self.similarity_top_k}, "
+                f"vector_distance_threshold={self.vector_distance_threshold}"
+            )
+        # Only the fields the model needs to answer and cite are returned
+        return [
+            {field: chunk[field] for field in MODEL_CHUNK_FIELDS if chunk.get(field) is not None}
+            for chunk in chunks
+        ]
@@ -0,0 +1,255 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Retrieval Result Cache
+
+All agents retrieve from the same RAG corpus and see the same handful of
+guideline lookups over and over. This module provides a process-wide LRU
+cache with a TTL for retrieval results, optionally persisted to disk so it
+survives restarts. The shared retrieval client consults it before calling
+the retrieval backend.
+
+The persistence file is append-only: each new result adds a line. Once the
+lines for replaced, evicted or expired entries outnumber the live entries,
+the file is rewritten with only the live ones, so it stays bounded in a
+long-running server.
+
+Configuration (see `rag.config.RagSettings`):
+- RETRIEVAL_CACHE_MAX_ENTRIES: Maximum number of cached queries (default 1024)
+- RETRIEVAL_CACHE_TTL_SECONDS: Lifetime of a cached result (default 3600)
+- RETRIEVAL_CACHE_PATH: Optional JSONL file the cache is persisted to
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from ..config import get_settings
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cases a query and collapses whitespace and trailing punctuation."""
+    return " ".join(query.lower().split()).rstrip("?.! ")
+
+
+class RetrievalCache:
+    """Thread-safe LRU cache with a TTL and optional JSONL persistence."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        path: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Create a retrieval cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept before the least
+                recently used one is evicted
+            ttl_seconds (float): Seconds after which an entry expires
+            path (str, optional): JSONL file to persist entries to; existing
+                entries are loaded from it on construction
+            clock (callable): Wall-clock time source, replaceable in tests
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Serialises appends and compaction of the persistence file, so file
+        # I/O never holds up lookups
+        self._file_lock = threading.Lock()
+        self._file = None
+        # Lines in the persistence file that no longer describe a live entry
+        self._stale_lines = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path:
+            self._load()
+
+    @staticmethod
+    def make_key(
+        corpora: list[str],
+        query: str,
+        similarity_top_k: int | None,
+        vector_distance_threshold: float | None,
+    ) -> str:
+        """
+        Build the cache key for a retrieval call.
+
+        Args:
+            corpora (list): Resource names of the corpora searched
+            query (str): The retrieval query
+            similarity_top_k (int, optional): Number of chunks requested
+            vector_distance_threshold (float, optional): Distance cut-off
+
+        Returns:
+            str: A stable hash identifying the call
+        """
+        payload = json.dumps(
+            [sorted(corpora), normalize_query(query), similarity_top_k, vector_distance_threshold]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a cached value, counting the hit or miss.
+
+        Args:
+            key (str): Cache key from `make_key`
+            default: Value returned when the key is missing or expired
+
+        Returns:
+            The cached value, or `default`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self._stale_lines += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries if needed.
+
+        Args:
+            key (str): Cache key from `make_key`
+            value: A JSON-serializable value
+        """
+        created = self._clock()
+        with self._lock:
+            entry = self._insert(key, created, value)
+            compact = self.path and self._stale_lines > max(len(self._entries), 1)
+        if not self.path:
+            return
+        with self._file_lock:
+            if compact:
+                self._compact()
+                return
+            with self._lock:
+                # A later put of the same key may have reached the file first;
+                # its line (or a compaction) records the entry
+                current = self._entries.get(key) is entry
+            if not current:
+                return
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(json.dumps({"key": key, "created": created, "value": value}) + "\n")
+            self._file.flush()
+
+    def _insert(self, key: str, created: float, value: Any) -> tuple[float, Any]:
+        if key in self._entries:
+            self._stale_lines += 1
+        entry = self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            self._stale_lines += 1
+        return entry
+
+    def _load(self) -> None:
+        """Loads persisted entries, dropping expired ones and compacting the file."""
+        if not os.path.exists(self.path):
+            return
+        now = self._clock()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written last line from an interrupted process
+                    continue
+                if now - record["created"] < self.ttl_seconds:
+                    self._insert(record["key"], record["created"], record["value"])
+        self.evictions = 0
+        self._compact()
+
+    def _compact(self) -> None:
+        """Rewrites the persistence file with only the live entries; needs `_file_lock`."""
+        with self._lock:
+            entries = list(self._entries.items())
+            self._stale_lines = 0
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, (created, value) in entries:
+                f.write(json.dumps({"key": key, "created": created, "value": value}) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Removes all entries, including persisted ones."""
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            with self._file_lock:
+                self._compact()
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Entry count, hits, misses, evictions and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_retrieval_cache: RetrievalCache | None = None
+_retrieval_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """
+    Get the process-wide retrieval cache, creating it on first use.
+
+    Returns:
+        RetrievalCache: The cache shared by all retrieval tools in the process
+    """
+    global _retrieval_cache
+    with _retrieval_cache_lock:
+        if _retrieval_cache is None:
+            settings = get_settings()
+            _retrieval_cache = RetrievalCache(
+                max_entries=settings.retrieval_cache_max_entries,
+                ttl_seconds=settings.retrieval_cache_ttl_seconds,
+                path=settings.retrieval_cache_path or None,
+            )
+        return _retrieval_cache
+
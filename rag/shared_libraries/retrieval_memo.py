@@ -0,0 +1,152 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-Session Retrieval Memo
+
+In multi-turn flows (gather details, draft, revise) the agents retrieve the
+same guidelines on nearly every turn. Earlier tool results are still part
+of the conversation the model sees, so sending the same chunks again only
+adds latency and duplicate context. `RetrievalMemo` keeps, in session
+state:
+- the chunks already given to the model, by chunk ID, with the title and
+  section needed to cite them
+- the queries already run, with the IDs of the chunks they returned
+
+A query that repeats or overlaps an earlier one (same retrieval settings,
+mostly the same terms) is answered from the memo without retrieving. For
+other queries, only chunks that have not been seen are sent in full; the
+rest are referenced by ID, title and section.
+
+Configuration (see `rag.config.RagSettings`):
+- RETRIEVAL_MEMO_ENABLED: Keep the per-session memo (default true)
+"""
+
+import hashlib
+import re
+from typing import Any, MutableMapping
+
+MEMO_STATE_KEY = "retrieval_memo"
+
+# Queries sharing at least this fraction of their terms count as overlapping
+DEFAULT_OVERLAP_THRESHOLD = 0.8
+DEFAULT_MAX_QUERIES = 200
+
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or the this to what which with "
+    "rfp rfps please about should".split()
+)
+
+
+def chunk_id(chunk: dict) -> str:
+    """Returns a chunk's ID, or a hash of its source and text for backends without IDs."""
+    if chunk.get("id"):
+        return str(chunk["id"])
+    digest = hashlib.sha256(f"{chunk.get('source_uri')}\n{chunk.get('text')}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def query_terms(query: str) -> frozenset[str]:
+    """Returns the distinctive lower-case terms of a query."""
+    return frozenset(word for word in _WORD.findall(query.lower()) if word not in _STOPWORDS)
+
+
+def _reference(chunk_id_: str, chunk: dict) -> dict:
+    reference = {"id": chunk_id_, "title": chunk.get("title")}
+    if chunk.get("section"):
+        reference["section"] = chunk["section"]
+    return reference
+
+
+class RetrievalMemo:
+    """Chunks and queries already retrieved in a session, kept in session state."""
+
+    def __init__(
+        self,
+        state: MutableMapping[str, Any],
+        overlap_threshold: float = DEFAULT_OVERLAP_THRESHOLD,
+        max_queries: int = DEFAULT_MAX_QUERIES,
+    ):
+        """
+        Args:
+            state (MutableMapping): Session state, e.g. `tool_context.state`
+            overlap_threshold (float): Term overlap (Jaccard) at which a query
+                is answered from an earlier one
+            max_queries (int): Queries remembered; the oldest are dropped first
+        """
+        self.state = state
+        self.overlap_threshold = overlap_threshold
+        self.max_queries = max_queries
+
+    def _memo(self) -> dict:
+        return self.state.get(MEMO_STATE_KEY) or {"seen": {}, "queries": []}
+
+    def lookup(self, query: str, settings_key: str) -> list[dict] | None:
+        """
+        Find an earlier query that this one repeats or overlaps.
+
+        Args:
+            query (str): The retrieval query
+            settings_key (str): Retrieval settings the query runs with, e.g.
+                depth and threshold; only queries with the same key match
+
+        Returns:
+            list | None: References to the chunks the earlier query returned,
+                or None if no earlier query matches
+        """
+        terms = query_terms(query)
+        if not terms:
+            return None
+        memo = self._memo()
+        for entry in reversed(memo["queries"]):
+            if entry["settings"] != settings_key:
+                continue
+            earlier = set(entry["terms"])
+            if len(terms & earlier) / len(terms | earlier) >= self.overlap_threshold:
+                return [
+                    {**memo["seen"].get(id_, {"id": id_}), "already_retrieved": True}
+                    for id_ in entry["ids"]
+                ]
+        return None
+
+    def record(self, query: str, settings_key: str, chunks: list[dict]) -> list[dict]:
+        """
+        Remember a query's results and mark which chunks are new.
+
+        Args:
+            query (str): The retrieval query
+            settings_key (str): Retrieval settings the query ran with
+            chunks (list): The retrieved chunks
+
+        Returns:
+            list: The chunks in retrieval order, each with its "id"; chunks
+                seen earlier in the session are reduced to a reference with
+                "already_retrieved" set
+        """
+        memo = self._memo()
+        seen = dict(memo["seen"])
+        results, ids = [], []
+        for chunk in chunks:
+            id_ = chunk_id(chunk)
+            ids.append(id_)
+            if id_ in seen:
+                results.append({**seen[id_], "already_retrieved": True})
+            else:
+                seen[id_] = _reference(id_, chunk)
+                results.append({"id": id_, **chunk})
+        queries = memo["queries"] + [{"terms": sorted(query_terms(query)), "settings": settings_key, "ids": ids}]
+        # Assigned as a new value so the change is recorded in the session
+        self.state[MEMO_STATE_KEY] = {"seen": seen, "queries": queries[-self.max_queries:]}
+        return results
@@ -0,0 +1,281 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Semantic Answer Cache
+
+Guideline questions ("What should be included in an RFP?") are asked again
+and again in slightly different words. This module caches final, cited
+answers keyed on an embedding of the question, and serves a stored answer
+when a new question is similar enough, skipping both retrieval and
+generation.
+
+`SemanticCache` is the vector store: embeddings live in a preallocated NumPy
+matrix and a lookup is a single matrix-vector product. Entries are tagged
+with the corpus and prompt version they were produced with, and never served
+for another tag.
+
+`SemanticAnswerCache` wires the store into an agent through ADK
+before/after model callbacks. It only caches turns the local intent
+classifier recognizes as stateless guideline or document questions.
+
+Configuration (see `rag.config.RagSettings`):
+- SEMANTIC_CACHE_THRESHOLD: Minimum cosine similarity for a hit (default 0.92)
+- SEMANTIC_CACHE_MAX_ENTRIES: Maximum number of cached answers (default 512)
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from ..intent_classifier import DOCUMENT_QUERY, RFP_GUIDELINES, IntentClassifier
+
+logger = logging.getLogger(__name__)
+
+# Intents whose answers depend only on the question and the corpus
+CACHEABLE_INTENTS = (RFP_GUIDELINES, DOCUMENT_QUERY)
+
+
+def prompt_version(instruction: str) -> str:
+    """Returns a short stable hash identifying a prompt's text."""
+    return hashlib.sha256(instruction.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class CachedAnswer:
+    """A cached answer and how closely its question matched."""
+
+    question: str
+    answer: str
+    similarity: float
+
+
+class SemanticCache:
+    """Fixed-capacity store of question embeddings and answers."""
+
+    def __init__(self, embedder, similarity_threshold: float = 0.92, max_entries: int = 512):
+        """
+        Create a semantic cache.
+
+        Args:
+            embedder: Object with an `embed(texts) -> np.ndarray` method
+                returning L2-normalized rows
+            similarity_threshold (float): Minimum cosine similarity for a hit
+            max_entries (int): Capacity; the oldest entry is overwritten when full
+        """
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self._matrix: np.ndarray | None = None
+        self._tags = np.full(max_entries, "", dtype=object)
+        self._questions: list[str | None] = [None] * max_entries
+        self._answers: list[str | None] = [None] * max_entries
+        self._next = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_tag(corpus: str | None, version: str) -> str:
+        """Builds the tag entries are filed under."""
+        return f"{corpus or ''}|{version}"
+
+    def embed(self, question: str) -> np.ndarray:
+        """Embeds a single question."""
+        return self.embedder.embed([question])[0]
+
+    def lookup(self, embedding: np.ndarray, tag: str) -> CachedAnswer | None:
+        """
+        Find the most similar cached question with the same tag.
+
+        Args:
+            embedding (np.ndarray): Normalized embedding of the question
+            tag (str): Tag from `make_tag`
+
+        Returns:
+            CachedAnswer | None: The best match above the threshold, if any
+        """
+        with self._lock:
+            if self._matrix is not None:
+                similarities = self._matrix @ embedding
+                similarities[self._tags != tag] = -1.0
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    self.hits += 1
+                    return CachedAnswer(
+                        question=self._questions[best],
+                        answer=self._answers[best],
+                        similarity=float(similarities[best]),
+                    )
+            self.misses += 1
+            return None
+
+    def store(self, embedding: np.ndarray, question: str, answer: str, tag: str) -> None:
+        """
+        Cache an answer, overwriting the oldest entry when the cache is full.
+
+        Args:
+            embedding (np.ndarray): Normalized embedding of the question
+            question (str): The question
+            answer (str): The final answer, including its citations
+            tag (str): Tag from `make_tag`
+        """
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+            slot = self._next
+            self._matrix[slot] = embedding
+            self._tags[slot] = tag
+            self._questions[slot] = question
+            self._answers[slot] = answer
+            self._next = (slot + 1) % self.max_entries
+
+    def invalidate(self, keep_tag: str | None = None) -> int:
+        """
+        Drop entries whose tag differs from `keep_tag` (all entries if None).
+
+        Returns:
+            int: Number of entries dropped
+        """
+        with self._lock:
+            stale = (self._tags != "") & (self._tags != keep_tag)
+            if self._matrix is not None:
+                self._matrix[stale] = 0.0
+            for slot in np.flatnonzero(stale):
+                self._questions[slot] = None
+                self._answers[slot] = None
+            self._tags[stale] = ""
+            return int(stale.sum())
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Entry count, hits, misses and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": int((self._tags != "").sum()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _request_is_new_question(llm_request: LlmRequest) -> bool:
+    """True if the request answers a user message rather than a tool result."""
+    if not llm_request.contents:
+        return False
+    last = llm_request.contents[-1]
+    return last.role == "user" and not any(part.function_response for part in last.parts or [])
+
+
+def _response_text(llm_response: LlmResponse) -> str:
+    content = llm_response.content
+    if not content or not content.parts or any(part.function_call for part in content.parts):
+        return ""
+    return "".join(part.text for part in content.parts if part.text and not part.thought)
+
+
+class SemanticAnswerCache:
+    """Before/after model callbacks that serve repeated questions from a cache."""
+
+    def __init__(
+        self,
+        cache: SemanticCache,
+        corpus: str | None,
+        instruction: str,
+        classifier: IntentClassifier | None = None,
+        min_intent_confidence: float = 0.6,
+    ):
+        """
+        Create the callbacks for one agent.
+
+        Args:
+            cache (SemanticCache): The vector store
+            corpus (str, optional): RAG corpus the agent answers from
+            instruction (str): The agent's instruction, used as prompt version
+            classifier (IntentClassifier, optional): Classifier deciding which
+                turns are cacheable; trained on the orchestrator prompt by default
+            min_intent_confidence (float): Minimum classifier confidence for a
+                turn to be treated as a stateless guideline question
+        """
+        self.cache = cache
+        self.tag = SemanticCache.make_tag(corpus, prompt_version(instruction))
+        self.classifier = classifier or IntentClassifier.from_prompt()
+        self.min_intent_confidence = min_intent_confidence
+        # When False every turn goes to the model, e.g. for eval runs
+        self.enabled = True
+        # Question embeddings of turns waiting for their final answer
+        self._pending: dict[str, tuple[str, np.ndarray]] = {}
+
+    def _question(self, callback_context: CallbackContext) -> str:
+        content = callback_context.user_content
+        if not content or not content.parts:
+            return ""
+        return "\n".join(part.text for part in content.parts if part.text).strip()
+
+    def _is_cacheable(self, question: str) -> bool:
+        prediction = self.classifier.classify(question)
+        return (
+            prediction.intent in CACHEABLE_INTENTS
+            and prediction.confidence >= self.min_intent_confidence
+        )
+
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:
+        """Returns the cached answer for a similar question, skipping the model."""
+        if not self.enabled or not _request_is_new_question(llm_request):
+            return None
+        question = self._question(callback_context)
+        if not question or not self._is_cacheable(question):
+            return None
+
+        embedding = await asyncio.to_thread(self.cache.embed, question)
+        cached = self.cache.lookup(embedding, self.tag)
+        if cached:
+            logger.debug(
+                "Semantic cache hit (%.3f) for %r via %r", cached.similarity, question, cached.question
+            )
+            return LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=cached.answer)])
+            )
+
+        # Bound the pending map in case turns end without a final answer
+        if len(self._pending) >= 1024:
+            self._pending.clear()
+        self._pending[callback_context.invocation_id] = (question, embedding)
+        return None
+
+    async def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse | None:
+        """Stores the final answer of a cacheable turn."""
+        if llm_response.partial or callback_context.invocation_id not in self._pending:
+            return None
+        answer = _response_text(llm_response)
+        if answer:
+            question, embedding = self._pending.pop(callback_context.invocation_id)
+            self.cache.store(embedding, question, answer, self.tag)
+        return None
@@ -0,0 +1,574 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local Persistent Session Service (SQLite)
+
+An ADK `BaseSessionService` that keeps sessions in a local SQLite file, so
+conversations survive restarts without Vertex AI Agent Engine sessions.
+Compared with ADK's `DatabaseSessionService`, appends are cheaper and
+sessions take less space:
+- The database runs in WAL mode with `synchronous=NORMAL`, so an append is
+  one short write transaction without an fsync per commit. Connections come
+  from a small pool and queries run in worker threads, off the event loop.
+- Each event is stored as one zlib-compressed JSON payload. A preset
+  dictionary of the field names every event repeats keeps even small
+  payloads short.
+- Strings of at least `blob_min_chars` characters anywhere in an event (RFP
+  documents, retrieved chunks, drafted sections) are moved to a blobs table
+  keyed by their SHA-256 hash. A document that is pasted, passed to a tool and
+  quoted back is stored once. Blobs are reference counted and removed with
+  the last session that uses them.
+
+State follows ADK's prefix rules: "app:" keys are shared by every user of an
+app, "user:" keys by every session of a user, and "temp:" keys are never
+stored.
+
+Configuration (see `rag.config.RagSettings`):
+- SESSION_DB_PATH: The SQLite file (default "sessions.db")
+- SESSION_POOL_SIZE: Number of pooled connections (default 4)
+- SESSION_BLOB_MIN_CHARS: Smallest string stored as a blob (default 2048)
+
+Storage summary of a database (run from the repository root):
+    python -m rag.shared_libraries.sqlite_sessions stats --db sessions.db
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Bump when the schema or the payload encoding changes
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state BLOB NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    payload BLOB NOT NULL,
+    blob_refs TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS events_by_session ON events (app_name, user_id, session_id, seq);
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    refs INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state BLOB NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+) WITHOUT ROWID;
+"""
+
+# Preset compression dictionary: the JSON that nearly every event repeats.
+# Part of the stored format, so changing it needs a new SCHEMA_VERSION.
+_ZDICT = (
+    b'"usage_metadata":{"candidates_token_count":"prompt_token_count":'
+    b'"total_token_count":"thoughts_token_count":"cached_content_token_count":'
+    b'"grounding_metadata":"long_running_tool_ids":[],"branch":"turn_complete":true,'
+    b'"function_response":{"id":"adk-","name":"retrieve_rfp_guidelines","response":{"result":'
+    b'"function_call":{"id":"adk-","args":{"query":"name":"transfer_to_agent","agent_name":"'
+    b'"actions":{"state_delta":{},"artifact_delta":{},"requested_auth_configs":{}},'
+    b'"transfer_to_agent":"skip_summarization":"escalate":'
+    b'{"content":{"parts":[{"text":"role":"model"},"invocation_id":"e-","author":"'
+)
+
+_BLOB_KEY = "$blob"
+_IN_CLAUSE_BATCH = 500
+
+
+def _pack(value: Any) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS, zdict=_ZDICT)
+    data = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return compressor.compress(data) + compressor.flush()
+
+
+def _unpack(data: bytes) -> Any:
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS, zdict=_ZDICT)
+    return json.loads(decompressor.decompress(data) + decompressor.flush())
+
+
+def _extract_blobs(value: Any, min_chars: int, blobs: dict[str, str], refs: list[str]) -> Any:
+    """
+    Replace long strings in a JSON value with blob references.
+
+    Keys starting with "$" get one more "$", so a stored `{"$blob": ...}` is
+    always a reference, never a tool result or state value of that shape.
+    """
+    if isinstance(value, str):
+        if len(value) < min_chars:
+            return value
+        key = hashlib.sha256(value.encode("utf-8")).hexdigest()
+        blobs[key] = value
+        refs.append(key)
+        return {_BLOB_KEY: key}
+    if isinstance(value, dict):
+        return {
+            ("$" + k if k.startswith("$") else k): _extract_blobs(v, min_chars, blobs, refs)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_extract_blobs(v, min_chars, blobs, refs) for v in value]
+    return value
+
+
+def _restore_blobs(value: Any, blobs: dict[str, str]) -> Any:
+    """Inverse of `_extract_blobs`."""
+    if isinstance(value, dict):
+        if len(value) == 1 and _BLOB_KEY in value:
+            return blobs[value[_BLOB_KEY]]
+        return {(k[1:] if k.startswith("$") else k): _restore_blobs(v, blobs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore_blobs(v, blobs) for v in value]
+    return value
+
+
+def _split_state_delta(delta: dict[str, Any]) -> tuple[dict, dict, dict]:
+    """Split a state delta into app, user and session deltas, dropping temp keys."""
+    app_delta, user_delta, session_delta = {}, {}, {}
+    for key, value in (delta or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app_delta[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_delta[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_delta[key] = value
+    return app_delta, user_delta, session_delta
+
+
+class _ConnectionPool:
+    """Fixed-size pool of SQLite connections shared by worker threads."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = max(1, size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transactions are opened explicitly, see `SqliteSessionService._transaction`
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+class SqliteSessionService(BaseSessionService):
+    """ADK session service backed by a local SQLite file."""
+
+    def __init__(self, path: str, pool_size: int = 4, blob_min_chars: int = 2048):
+        """
+        Args:
+            path (str): The SQLite file; created with its tables if missing
+            pool_size (int): Maximum number of open connections
+            blob_min_chars (int): Strings this long or longer are stored once
+                as shared, content-addressed blobs
+        """
+        self.path = path
+        self.blob_min_chars = blob_min_chars
+        self._pool = _ConnectionPool(path, pool_size)
+        with self._transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                raise ValueError(
+                    f"{path} has session schema version {version}, this code reads version {SCHEMA_VERSION}."
+                )
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Fold the write-ahead log into the database and close the pooled connections."""
+        with self._pool.connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._pool.close()
+
+    @contextmanager
+    def _transaction(self, write: bool = True) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front, so read-modify-write
+        # of shared state never fails halfway with SQLITE_BUSY
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    # --- Reads ----------------------------------------------------------
+
+    @staticmethod
+    def _shared_state(conn: sqlite3.Connection, app_name: str, user_id: str) -> tuple[dict, dict]:
+        row = conn.execute("SELECT state FROM app_states WHERE app_name = ?", (app_name,)).fetchone()
+        app_state = _unpack(row[0]) if row else {}
+        row = conn.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ).fetchone()
+        user_state = _unpack(row[0]) if row else {}
+        return app_state, user_state
+
+    @staticmethod
+    def _merge_state(session_state: dict, app_state: dict, user_state: dict) -> dict:
+        merged = dict(session_state)
+        merged.update({State.APP_PREFIX + key: value for key, value in app_state.items()})
+        merged.update({State.USER_PREFIX + key: value for key, value in user_state.items()})
+        return merged
+
+    @staticmethod
+    def _load_blobs(conn: sqlite3.Connection, keys: set[str]) -> dict[str, str]:
+        blobs = {}
+        keys = sorted(keys)
+        for start in range(0, len(keys), _IN_CLAUSE_BATCH):
+            batch = keys[start : start + _IN_CLAUSE_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            for key, data in conn.execute(f"SELECT hash, data FROM blobs WHERE hash IN ({placeholders})", batch):
+                blobs[key] = zlib.decompress(data).decode("utf-8")
+        return blobs
+
+    def _get_session_sync(
+        self, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]
+    ) -> Optional[Session]:
+        query = "SELECT id, timestamp, payload, blob_refs FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+        params: list[Any] = [app_name, user_id, session_id]
+        if config and config.after_timestamp:
+            query += " AND timestamp >= ?"
+            params.append(config.after_timestamp)
+        recent = config.num_recent_events if config else None
+        if recent:
+            query += " ORDER BY seq DESC LIMIT ?"
+            params.append(recent)
+        else:
+            query += " ORDER BY seq"
+
+        with self._transaction(write=False) as conn:
+            row = conn.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            app_state, user_state = self._shared_state(conn, app_name, user_id)
+            rows = conn.execute(query, params).fetchall()
+            if recent:
+                rows.reverse()
+            blobs = self._load_blobs(conn, {key for *_, refs in rows for key in refs.split()})
+
+        events = []
+        for event_id, timestamp, payload, _ in rows:
+            fields = _restore_blobs(_unpack(payload), blobs)
+            events.append(Event.model_validate({**fields, "id": event_id, "timestamp": timestamp}))
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=self._merge_state(_unpack(row[0]), app_state, user_state),
+            events=events,
+            last_update_time=row[1],
+        )
+
+    def _list_sessions_sync(self, app_name: str, user_id: str) -> ListSessionsResponse:
+        with self._transaction(write=False) as conn:
+            app_state, user_state = self._shared_state(conn, app_name, user_id)
+            rows = conn.execute(
+                "SELECT id, state, update_time FROM sessions WHERE app_name = ? AND user_id = ? ORDER BY create_time",
+                (app_name, user_id),
+            ).fetchall()
+        return ListSessionsResponse(
+            sessions=[
+                Session(
+                    id=session_id,
+                    app_name=app_name,
+                    user_id=user_id,
+                    state=self._merge_state(_unpack(state), app_state, user_state),
+                    last_update_time=update_time,
+                )
+                for session_id, state, update_time in rows
+            ]
+        )
+
+    # --- Writes ---------------------------------------------------------
+
+    def _update_shared_state(
+        self,
+        conn: sqlite3.Connection, app_name: str, user_id: str, app_delta: dict, user_delta: dict
+    ) -> None:
+        if not app_delta and not user_delta:
+            return
+        app_state, user_state = self._shared_state(conn, app_name, user_id)
+        if app_delta:
+            app_state.update(app_delta)
+            conn.execute(
+                "INSERT INTO app_states (app_name, state) VALUES (?, ?) "
+                "ON CONFLICT (app_name) DO UPDATE SET state = excluded.state",
+                (app_name, _pack(app_state)),
+            )
+        if user_delta:
+            user_state.update(user_delta)
+            conn.execute(
+                "INSERT INTO user_states (app_name, user_id, state) VALUES (?, ?, ?) "
+                "ON CONFLICT (app_name, user_id) DO UPDATE SET state = excluded.state",
+                (app_name, user_id, _pack(user_state)),
+            )
+
+    def _create_session_sync(
+        self, app_name: str, user_id: str, state: Optional[dict[str, Any]], session_id: Optional[str]
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = _split_state_delta(state)
+        now = time.time()
+        with self._transaction() as conn:
+            try:
+                conn.execute(
+                    "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, ?, ?, ?)",
+                    (app_name, user_id, session_id, _pack(session_state), now, now),
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Session {session_id} already exists for {app_name}/{user_id}.") from None
+            self._update_shared_state(conn, app_name, user_id, app_delta, user_delta)
+            app_state, user_state = self._shared_state(conn, app_name, user_id)
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=self._merge_state(session_state, app_state, user_state),
+            last_update_time=now,
+        )
+
+    def _delete_session_sync(self, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        with self._transaction() as conn:
+            refs = [
+                blob
+                for (blob_refs,) in conn.execute(
+                    "SELECT blob_refs FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND blob_refs != ''",
+                    key,
+                )
+                for blob in blob_refs.split()
+            ]
+            conn.executemany("UPDATE blobs SET refs = refs - 1 WHERE hash = ?", [(blob,) for blob in refs])
+            conn.executemany("DELETE FROM blobs WHERE hash = ? AND refs <= 0", [(blob,) for blob in set(refs)])
+            conn.execute("DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key)
+            conn.execute("DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key)
+
+    def _encode_event(self, event: Event) -> tuple[bytes, dict[str, str], list[str]]:
+        """The compressed payload of an event, its new blobs and its blob references."""
+        fields = event.model_dump(mode="json", exclude_none=True, exclude={"id", "timestamp"})
+        blobs: dict[str, str] = {}
+        refs: list[str] = []
+        fields = _extract_blobs(fields, self.blob_min_chars, blobs, refs)
+        return _pack(fields), blobs, refs
+
+    def _append_event_sync(self, session: Session, event: Event) -> None:
+        payload, blobs, refs = self._encode_event(event)
+        app_delta, user_delta, session_delta = _split_state_delta(
+            event.actions.state_delta if event.actions else None
+        )
+        compressed_blobs = {key: zlib.compress(text.encode("utf-8")) for key, text in blobs.items()}
+        key = (session.app_name, session.user_id, session.id)
+
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Session {session.id} not found for {session.app_name}/{session.user_id}.")
+            if row[1] > session.last_update_time:
+                raise ValueError(
+                    f"Session {session.id} was updated at {row[1]}, after this copy's last update at "
+                    f"{session.last_update_time}. Reload the stale session before appending."
+                )
+            self._update_shared_state(conn, session.app_name, session.user_id, app_delta, user_delta)
+            session_state = _unpack(row[0])
+            session_state.update(session_delta)
+            conn.executemany(
+                "INSERT INTO blobs (hash, data, refs) VALUES (?, ?, 1) ON CONFLICT (hash) DO UPDATE SET refs = refs + 1",
+                [(blob, compressed_blobs[blob]) for blob in refs],
+            )
+            conn.execute(
+                "INSERT INTO events (app_name, user_id, session_id, id, timestamp, payload, blob_refs) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, event.id, event.timestamp, payload, " ".join(refs)),
+            )
+            conn.execute(
+                "UPDATE sessions SET state = ?, update_time = MAX(update_time, ?) WHERE app_name = ? AND user_id = ? AND id = ?",
+                (_pack(session_state) if session_delta else row[0], event.timestamp, *key),
+            )
+
+    # --- BaseSessionService ---------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        return await asyncio.to_thread(self._create_session_sync, app_name, user_id, state, session_id)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await asyncio.to_thread(self._get_session_sync, app_name, user_id, session_id, config)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return await asyncio.to_thread(self._list_sessions_sync, app_name, user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await asyncio.to_thread(self._delete_session_sync, app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        await asyncio.to_thread(self._append_event_sync, session, event)
+        await super().append_event(session=session, event=event)
+        session.last_update_time = max(session.last_update_time, event.timestamp)
+        return event
+
+    def storage_stats(self) -> dict:
+        """
+        Sizes of the stored sessions.
+
+        Returns:
+            dict: Session, event and blob counts; "payload_bytes" and
+                "blob_bytes" as stored; "raw_bytes", the uncompressed JSON size
+                of the events with every blob reference expanded
+        """
+        with self._transaction(write=False) as conn:
+            sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            events, payload_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM events").fetchone()
+            blobs, blob_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM blobs").fetchone()
+            blob_sizes = {
+                key: len(zlib.decompress(data))
+                for key, data in conn.execute("SELECT hash, data FROM blobs")
+            }
+            raw_bytes = 0
+            for payload, refs in conn.execute("SELECT payload, blob_refs FROM events"):
+                raw_bytes += len(zlib.decompressobj(zlib.MAX_WBITS, zdict=_ZDICT).decompress(payload))
+                raw_bytes += sum(blob_sizes.get(key, 0) for key in refs.split())
+        return {
+            "sessions": sessions,
+            "events": events,
+            "blobs": blobs,
+            "payload_bytes": payload_bytes,
+            "blob_bytes": blob_bytes,
+            "raw_bytes": raw_bytes,
+        }
+
+
+_session_service = None
+_session_service_lock = threading.Lock()
+
+
+def get_session_service() -> SqliteSessionService:
+    """Return the process-wide session service for SESSION_DB_PATH."""
+    global _session_service
+    if _session_service is None:
+        with _session_service_lock:
+            if _session_service is None:
+                settings = get_settings()
+                _session_service = SqliteSessionService(
+                    settings.session_db_path,
+                    pool_size=settings.session_pool_size,
+                    blob_min_chars=settings.session_blob_min_chars,
+                )
+    return _session_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a local SQLite session database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    stats_parser = subparsers.add_parser("stats", help="Print storage sizes")
+    stats_parser.add_argument("--db", default=None, help="SQLite file (default: SESSION_DB_PATH)")
+    args = parser.parse_args()
+
+    service = SqliteSessionService(args.db) if args.db else get_session_service()
+    stats = service.storage_stats()
+    stored = stats["payload_bytes"] + stats["blob_bytes"]
+    print(f"Sessions: {stats['sessions']}  events: {stats['events']}  blobs: {stats['blobs']}")
+    print(f"Stored: {stored / 1024:.1f} KiB  (events {stats['payload_bytes'] / 1024:.1f}, blobs {stats['blob_bytes'] / 1024:.1f})")
+    if stored:
+        print(f"Uncompressed: {stats['raw_bytes'] / 1024:.1f} KiB  ({stats['raw_bytes'] / stored:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
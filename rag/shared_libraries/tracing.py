@@ -0,0 +1,502 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local Tracing of Agent Turns
+
+`AgentTracer` adds ADK before/after callbacks to every agent in a tree and
+records OpenTelemetry spans for:
+- each agent hop ("agent <name>"), nested as the turn moves between agents
+- each model call ("llm <agent>"), with the model and token usage; calls
+  answered by a callback (e.g. the semantic answer cache) are marked
+  `rag.served_by_callback`. Agents that call the model themselves (the
+  section writer) record their calls through `AgentTracer.model_call`.
+- each tool call ("tool <name>"), with the response size and, for retrieval
+  tools, top_k, threshold and chunk count
+
+Spans go to a local file, one line per span ("jsonl") or one OTLP/JSON
+export request per line ("otlp", readable by OpenTelemetry collectors). The
+summary command breaks turn latency down per phase:
+
+    python -m rag.shared_libraries.tracing summary traces.jsonl
+
+Configuration (see `rag.config.RagSettings`):
+- TRACE_EXPORT_PATH: File to write spans to; tracing is off if unset
+- TRACE_EXPORT_FORMAT: "jsonl" (default) or "otlp"
+"""
+
+import argparse
+import atexit
+import json
+import math
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Sequence
+
+from google.adk.agents import BaseAgent, LlmAgent
+from opentelemetry import trace
+from opentelemetry.context import Context
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+from ..config import get_settings
+
+TRACER_NAME = "rag.agents"
+SERVICE_NAME = "rfp-agents"
+EXPORT_FORMATS = ("jsonl", "otlp")
+
+PHASE = "rag.phase"
+AGENT = "rag.agent"
+
+
+def _span_record(span: ReadableSpan) -> dict:
+    parent = span.parent
+    return {
+        "trace_id": f"{span.context.trace_id:032x}",
+        "span_id": f"{span.context.span_id:016x}",
+        "parent_id": f"{parent.span_id:016x}" if parent else None,
+        "name": span.name,
+        "start_ns": span.start_time,
+        "end_ns": span.end_time,
+        "duration_ms": (span.end_time - span.start_time) / 1e6,
+        "status": span.status.status_code.name,
+        "attributes": dict(span.attributes or {}),
+    }
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _from_otlp_value(value: dict) -> Any:
+    kind, item = next(iter(value.items()))
+    if kind == "intValue":
+        return int(item)
+    if kind == "arrayValue":
+        return [_from_otlp_value(element) for element in item.get("values", [])]
+    return item
+
+
+def _otlp_attributes(attributes) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in (attributes or {}).items()]
+
+
+def _otlp_request(spans: Sequence[ReadableSpan]) -> dict:
+    """Encodes spans as an OTLP/JSON ExportTraceServiceRequest."""
+    resource = spans[0].resource.attributes if spans else {}
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes(resource)},
+            "scopeSpans": [{
+                "scope": {"name": TRACER_NAME},
+                "spans": [
+                    {
+                        "traceId": f"{span.context.trace_id:032x}",
+                        "spanId": f"{span.context.span_id:016x}",
+                        **({"parentSpanId": f"{span.parent.span_id:016x}"} if span.parent else {}),
+                        "name": span.name,
+                        "kind": 1,  # SPAN_KIND_INTERNAL
+                        "startTimeUnixNano": str(span.start_time),
+                        "endTimeUnixNano": str(span.end_time),
+                        "attributes": _otlp_attributes(span.attributes),
+                        "status": {"code": span.status.status_code.value},
+                    }
+                    for span in spans
+                ],
+            }],
+        }],
+    }
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends finished spans to a local file as JSONL or OTLP/JSON lines."""
+
+    def __init__(self, path: str, export_format: str = "jsonl"):
+        """
+        Args:
+            path (str): File to append to
+            export_format (str): "jsonl" for one span per line, "otlp" for
+                one OTLP/JSON export request per batch
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown trace export format '{export_format}'. Use 'jsonl' or 'otlp'.")
+        self.path = path
+        self.export_format = export_format
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        if self.export_format == "otlp":
+            lines = [json.dumps(_otlp_request(spans), separators=(",", ":"))]
+        else:
+            lines = [json.dumps(_span_record(span), separators=(",", ":"), default=str) for span in spans]
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _callbacks(callback) -> list:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def _response_size(response: Any) -> tuple[int | None, int]:
+    """Chunk count (for list results) and JSON size in bytes of a tool response."""
+    chunks = len(response) if isinstance(response, list) else None
+    return chunks, len(json.dumps(response, default=str).encode("utf-8"))
+
+
+def _set_usage(span: trace.Span, usage) -> None:
+    if usage:
+        span.set_attribute("gen_ai.usage.input_tokens", usage.prompt_token_count or 0)
+        span.set_attribute("gen_ai.usage.output_tokens", usage.candidates_token_count or 0)
+
+
+class AgentTracer:
+    """ADK callbacks recording agent, model and tool spans."""
+
+    def __init__(self, tracer: trace.Tracer):
+        """
+        Args:
+            tracer (Tracer): OpenTelemetry tracer the spans are created with
+        """
+        self.tracer = tracer
+        # Open agent spans per invocation, innermost last
+        self._agents: dict[str, list[tuple[str, trace.Span]]] = defaultdict(list)
+        # Open model and tool spans, by (invocation, agent) and function call ID
+        self._models: dict[tuple[str, str], trace.Span] = {}
+        self._tools: dict[str, trace.Span] = {}
+
+    def _parent(self, invocation_id: str, agent_name: str):
+        stack = self._agents.get(invocation_id) or []
+        for name, span in reversed(stack):
+            if name == agent_name:
+                return trace.set_span_in_context(span)
+        return trace.set_span_in_context(stack[-1][1]) if stack else None
+
+    def _end_model_span(self, key: tuple[str, str], served_by_callback: bool) -> None:
+        span = self._models.pop(key, None)
+        if span is not None:
+            span.set_attribute("rag.served_by_callback", served_by_callback)
+            span.end()
+
+    def before_agent_callback(self, callback_context):
+        invocation_id, agent_name = callback_context.invocation_id, callback_context.agent_name
+        stack = self._agents[invocation_id]
+        span = self.tracer.start_span(
+            f"agent {agent_name}",
+            # A turn's first agent starts a new trace, even inside other tracing
+            context=trace.set_span_in_context(stack[-1][1]) if stack else Context(),
+            attributes={PHASE: "agent", AGENT: agent_name, "rag.invocation_id": invocation_id},
+        )
+        stack.append((agent_name, span))
+        return None
+
+    def after_agent_callback(self, callback_context):
+        invocation_id, agent_name = callback_context.invocation_id, callback_context.agent_name
+        # A model call answered by a before-model callback never reaches after_model
+        self._end_model_span((invocation_id, agent_name), served_by_callback=True)
+        stack = self._agents.get(invocation_id) or []
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index][0] == agent_name:
+                stack.pop(index)[1].end()
+                break
+        if not stack:
+            self._agents.pop(invocation_id, None)
+        return None
+
+    def before_model_callback(self, callback_context, llm_request):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        self._end_model_span(key, served_by_callback=True)
+        self._models[key] = self.tracer.start_span(
+            f"llm {callback_context.agent_name}",
+            context=self._parent(*key),
+            attributes={
+                PHASE: "llm",
+                AGENT: callback_context.agent_name,
+                "gen_ai.request.model": llm_request.model or "",
+                "rag.request.contents": len(llm_request.contents),
+            },
+        )
+        return None
+
+    def after_model_callback(self, callback_context, llm_response):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        span = self._models.get(key)
+        if span is None:
+            return None
+        _set_usage(span, llm_response.usage_metadata)
+        if llm_response.error_code:
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(llm_response.error_code)))
+        if not llm_response.partial:
+            self._end_model_span(key, served_by_callback=False)
+        return None
+
+    def before_tool_callback(self, tool, args, tool_context):
+        attributes = {PHASE: "tool", AGENT: tool_context.agent_name, "rag.tool": tool.name}
+        for attribute, name in (("similarity_top_k", "top_k"), ("vector_distance_threshold", "threshold")):
+            value = getattr(tool, attribute, None)
+            if value is not None:
+                attributes[f"rag.retrieval.{name}"] = value
+        self._tools[tool_context.function_call_id or tool.name] = self.tracer.start_span(
+            f"tool {tool.name}",
+            context=self._parent(tool_context.invocation_id, tool_context.agent_name),
+            attributes=attributes,
+        )
+        return None
+
+    def after_tool_callback(self, tool, args, tool_context, tool_response):
+        span = self._tools.pop(tool_context.function_call_id or tool.name, None)
+        if span is None:
+            return None
+        chunks, size = _response_size(tool_response)
+        if chunks is not None:
+            span.set_attribute("rag.retrieval.chunks", chunks)
+        span.set_attribute("rag.tool.response_bytes", size)
+        span.end()
+        return None
+
+    @contextmanager
+    def model_call(self, invocation_id: str, agent_name: str, model: str):
+        """
+        Record a model call made without the ADK model callbacks.
+
+        Unlike the callbacks, concurrent calls of one agent get a span each.
+
+        Args:
+            invocation_id (str): The invocation making the call
+            agent_name (str): The agent making the call
+            model (str): The model called
+
+        Yields:
+            callable: Records a response's token usage on the span
+        """
+        span = self.tracer.start_span(
+            f"llm {agent_name}",
+            context=self._parent(invocation_id, agent_name),
+            attributes={
+                PHASE: "llm",
+                AGENT: agent_name,
+                "gen_ai.request.model": model,
+                "rag.served_by_callback": False,
+            },
+        )
+        with trace.use_span(span, end_on_exit=True):
+            yield lambda response: _set_usage(span, getattr(response, "usage_metadata", None))
+
+    def instrument(self, agent: BaseAgent) -> BaseAgent:
+        """
+        Add the tracing callbacks to every agent in a tree, ahead of existing ones.
+
+        Agents that are already instrumented are left as they are. Agents
+        with a `model_tracer` field get this tracer for `model_call`.
+
+        Args:
+            agent (BaseAgent): Root of the agent tree
+
+        Returns:
+            BaseAgent: The same agent
+        """
+        hooks = ["before_agent_callback", "after_agent_callback"]
+        if isinstance(agent, LlmAgent):
+            hooks += ["before_model_callback", "after_model_callback", "before_tool_callback", "after_tool_callback"]
+        for hook in hooks:
+            callback = getattr(self, hook)
+            existing = _callbacks(getattr(agent, hook))
+            if callback not in existing:
+                setattr(agent, hook, [callback, *existing])
+        if getattr(agent, "model_tracer", False) is None:
+            agent.model_tracer = self
+        for sub_agent in agent.sub_agents:
+            self.instrument(sub_agent)
+        return agent
+
+
+def create_tracer(path: str, export_format: str = "jsonl") -> tuple[AgentTracer, TracerProvider]:
+    """
+    Create an agent tracer exporting to a local file.
+
+    The tracer provider is private to the tracer, so the global
+    OpenTelemetry setup (e.g. Cloud Trace on Agent Engine) is unaffected.
+
+    Args:
+        path (str): File to append spans to
+        export_format (str): "jsonl" or "otlp"
+
+    Returns:
+        tuple: The agent tracer and its provider, to flush or shut down
+    """
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(FileSpanExporter(path, export_format)))
+    return AgentTracer(provider.get_tracer(TRACER_NAME)), provider
+
+
+_agent_tracer = None
+_agent_tracer_lock = threading.Lock()
+
+
+def get_agent_tracer() -> AgentTracer | None:
+    """
+    Get the process-wide agent tracer, creating it on first use.
+
+    Returns:
+        AgentTracer | None: The tracer, or None if TRACE_EXPORT_PATH is unset
+    """
+    global _agent_tracer
+    with _agent_tracer_lock:
+        settings = get_settings()
+        if _agent_tracer is None and settings.trace_export_path:
+            _agent_tracer, provider = create_tracer(settings.trace_export_path, settings.trace_export_format)
+            atexit.register(provider.shutdown)
+        return _agent_tracer
+
+
+def apply_configured_tracing(agent: BaseAgent) -> BaseAgent:
+    """Instrument an agent tree if TRACE_EXPORT_PATH is set; returns the agent."""
+    tracer = get_agent_tracer()
+    return tracer.instrument(agent) if tracer else agent
+
+
+def read_spans(path: str) -> list[dict]:
+    """
+    Read spans written by `FileSpanExporter` in either format.
+
+    Returns:
+        list: Spans as dicts with trace_id, span_id, parent_id, name,
+            duration_ms and attributes
+    """
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "resourceSpans" not in record:
+                spans.append(record)
+                continue
+            for resource_spans in record["resourceSpans"]:
+                for scope_spans in resource_spans["scopeSpans"]:
+                    for span in scope_spans["spans"]:
+                        spans.append({
+                            "trace_id": span["traceId"],
+                            "span_id": span["spanId"],
+                            "parent_id": span.get("parentSpanId"),
+                            "name": span["name"],
+                            "duration_ms": (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6,
+                            "attributes": {
+                                attribute["key"]: _from_otlp_value(attribute["value"])
+                                for attribute in span.get("attributes", [])
+                            },
+                        })
+    return spans
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)] if ordered else 0.0
+
+
+def summarize(spans: list[dict]) -> dict:
+    """
+    Break turn latency down per phase.
+
+    A turn is a root agent span. Its time is split into model calls, tool
+    calls and the rest ("framework": routing, callbacks and orchestration).
+
+    Returns:
+        dict: turns, the mean turn time, per-phase totals and shares, and
+            per-span-name count, mean, p50 and p95 latency
+    """
+    roots = [span for span in spans if not span["parent_id"]]
+    turn_ms = sum(span["duration_ms"] for span in roots)
+    phases: dict[str, float] = defaultdict(float)
+    names: dict[str, list[float]] = defaultdict(list)
+    tools = {"calls": 0, "chunks": 0, "bytes": 0}
+    for span in spans:
+        phase = span["attributes"].get(PHASE)
+        names[span["name"]].append(span["duration_ms"])
+        if phase in ("llm", "tool"):
+            phases[phase] += span["duration_ms"]
+        if phase == "tool":
+            tools["calls"] += 1
+            tools["chunks"] += int(span["attributes"].get("rag.retrieval.chunks", 0))
+            tools["bytes"] += int(span["attributes"].get("rag.tool.response_bytes", 0))
+    phases["framework"] = max(0.0, turn_ms - phases["llm"] - phases["tool"])
+    return {
+        "turns": len(roots),
+        "turn_mean_ms": turn_ms / len(roots) if roots else 0.0,
+        "phases": {
+            phase: {"total_ms": total, "share": total / turn_ms if turn_ms else 0.0}
+            for phase, total in phases.items()
+        },
+        "spans": {
+            name: {
+                "count": len(durations),
+                "mean_ms": sum(durations) / len(durations),
+                "p50_ms": _percentile(durations, 50),
+                "p95_ms": _percentile(durations, 95),
+            }
+            for name, durations in sorted(names.items())
+        },
+        "tool_calls": tools,
+    }
+
+
+def format_summary(summary: dict) -> str:
+    lines = [f"{summary['turns']} turns, {summary['turn_mean_ms']:.1f}ms mean", "", "Phase breakdown:"]
+    for phase, values in summary["phases"].items():
+        lines.append(f"  {phase:<12}{values['total_ms']:>12.1f}ms{values['share']:>8.0%}")
+    lines += ["", f"{'span':<40}{'count':>7}{'mean (ms)':>12}{'p50 (ms)':>11}{'p95 (ms)':>11}"]
+    for name, values in summary["spans"].items():
+        lines.append(
+            f"{name:<40}{values['count']:>7}{values['mean_ms']:>12.1f}"
+            f"{values['p50_ms']:>11.1f}{values['p95_ms']:>11.1f}"
+        )
+    tools = summary["tool_calls"]
+    if tools["calls"]:
+        lines += [
+            "",
+            f"Tool responses: {tools['chunks'] / tools['calls']:.1f} chunks, "
+            f"{tools['bytes'] / tools['calls'] / 1024:.1f}KB per call",
+        ]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise local agent traces.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    summary_parser = subparsers.add_parser("summary", help="Per-phase latency breakdown of a trace file")
+    summary_parser.add_argument("path", help="Trace file written with TRACE_EXPORT_PATH")
+    summary_parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    summary = summarize(read_spans(args.path))
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -31,8 +31,12 @@ def test_agent_availability():
         try:
             agent = get_agent(agent_name)
             print(f"✅ {agent_name}: {descriptions[agent_name]}")
-            print(f"   Model: {agent.model}")
-            print(f"   Tools: {len(agent.tools)} tool(s)")
+            if hasattr(agent, "model"):
+                print(f"   Model: {agent.model}")
+                print(f"   Tools: {len(agent.tools)} tool(s)")
+            else:
+                sub_agents = ", ".join(sub_agent.name for sub_agent in agent.sub_agents)
+                print(f"   Routes to: {sub_agents}")
             print()
         except Exception as e:
             print(f"❌ {agent_name}: Error - {e}")
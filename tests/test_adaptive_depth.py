@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rag.shared_libraries.adaptive_depth import choose_depth, get_depth_stats, is_flat
+from rag.shared_libraries.retrieval import RagRetrievalTool
+
+
+def make_chunks(distances, words=20):
+    return [{"title": "G.pdf", "text": " ".join(["word"] * words), "distance": d} for d in distances]
+
+
+def test_cuts_at_knee_after_min_k():
+    choice = choose_depth(make_chunks([0.10, 0.12, 0.13, 0.15, 0.40, 0.42, 0.45]))
+    assert (choice.depth, choice.reason) == (4, "knee")
+
+
+def test_keeps_min_k_even_with_an_earlier_knee():
+    choice = choose_depth(make_chunks([0.10, 0.40, 0.41, 0.42, 0.43]), min_k=3)
+    assert choice.depth >= 3
+
+
+def test_token_budget_caps_depth_but_keeps_one_chunk():
+    chunks = make_chunks([0.1, 0.11, 0.12, 0.13], words=200)  # ~250 tokens each
+    assert choose_depth(chunks, token_budget=600).depth == 2
+    assert choose_depth(chunks, token_budget=10).depth == 1
+    assert choose_depth(chunks, token_budget=600).reason == "budget"
+
+
+def test_unsorted_or_missing_distances_skip_the_knee():
+    assert choose_depth(make_chunks([0.1, 0.5, 0.2, 0.6, 0.7])).reason == "all"
+    assert choose_depth([{"text": "a"}] * 5).depth == 5
+    assert is_flat(make_chunks([0.30, 0.31, 0.33]))
+    assert not is_flat(make_chunks([0.1, 0.4]))
+
+
+class FakeClient:
+    def __init__(self, distances_by_k):
+        self.distances_by_k = distances_by_k
+        self.calls = []
+
+    async def retrieve_async(self, query, similarity_top_k=None, vector_distance_threshold=None):
+        self.calls.append(similarity_top_k)
+        return make_chunks(self.distances_by_k[similarity_top_k])
+
+
+@pytest.mark.asyncio
+async def test_tool_widens_flat_results_and_records_stats():
+    flat = [0.30 + i * 0.001 for i in range(4)]
+    widened = flat + [0.304, 0.305, 0.6, 0.62]
+    client = FakeClient({4: flat, 8: widened})
+    tool = RagRetrievalTool(
+        name="adaptive_test_tool",
+        description="test",
+        similarity_top_k=4,
+        client=client,
+        memo=False,
+        adaptive=True,
+        pack=False,
+    )
+
+    result = await tool.run_async(args={"query": "scope"}, tool_context=None)
+
+    assert client.calls == [4, 8]
+    assert len(result) == 6
+    stats = get_depth_stats().stats()["adaptive_test_tool"]
+    assert stats["calls"] == 1 and stats["widened"] == 1 and stats["mean_depth"] == 6
+    assert stats["reasons"] == {"knee": 1}
@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+
+import pytest
+from google.api_core.exceptions import ResourceExhausted
+from google.genai import errors
+
+from rag.batch_validation import collect_documents, is_rate_limited, parse_score, validate_documents
+
+
+async def no_sleep(seconds):
+    pass
+
+
+@pytest.fixture
+def rfp_dir(tmp_path):
+    (tmp_path / "nested").mkdir()
+    for name in ("a.md", "b.txt", "nested/c.md"):
+        (tmp_path / name).write_text(f"RFP {name}", encoding="utf-8")
+    (tmp_path / "notes.json").write_text("{}", encoding="utf-8")
+    return tmp_path
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_collects_rfp_documents_and_parses_scores(rfp_dir):
+    names = [path[len(str(rfp_dir)) + 1:] for path in collect_documents(str(rfp_dir))]
+    assert names == ["a.md", "b.txt", "nested/c.md"]
+    assert parse_score("**RFP Validation Report**\n**Overall Compliance Score: 7.5/10**") == 7.5
+    assert parse_score("no score") is None
+    assert is_rate_limited(ResourceExhausted("quota"))
+    assert not is_rate_limited(ValueError("bad input"))
+
+
+@pytest.mark.parametrize("error, expected", [
+    (errors.ClientError(429, {"error": {"code": 429, "message": "Slow down", "status": "RESOURCE_EXHAUSTED"}}), True),
+    (RuntimeError("429 Too Many Requests"), True),
+    (RuntimeError("Agent Engine query failed: HTTP 429"), True),
+    (ValueError("Document too long: 14290 tokens"), False),
+    (ValueError("Page 429 has no text"), False),
+    (errors.ServerError(500, {"error": {"code": 500, "message": "Internal error on chunk 429"}}), False),
+])
+def test_rate_limit_needs_a_429_status(error, expected):
+    assert is_rate_limited(error) is expected
+
+
+@pytest.mark.asyncio
+async def test_bounded_concurrency_retries_and_streaming(rfp_dir, tmp_path):
+    active = 0
+    peak = 0
+    calls = {}
+
+    async def validate(message):
+        nonlocal active, peak
+        calls[message] = calls.get(message, 0) + 1
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if "a.md" in message and calls[message] == 1:
+            raise ResourceExhausted("429 rate limited")
+        if "b.txt" in message:
+            raise ValueError("model error")
+        return "Overall Compliance Score: 8/10"
+
+    output = tmp_path / "results.jsonl"
+    summary = await validate_documents(
+        collect_documents(str(rfp_dir)), validate, str(output), concurrency=2, root=str(rfp_dir), sleep=no_sleep
+    )
+
+    assert peak == 2
+    assert summary.succeeded == 2 and summary.failed == 1 and summary.rate_limited == 1
+    results = {record["document"]: record for record in read_results(output)}
+    assert results["a.md"]["attempts"] == 2 and results["a.md"]["score"] == 8.0
+    assert not results["b.txt"]["ok"] and "model error" in results["b.txt"]["error"]
+    assert "documents/min" in summary.format()
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_validated_documents(rfp_dir, tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text(json.dumps({"document": "a.md", "ok": True}) + "\n", encoding="utf-8")
+    seen = []
+
+    async def validate(message):
+        seen.append(message)
+        return "Overall Compliance Score: 6/10"
+
+    summary = await validate_documents(
+        collect_documents(str(rfp_dir)), validate, str(output), resume=True, root=str(rfp_dir)
+    )
+
+    assert summary.skipped == 1 and summary.succeeded == 2
+    assert not any("a.md" in message for message in seen)
+    assert len(read_results(output)) == 3
@@ -0,0 +1,170 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+import requests
+from google.api_core.exceptions import ResourceExhausted
+
+from rag.shared_libraries.bulk_ingest import (
+    AdaptiveRateLimiter,
+    Checkpoint,
+    collect_directory,
+    ingest,
+    is_quota_error,
+    read_manifest,
+)
+
+CORPUS = "projects/p/locations/l/ragCorpora/1"
+
+
+def quota_error():
+    """The error `rag.upload_file` raises when the embedding quota is exhausted."""
+    return RuntimeError(
+        "Failed in indexing the RagFile due to: ",
+        {"code": 429, "message": "Quota exceeded for aiplatform.googleapis.com/...", "status": "RESOURCE_EXHAUSTED"},
+    )
+
+
+def make_files(tmp_path, count):
+    (tmp_path / "docs" / "nested").mkdir(parents=True)
+    for i in range(count):
+        folder = tmp_path / "docs" / ("nested" if i % 2 else "")
+        (folder / f"rfp_{i}.pdf").write_bytes(b"%PDF" + bytes(i))
+    (tmp_path / "docs" / "notes.tmp").write_text("skip me")
+    return collect_directory(str(tmp_path / "docs"))
+
+
+def fast_limiter():
+    return AdaptiveRateLimiter(rate=1000.0, max_rate=1000.0, sleep=lambda seconds: None)
+
+
+def test_collect_directory_and_manifest(tmp_path):
+    items = make_files(tmp_path, 3)
+    assert [item.display_name for item in items] == ["nested/rfp_1.pdf", "rfp_0.pdf", "rfp_2.pdf"]
+
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(json.dumps({"path": "docs/rfp_0.pdf", "description": "Old RFP"}) + "\n\n")
+    [item] = read_manifest(str(manifest))
+    assert item.path == items[1].path
+    assert (item.display_name, item.description) == ("rfp_0.pdf", "Old RFP")
+
+
+def test_rate_limiter_backs_off_and_recovers():
+    now = [0.0]
+    slept = []
+    limiter = AdaptiveRateLimiter(
+        rate=4.0, min_rate=1.0, increase=0.5, clock=lambda: now[0], sleep=slept.append
+    )
+    limiter.acquire()
+    limiter.acquire()
+    assert slept == [0.25]
+
+    limiter.on_throttled()
+    limiter.on_throttled()
+    assert limiter.rate == 1.0
+    limiter.on_throttled()
+    assert limiter.rate == 1.0
+    limiter.on_success()
+    assert limiter.rate == 1.5
+
+
+def test_ingest_retries_throttled_uploads(tmp_path):
+    items = make_files(tmp_path, 6)
+    attempts = {}
+    lock = threading.Lock()
+
+    def upload(item):
+        with lock:
+            attempts[item.path] = attempts.get(item.path, 0) + 1
+            if attempts[item.path] == 1 and item.display_name.startswith("nested"):
+                raise quota_error()
+        return SimpleNamespace(name=f"{CORPUS}/ragFiles/{item.display_name}")
+
+    summary = ingest(CORPUS, items, upload, concurrency=3, limiter=fast_limiter())
+    assert (summary.uploaded, summary.failed, summary.throttled) == (6, 0, 3)
+    assert summary.bytes_uploaded == sum(4 + i for i in range(6))
+    assert "6 uploaded" in summary.format()
+
+
+def test_ingest_reports_failures_without_stopping(tmp_path):
+    items = make_files(tmp_path, 3)
+
+    def upload(item):
+        if item.display_name == "rfp_0.pdf":
+            raise ValueError("unsupported file")
+        if item.display_name == "rfp_2.pdf":
+            raise quota_error()
+
+    summary = ingest(CORPUS, items, upload, limiter=fast_limiter(), max_attempts=2)
+    assert summary.uploaded == 1
+    assert summary.errors[items[1].path] == "unsupported file"
+    assert summary.errors[items[2].path].startswith("quota exhausted after 2 attempts")
+
+
+def wrapped(cause):
+    try:
+        raise cause
+    except Exception as e:
+        error = RuntimeError("Failed in uploading the RagFile due to: ", e)
+        error.__cause__ = e
+        return error
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (quota_error(), True),
+        (wrapped(ResourceExhausted("Quota exceeded")), True),
+        (wrapped(requests.HTTPError("429 Client Error: Too Many Requests")), True),
+        (ResourceExhausted("quota"), True),
+        (RuntimeError("Failed in indexing the RagFile due to: ", {"code": 400, "message": "page 429 is empty"}), False),
+        (RuntimeError("connection reset after 429 bytes"), False),
+    ],
+)
+def test_recognises_quota_errors_from_upload_file(error, expected):
+    assert is_quota_error(error) is expected
+
+
+def test_checkpoint_resumes_interrupted_run(tmp_path):
+    items = make_files(tmp_path, 4)
+    checkpoint_path = str(tmp_path / "checkpoint.jsonl")
+    uploaded = []
+
+    def flaky_upload(item):
+        if item is items[2]:
+            raise RuntimeError("connection reset")
+        uploaded.append(item.path)
+
+    ingest(CORPUS, items, flaky_upload, limiter=fast_limiter(), checkpoint=Checkpoint(checkpoint_path))
+    with open(checkpoint_path, "a") as f:
+        f.write('{"corpus": "trunc')
+
+    uploaded.clear()
+    summary = ingest(
+        CORPUS, items, lambda item: uploaded.append(item.path),
+        limiter=fast_limiter(), checkpoint=Checkpoint(checkpoint_path),
+    )
+    assert uploaded == [items[2].path]
+    assert (summary.skipped, summary.uploaded) == (3, 1)
+
+    # Another corpus, or an edited file, is uploaded again
+    assert not Checkpoint(checkpoint_path).is_done("other", items[0])
+    edited = next(item for item in items if item.display_name == "rfp_0.pdf")
+    assert Checkpoint(checkpoint_path).is_done(CORPUS, edited)
+    (tmp_path / "docs" / "rfp_0.pdf").write_bytes(b"%PDF changed")
+    assert not Checkpoint(checkpoint_path).is_done(CORPUS, edited)
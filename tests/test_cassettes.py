@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from rag.shared_libraries.cassettes import (
+    LLM_KIND,
+    RETRIEVAL_KIND,
+    CassetteGenaiClient,
+    CassetteLlm,
+    CassetteMiss,
+    CassetteRetrievalClient,
+    CassetteStore,
+    use_cassettes,
+)
+from rag.sectioned_creation import RfpPlan, SectionedRfpWriter, SectionPlan
+from rag.shared_libraries.offline import FakeRetrievalClient, ScriptedLlm
+from rag.shared_libraries.retrieval import RagRetrievalTool
+
+QUESTION = "What should be included in an RFP?"
+
+
+def make_agent(model, retrieval):
+    tool = RagRetrievalTool(name="retrieve_rfp_guidelines", description="test", client=retrieval, memo=False)
+    return LlmAgent(name="guidelines_agent", model=model, instruction="Answer.", tools=[tool])
+
+
+async def ask(agent, text):
+    session_service = InMemorySessionService()
+    runner = Runner(app_name="test", agent=agent, session_service=session_service)
+    session = await session_service.create_session(app_name="test", user_id="user")
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    return [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+
+
+def count(store, kind):
+    return len(list(pathlib.Path(store.directory, kind).rglob("*.json.gz")))
+
+
+@pytest.mark.asyncio
+async def test_recorded_conversation_replays_without_live_services(tmp_path):
+    store = CassetteStore(str(tmp_path))
+    live_llm = ScriptedLlm(model="gemini-2.5-flash", responses={"guidelines_agent": "Include a scope of work."})
+    live_retrieval = FakeRetrievalClient()
+    recording = use_cassettes(
+        make_agent(live_llm, CassetteRetrievalClient(store, "record", ["fake"], inner=live_retrieval)),
+        store,
+        "record",
+    )
+    recorded = await ask(recording, QUESTION)
+    assert live_llm.requests == 2
+    assert count(store, LLM_KIND) == 2 and count(store, RETRIEVAL_KIND) == 1
+
+    replaying = use_cassettes(
+        make_agent("gemini-2.5-flash", CassetteRetrievalClient(store, "replay", ["fake"])), store, "replay"
+    )
+    replayed = await ask(replaying, QUESTION)
+
+    assert replaying.model.inner is None  # the live model was never created
+    def summary(events):
+        return [
+            ([(call.name, call.args) for call in e.get_function_calls()], e.content.parts[0].text)
+            for e in events
+        ]
+
+    assert summary(replayed) == summary(recorded)
+    assert replayed[-1].content.parts[0].text == "Include a scope of work."
+
+
+@pytest.mark.asyncio
+async def test_replay_miss_fails_loudly(tmp_path):
+    store = CassetteStore(str(tmp_path))
+    agent = use_cassettes(make_agent("gemini-2.5-flash", FakeRetrievalClient()), store, "replay")
+    with pytest.raises(CassetteMiss, match="CASSETTE_MODE=record"):
+        await ask(agent, QUESTION)
+
+    client = CassetteRetrievalClient(store, "replay", ["fake"])
+    with pytest.raises(CassetteMiss, match="retrieval cassette"):
+        client.retrieve(QUESTION, similarity_top_k=5)
+
+
+def test_use_cassettes_wraps_each_model_once(tmp_path):
+    store = CassetteStore(str(tmp_path))
+    agent = make_agent("gemini-2.5-flash", FakeRetrievalClient())
+
+    use_cassettes(agent, store, "replay")
+    wrapped = agent.model
+    use_cassettes(agent, store, "replay")
+
+    assert isinstance(wrapped, CassetteLlm) and wrapped.model == "gemini-2.5-flash"
+    assert agent.model is wrapped
+    with pytest.raises(ValueError):
+        use_cassettes(agent, store, "rewind")
+
+
+class PlanningModels:
+    """Stand-in for a live `client.aio.models` that plans a two-section RFP."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        plan = RfpPlan(title="Cloud Migration RFP", sections=[
+            SectionPlan(heading=heading, brief=heading, query=heading) for heading in ("Scope", "Budget")
+        ])
+        content = types.Content(role="model", parts=[types.Part(text=plan.model_dump_json())])
+        return types.GenerateContentResponse(candidates=[types.Candidate(content=content)])
+
+
+@pytest.mark.asyncio
+async def test_direct_gemini_calls_replay_without_live_client(tmp_path):
+    store = CassetteStore(str(tmp_path))
+    live = PlanningModels()
+    recording = CassetteGenaiClient(store, "record", inner=SimpleNamespace(aio=SimpleNamespace(models=live)))
+    recorded = await SectionedRfpWriter(name="writer", model="gemini-2.5-flash", client=recording).plan("budget SAR 5M")
+
+    replaying = CassetteGenaiClient(store, "replay")
+    writer = SectionedRfpWriter(name="writer", model="gemini-2.5-flash", client=replaying)
+    assert await writer.plan("budget SAR 5M") == recorded
+    assert live.calls == 1 and count(store, LLM_KIND) == 1
+    with pytest.raises(CassetteMiss, match="budget SAR 6M"):
+        await writer.plan("budget SAR 6M")
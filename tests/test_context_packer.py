@@ -0,0 +1,72 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from rag.shared_libraries.context_packer import ContextPacker, fit_budget, merge_adjacent, remove_near_duplicates
+
+SECTION = "5 EVALUATION CRITERIA"
+WORDS = [f"w{i}" for i in range(120)]
+
+
+def chunk(id_, words, section=SECTION, page=4, distance=0.2, title="Guidelines.pdf"):
+    return {
+        "id": id_,
+        "title": title,
+        "source_uri": f"/docs/{title}",
+        "section": section,
+        "page": page,
+        "text": f"{section}\n" + " ".join(words),
+        "distance": distance,
+    }
+
+
+def test_drops_near_duplicates_keeping_the_closer_chunk():
+    first = chunk("a#1", WORDS[:60], distance=0.1)
+    near_copy = chunk("b#9", WORDS[:58] + ["x", "y"], title="Copy.pdf", distance=0.2)
+    other = chunk("a#7", WORDS[60:], distance=0.3)
+
+    assert remove_near_duplicates([first, near_copy, other]) == [first, other]
+
+
+def test_merges_overlapping_and_consecutive_chunks_of_a_section():
+    first = chunk("g#3", WORDS[:50], page=4, distance=0.3)
+    overlapping = chunk("g#4", WORDS[40:90], page=5, distance=0.1)
+    other_section = chunk("g#5", WORDS[80:120], section="6 BUDGET", page=5)
+
+    merged = merge_adjacent([overlapping, other_section, first])
+
+    assert len(merged) == 2
+    assert merged[0]["id"] == "g#4"
+    assert merged[0]["text"] == f"{SECTION}\n" + " ".join(WORDS[:90])
+    assert (merged[0]["page"], merged[0]["page_end"], merged[0]["distance"]) == (4, 5, 0.1)
+    assert merged[1] is other_section
+
+
+def test_budget_truncates_last_chunk_and_keeps_titles():
+    chunks = [chunk(f"g#{i}", [f"word{i}"] * 200, section=f"S{i}") for i in range(3)]
+
+    fitted = fit_budget(chunks, token_budget=400)
+
+    assert len(fitted) == 2
+    assert fitted[1]["text"].endswith("…") and len(fitted[1]["text"]) < len(chunks[1]["text"])
+    assert all(c["title"] == "Guidelines.pdf" for c in fitted)
+
+
+def test_compression_keeps_heading_and_relevant_sentences():
+    text = f"{SECTION}\nVendors submit a technical proposal. Price is scored out of 30 points. Late bids are rejected."
+    packer = ContextPacker(compress=True)
+
+    packed, stats = packer.pack("how is price scored", [{**chunk("g#1", []), "text": text}])
+
+    assert packed[0]["text"] == f"{SECTION}\nPrice is scored out of 30 points."
+    assert stats.tokens_out < stats.tokens_in
@@ -0,0 +1,121 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+from google.api_core.exceptions import NotFound, PermissionDenied
+
+from rag.shared_libraries.corpus_resolver import CorpusResolver, is_not_found
+
+SCOPE = "project/us-central1"
+
+
+class FakeRag:
+    """Counts corpus API calls."""
+
+    def __init__(self, count):
+        self.corpora = {
+            f"projects/p/locations/l/ragCorpora/{i}": SimpleNamespace(
+                name=f"projects/p/locations/l/ragCorpora/{i}", display_name=f"corpus {i}"
+            )
+            for i in range(count)
+        }
+        self.gets = 0
+        self.listed = 0
+
+    def get_corpus(self, name):
+        self.gets += 1
+        if name not in self.corpora:
+            # The shape `rag.get_corpus` raises
+            try:
+                raise NotFound(f"RagCorpus {name} not found")
+            except NotFound as e:
+                raise RuntimeError("Failed in getting the RagCorpus due to: ", e) from e
+        return self.corpora[name]
+
+    def list_corpora(self):
+        for corpus in self.corpora.values():
+            self.listed += 1
+            yield corpus
+
+    def resolver(self, path):
+        return CorpusResolver(path, SCOPE, self.get_corpus, self.list_corpora)
+
+
+def test_second_run_uses_one_get_call(tmp_path):
+    rag = FakeRag(50)
+    path = str(tmp_path / "index.json")
+    assert rag.resolver(path).resolve("corpus 7").name.endswith("/7")
+    assert rag.listed == 8
+
+    rag.listed = 0
+    resolver = rag.resolver(path)
+    assert resolver.resolve("corpus 7").display_name == "corpus 7"
+    assert (rag.listed, rag.gets, resolver.scans) == (0, 1, 0)
+
+
+def test_resolves_several_names_in_one_scan(tmp_path):
+    rag = FakeRag(20)
+    resolver = rag.resolver(str(tmp_path / "index.json"))
+    result = resolver.resolve_many(["corpus 3", "corpus 12", "missing"])
+    assert result["corpus 3"].name.endswith("/3")
+    assert result["corpus 12"].name.endswith("/12")
+    assert result["missing"] is None
+    assert resolver.scans == 1
+
+
+def test_stale_entries_fall_back_to_scan(tmp_path):
+    rag = FakeRag(3)
+    path = str(tmp_path / "index.json")
+    rag.resolver(path).resolve_many(["corpus 0", "corpus 1"])
+
+    # Deleted, then renamed
+    del rag.corpora["projects/p/locations/l/ragCorpora/0"]
+    rag.corpora["projects/p/locations/l/ragCorpora/1"].display_name = "renamed"
+    resolver = rag.resolver(path)
+    assert resolver.resolve_many(["corpus 0", "corpus 1"]) == {"corpus 0": None, "corpus 1": None}
+    assert resolver.scans == 1
+
+    created = SimpleNamespace(name="projects/p/locations/l/ragCorpora/9", display_name="corpus 0")
+    rag.corpora[created.name] = created
+    resolver.remember(created)
+    rag.listed = 0
+    assert rag.resolver(path).resolve("corpus 0") is created
+    assert rag.listed == 0
+
+
+def test_only_missing_corpora_count_as_misses(tmp_path):
+    rag = FakeRag(1)
+    path = str(tmp_path / "index.json")
+    rag.resolver(path).resolve("corpus 0")
+
+    def denied(name):
+        try:
+            raise PermissionDenied("caller lacks aiplatform.ragCorpora.get")
+        except PermissionDenied as e:
+            raise RuntimeError("Failed in getting the RagCorpus due to: ", e) from e
+
+    resolver = CorpusResolver(path, SCOPE, denied, rag.list_corpora)
+    with pytest.raises(RuntimeError):
+        resolver.resolve("corpus 0")
+    assert is_not_found(RuntimeError("Failed in getting the RagCorpus due to: ", NotFound("gone")))
+
+
+def test_index_is_scoped_to_project_and_location(tmp_path):
+    rag = FakeRag(2)
+    path = str(tmp_path / "index.json")
+    rag.resolver(path).resolve("corpus 1")
+    other = CorpusResolver(path, "other/europe-west1", rag.get_corpus, lambda: iter(()))
+    assert other.resolve("corpus 1") is None
@@ -0,0 +1,138 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from rag.shared_libraries.bulk_ingest import AdaptiveRateLimiter, collect_directory
+from rag.shared_libraries.corpus_sync import SyncState, sync_corpus
+
+CORPUS = "projects/p/locations/l/ragCorpora/1"
+
+
+class FakeCorpus:
+    """In-memory stand-in for the RAG file API."""
+
+    def __init__(self):
+        self.files = {}
+        self.uploads = []
+        self._ids = itertools.count()
+
+    def upload(self, item):
+        name = f"{CORPUS}/ragFiles/{next(self._ids)}"
+        self.files[name] = item.display_name
+        self.uploads.append(item.display_name)
+        return SimpleNamespace(name=name)
+
+    def delete(self, name):
+        del self.files[name]
+
+    def list_files(self):
+        return [SimpleNamespace(name=name, display_name=display) for name, display in self.files.items()]
+
+
+@pytest.fixture
+def docs(tmp_path):
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        (folder / name).write_bytes(name.encode())
+    return folder
+
+
+def run_sync(corpus, docs, state):
+    return sync_corpus(
+        CORPUS,
+        collect_directory(str(docs)),
+        corpus.list_files(),
+        corpus.upload,
+        corpus.delete,
+        state,
+        limiter=AdaptiveRateLimiter(rate=1000.0, sleep=lambda seconds: None),
+    )
+
+
+def test_sync_only_uploads_changes(docs, tmp_path):
+    corpus = FakeCorpus()
+    state_path = str(tmp_path / "state.json")
+
+    summary = run_sync(corpus, docs, SyncState(state_path))
+    assert sorted(corpus.uploads) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert (summary.unchanged, summary.ingest.uploaded, summary.deleted) == (0, 3, 0)
+
+    corpus.uploads.clear()
+    summary = run_sync(corpus, docs, SyncState(state_path))
+    assert corpus.uploads == []
+    assert summary.unchanged == 3
+
+    # Touching a file without changing its content costs nothing
+    (docs / "a.pdf").write_bytes(b"a.pdf")
+    (docs / "b.pdf").write_bytes(b"b.pdf v2")
+    (docs / "c.pdf").unlink()
+    (docs / "d.pdf").write_bytes(b"d.pdf")
+    summary = run_sync(corpus, docs, SyncState(state_path))
+    assert sorted(corpus.uploads) == ["b.pdf", "d.pdf"]
+    assert (summary.unchanged, summary.deleted) == (1, 2)
+    assert sorted(corpus.files.values()) == ["a.pdf", "b.pdf", "d.pdf"]
+    assert sorted(SyncState(state_path).entries(CORPUS)) == ["a.pdf", "b.pdf", "d.pdf"]
+
+
+def test_sync_replaces_untracked_and_missing_files(docs):
+    corpus = FakeCorpus()
+    state = SyncState(None)
+    untracked = corpus.upload(SimpleNamespace(display_name="a.pdf")).name
+    corpus.upload(SimpleNamespace(display_name="manual.pdf"))
+    run_sync(corpus, docs, state)
+    assert untracked not in corpus.files
+    assert sorted(corpus.files.values()) == ["a.pdf", "b.pdf", "c.pdf", "manual.pdf"]
+
+    # A file deleted from the corpus behind the sync's back is uploaded again
+    del corpus.files[state.entries(CORPUS)["b.pdf"]["rag_file"]]
+    corpus.uploads.clear()
+    run_sync(corpus, docs, state)
+    assert corpus.uploads == ["b.pdf"]
+
+
+def test_failed_upload_keeps_old_version(docs):
+    corpus = FakeCorpus()
+    state = SyncState(None)
+    run_sync(corpus, docs, state)
+    old = state.entries(CORPUS)["a.pdf"]["rag_file"]
+
+    (docs / "a.pdf").write_bytes(b"a.pdf v2")
+    corpus.upload = lambda item: (_ for _ in ()).throw(RuntimeError("boom"))
+    summary = run_sync(corpus, docs, state)
+    assert summary.ingest.failed == 1
+    assert old in corpus.files
+    assert not state.is_done(CORPUS, collect_directory(str(docs))[0])
+
+
+def test_throttled_upload_is_retried(docs):
+    corpus = FakeCorpus()
+    upload = corpus.upload
+    throttled = []
+
+    def throttled_once(item):
+        if item.display_name == "b.pdf" and not throttled:
+            throttled.append(item.display_name)
+            raise RuntimeError(
+                "Failed in indexing the RagFile due to: ", {"code": 429, "status": "RESOURCE_EXHAUSTED"}
+            )
+        return upload(item)
+
+    corpus.upload = throttled_once
+    summary = run_sync(corpus, docs, SyncState(None))
+    assert (summary.ingest.uploaded, summary.ingest.failed, summary.ingest.throttled) == (3, 0, 1)
@@ -0,0 +1,238 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from rag.shared_libraries.downloads import Downloader, DownloadSpec
+
+
+class FileServer(ThreadingHTTPServer):
+    """Local HTTP stand-in serving in-memory files with ETag and Range support."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.files: dict[str, bytes] = {}
+        self.requests: list[tuple[str, str, str | None]] = []
+        # Path -> number of GETs to cut off halfway
+        self.failures: dict[str, int] = {}
+        # Reply 405 to HEAD, like presigned GET URLs
+        self.reject_head = False
+        self.lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, body: bytes) -> dict:
+        return {
+            "ETag": f'"{hashlib.md5(body).hexdigest()}"',
+            "Accept-Ranges": "bytes",
+            "Content-Type": "application/pdf",
+        }
+
+    def do_HEAD(self):
+        if self.server.reject_head:
+            with self.server.lock:
+                self.server.requests.append((self.command, self.path, None))
+            self.send_error(405)
+            return
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool):
+        server = self.server
+        body = server.files.get(self.path)
+        with server.lock:
+            server.requests.append((self.command, self.path, self.headers.get("Range")))
+        if body is None:
+            self.send_error(404)
+            return
+        headers = self._headers(body)
+        status, start, end = 200, 0, len(body) - 1
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", headers["ETag"]) == headers["ETag"]:
+            first, _, last = range_header.removeprefix("bytes=").partition("-")
+            status, start = 206, int(first)
+            end = int(last) if last else end
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+        payload = body[start : end + 1]
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if not send_body:
+            return
+        with server.lock:
+            cut = server.failures.get(self.path, 0) > 0
+            if cut:
+                server.failures[self.path] -= 1
+        if cut:
+            self.wfile.write(payload[: len(payload) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.close()
+            return
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def server():
+    server = FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_downloader(tmp_path, **kwargs):
+    return Downloader(str(tmp_path / "downloads"), sleep=lambda seconds: None, **kwargs)
+
+
+def test_downloads_concurrently_and_skips_unchanged(server, tmp_path):
+    for i in range(5):
+        server.files[f"/doc{i}.pdf"] = f"document {i}".encode() * 100
+    specs = [DownloadSpec(url=server.url(f"/doc{i}.pdf")) for i in range(5)]
+    downloader = make_downloader(tmp_path)
+
+    results = list(downloader.download_all(specs))
+    assert sorted(result.status for result in results) == ["downloaded"] * 5
+    for result in results:
+        with open(result.path, "rb") as f:
+            assert f.read() == server.files["/" + result.spec.local_name]
+
+    server.requests.clear()
+    assert {result.status for result in downloader.download_all(specs)} == {"unchanged"}
+    assert {method for method, _, _ in server.requests} == {"HEAD"}
+
+    # A changed file has a new ETag and is fetched again
+    server.files["/doc0.pdf"] = b"revised"
+    result = downloader.download(specs[0])
+    assert result.status == "downloaded"
+    assert result.to_ingest_item().display_name == "doc0.pdf"
+
+
+def test_resumes_interrupted_download_with_range(server, tmp_path):
+    body = bytes(range(256)) * 40
+    server.files["/guide.pdf"] = body
+    server.failures["/guide.pdf"] = 1
+
+    result = make_downloader(tmp_path, chunk_size=256).download(DownloadSpec(url=server.url("/guide.pdf")))
+    assert result.status == "resumed"
+    assert result.bytes_transferred < len(body)
+    assert open(result.path, "rb").read() == body
+    ranges = [header for method, _, header in server.requests if method == "GET"]
+    assert ranges[0] is None and ranges[1].startswith("bytes=")
+
+
+def test_splits_large_files_into_segments(server, tmp_path):
+    body = bytes(range(256)) * 64
+    server.files["/bundle.pdf"] = body
+    downloader = make_downloader(tmp_path, segment_size=4096, max_segments=4)
+
+    result = downloader.download(DownloadSpec(url=server.url("/bundle.pdf")))
+    assert result.status == "downloaded"
+    assert open(result.path, "rb").read() == body
+    ranges = sorted(header for method, _, header in server.requests if method == "GET")
+    assert ranges == ["bytes=0-4095", "bytes=12288-16383", "bytes=4096-8191", "bytes=8192-12287"]
+
+
+def test_verifies_checksums(server, tmp_path):
+    server.files["/doc.pdf"] = b"content"
+    downloader = make_downloader(tmp_path)
+    good = DownloadSpec(url=server.url("/doc.pdf"), sha256=hashlib.sha256(b"content").hexdigest().upper())
+    assert downloader.download(good).status == "downloaded"
+    assert downloader.download(good).status == "unchanged"
+
+    bad = DownloadSpec(url=server.url("/doc.pdf"), filename="other.pdf", sha256="0" * 64)
+    result = downloader.download(bad)
+    assert result.status == "failed"
+    assert "expected sha256" in result.error
+    assert not (tmp_path / "downloads" / "other.pdf").exists()
+
+
+def test_rejects_documents_with_the_same_file_name(server, tmp_path):
+    server.files["/2024/report.pdf"] = b"2024"
+    server.files["/2025/report.pdf"] = b"2025"
+    downloader = make_downloader(tmp_path)
+    specs = [DownloadSpec(url=server.url(f"/{year}/report.pdf")) for year in (2024, 2025)]
+
+    with pytest.raises(ValueError, match="report.pdf"):
+        list(downloader.download_all(specs))
+    assert not server.requests
+
+    specs[1].filename = "report-2025.pdf"
+    results = sorted(downloader.download_all(specs), key=lambda result: result.path)
+    assert [open(result.path, "rb").read() for result in results] == [b"2025", b"2024"]
+
+
+def test_missing_file_fails_without_retrying(server, tmp_path):
+    result = make_downloader(tmp_path).download(DownloadSpec(url=server.url("/missing.pdf")))
+    assert result.status == "failed"
+    assert [method for method, _, _ in server.requests] == ["HEAD", "GET"]
+
+
+def test_falls_back_to_plain_get_when_head_is_rejected(server, tmp_path):
+    body = bytes(range(256)) * 64
+    server.files["/signed.pdf"] = body
+    server.reject_head = True
+    downloader = make_downloader(tmp_path, segment_size=4096, max_segments=4)
+    spec = DownloadSpec(url=server.url("/signed.pdf"))
+
+    result = downloader.download(spec)
+    assert result.status == "downloaded"
+    assert open(result.path, "rb").read() == body
+    # One plain GET, no byte ranges
+    assert server.requests == [("HEAD", "/signed.pdf", None), ("GET", "/signed.pdf", None)]
+
+    # The version comes from the GET headers
+    assert downloader.download(spec).status == "unchanged"
+    server.files["/signed.pdf"] = b"revised"
+    assert downloader.download(spec).status == "downloaded"
+    assert open(result.path, "rb").read() == b"revised"
+
+
+def test_downloads_stream_into_uploads(server, tmp_path):
+    from rag.shared_libraries.bulk_ingest import AdaptiveRateLimiter, ingest
+
+    for i in range(3):
+        server.files[f"/rfp{i}.pdf"] = b"%PDF" * (i + 1)
+    specs = [DownloadSpec(url=server.url(f"/rfp{i}.pdf"), display_name=f"RFP {i}") for i in range(3)]
+    downloader = make_downloader(tmp_path)
+    uploaded = []
+
+    summary = ingest(
+        "corpus",
+        (result.to_ingest_item() for result in downloader.download_all(specs) if result.ok),
+        lambda item: uploaded.append(item.display_name),
+        limiter=AdaptiveRateLimiter(rate=1000.0, sleep=lambda seconds: None),
+    )
+    assert sorted(uploaded) == ["RFP 0", "RFP 1", "RFP 2"]
+    assert (summary.total, summary.uploaded) == (3, 3)
@@ -0,0 +1,65 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+from rag.shared_libraries.embeddings import HashingEmbedder
+from rag.shared_libraries.hybrid_index import BM25Index, HybridRagClient, tokenize
+from rag.shared_libraries.local_index import LocalVectorIndex
+
+TEXTS = [
+    "4.2 Evaluation criteria: the technical score is weighted against the financial score.",
+    "The SLA defines availability targets and penalties for the vendor.",
+    "Vendors sign an NDA before receiving confidential project documents.",
+    "Project timeline and submission deadlines for all vendors.",
+]
+
+
+def make_index() -> LocalVectorIndex:
+    embedder = HashingEmbedder()
+    chunks = [
+        {"id": str(i), "title": "Guidelines.pdf", "source_uri": "/g.pdf", "page": i + 1, "text": text}
+        for i, text in enumerate(TEXTS)
+    ]
+    return LocalVectorIndex(chunks, embedder.embed(TEXTS), embedder)
+
+
+def test_tokenize_keeps_section_numbers_and_drops_stopwords():
+    assert tokenize("What is in section 4.2.1 of the SLAs?") == ["sect", "4.2.1", "sla"]
+
+
+def test_bm25_shortlists_only_matching_chunks():
+    index = BM25Index(TEXTS)
+    ids, scores = index.search("NDA for vendors", limit=10)
+    assert ids[0] == 2
+    assert set(ids) == {1, 2, 3}
+    assert np.all(np.diff(scores) <= 0)
+    assert len(index.search("vendors", limit=1)[0]) == 1
+    assert len(index.search("unrelated words", limit=10)[0]) == 0
+
+
+def test_hybrid_client_fuses_rankings_within_shortlist():
+    client = HybridRagClient(make_index())
+    hits = client.retrieve("What does the SLA say?", similarity_top_k=15)
+    assert [hit["page"] for hit in hits] == [2]
+
+    hits = client.retrieve("evaluation criteria in 4.2", similarity_top_k=2)
+    assert hits[0]["page"] == 1
+    assert "distance" in hits[0]
+
+
+def test_hybrid_client_falls_back_to_vector_search():
+    client = HybridRagClient(make_index())
+    hits = client.retrieve("unrelated words", similarity_top_k=2)
+    assert len(hits) == 2
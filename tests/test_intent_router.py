@@ -0,0 +1,116 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from rag.intent_classifier import (
+    DOCUMENT_QUERY,
+    RFP_CREATION,
+    RFP_GUIDELINES,
+    RFP_VALIDATION,
+    IntentClassifier,
+    extract_intent_patterns,
+)
+from rag.intent_router import IntentRouterAgent
+from rag.prompts import return_instructions_smart_orchestrator
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return IntentClassifier.from_prompt()
+
+
+def test_patterns_are_read_from_prompt():
+    patterns = extract_intent_patterns(return_instructions_smart_orchestrator())
+    assert set(patterns) == {RFP_CREATION, RFP_VALIDATION, RFP_GUIDELINES, DOCUMENT_QUERY}
+    assert "Review my RFP" in patterns[RFP_VALIDATION]
+
+
+@pytest.mark.parametrize(
+    "text,intent",
+    [
+        ("I want to create an RFP for a new mobile app development project", RFP_CREATION),
+        ("Help me write an RFP for a cloud migration", RFP_CREATION),
+        ("Please validate this RFP for compliance", RFP_VALIDATION),
+        ("Review my RFP please", RFP_VALIDATION),
+        ("What should be included in an RFP?", RFP_GUIDELINES),
+    ],
+)
+def test_classifies_prompt_phrasings(classifier, text, intent):
+    prediction = classifier.classify(text)
+    assert prediction.intent == intent
+    assert prediction.confidence >= 0.6
+
+
+@pytest.mark.parametrize("text", ["Hi, how are you?", "Thanks, goodbye!", ""])
+def test_small_talk_is_low_confidence(classifier, text):
+    assert classifier.classify(text).confidence < 0.6
+
+
+def _router(classifier):
+    return IntentRouterAgent(
+        name="router",
+        classifier=classifier,
+        routes={
+            RFP_CREATION: "creation",
+            RFP_VALIDATION: "validation",
+            RFP_GUIDELINES: "query",
+            DOCUMENT_QUERY: "query",
+        },
+        fallback_agent_name="fallback",
+        sub_agents=[
+            Agent(name=name, model="gemini-2.5-flash")
+            for name in ("creation", "validation", "query", "fallback")
+        ],
+    )
+
+
+async def _context(router, text, history=()):
+    session_service = InMemorySessionService()
+    session = await session_service.create_session(app_name="test", user_id="user")
+    session.events.extend(history)
+    return InvocationContext(
+        session_service=session_service,
+        invocation_id="invocation",
+        agent=router,
+        session=session,
+        user_content=types.Content(role="user", parts=[types.Part(text=text)]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_router_dispatches_confident_turns(classifier):
+    router = _router(classifier)
+    ctx = await _context(router, "Please validate this RFP for compliance")
+    assert router.select_agent(ctx).name == "validation"
+
+
+@pytest.mark.asyncio
+async def test_router_sticks_to_previous_specialist(classifier):
+    router = _router(classifier)
+    history = [Event(author="creation", invocation_id="previous")]
+    ctx = await _context(router, "The budget is $500,000 over 6 months", history)
+    assert router.select_agent(ctx).name == "creation"
+
+
+@pytest.mark.asyncio
+async def test_router_falls_back_to_llm_router(classifier):
+    router = _router(classifier)
+    ctx = await _context(router, "Hi, how are you?")
+    assert router.select_agent(ctx).name == "fallback"
@@ -0,0 +1,88 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+
+import pytest
+
+from deployment.load_test import (
+    StubEngine,
+    StubTarget,
+    format_report,
+    percentile,
+    read_scenarios,
+    run_load_test,
+    summarize,
+    user_start_times,
+)
+
+
+@pytest.fixture
+def stub():
+    engine = StubEngine(first_event_delay=0.1, event_delay=0.01, text_events=2, tool_calls=2, seed=0)
+    server = engine.serve(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield engine, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.fixture
+def mix(tmp_path):
+    path = tmp_path / "mix.jsonl"
+    path.write_text(
+        '{"name": "create", "weight": 1, "turns": ["I need an RFP", "Budget is SAR 2M"]}\n'
+        "# comment\n"
+        "What sections must an RFP contain?\n",
+        encoding="utf-8",
+    )
+    return read_scenarios(str(path))
+
+
+def test_schedule_and_percentiles():
+    assert user_start_times([(2, 10), (4, 10), (4, 30)]) == [0, 5, 10, 15]
+    assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 50) == 5
+    assert percentile([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 95) == 10
+
+
+def test_concurrent_users_against_stub(stub, mix, tmp_path):
+    engine, url = stub
+    output = tmp_path / "turns.jsonl"
+
+    start = time.perf_counter()
+    results = run_load_test(StubTarget(url), mix, [(6, 0.1)], iterations=2, seed=1, output_path=str(output))
+    elapsed = time.perf_counter() - start
+
+    assert [scenario.name for scenario in mix] == ["create", "query-3"]
+    assert len(results) == len(output.read_text().splitlines()) >= 12
+    assert len({result.user for result in results}) == 6
+    # 6 users x up to 4 sequential turns of ~0.13s, run concurrently
+    assert elapsed < 1.5
+    summary = summarize(results)
+    assert summary["errors"] == 0
+    assert summary["mean_tool_calls"] == 2 and summary["mean_events"] == 6
+    assert 0.1 <= summary["ttfe_p50"] < summary["latency_p50"]
+    assert "overall" in format_report(results, [(6, 0.1)], elapsed)
+
+
+def test_errors_are_counted_not_raised(stub, mix):
+    engine, url = stub
+    engine.error_rate = 1.0
+
+    results = run_load_test(StubTarget(url), mix, [(2, 0)], iterations=1)
+
+    summary = summarize(results)
+    assert summary["error_rate"] == 1.0
+    assert "429" in results[0].error
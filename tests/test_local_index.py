@@ -0,0 +1,74 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rag.shared_libraries.embeddings import HashingEmbedder
+from rag.shared_libraries.local_index import LocalRagClient, LocalVectorIndex
+from rag.shared_libraries.retrieval import RagRetrievalTool
+
+PAGES = [
+    "Evaluation criteria must list the weighting of technical and financial scores.",
+    "The timeline section defines submission deadlines and project milestones.",
+    "Vendors must sign an NDA before receiving confidential project documents.",
+]
+
+
+@pytest.fixture
+def index():
+    chunks = [
+        {
+            "id": f"Guidelines.pdf#{page}",
+            "title": "Guidelines.pdf",
+            "source_uri": "/docs/Guidelines.pdf",
+            "section": None,
+            "page": page,
+            "text": text,
+        }
+        for page, text in enumerate(PAGES, start=1)
+    ]
+    return LocalVectorIndex.from_chunks(chunks, HashingEmbedder())
+
+
+def test_search_ranks_and_honours_top_k_and_threshold(index):
+    results = index.search(["What are the evaluation criteria?", "When is the submission deadline?"], 2)
+    assert [hits[0]["page"] for hits in results] == [1, 2]
+    assert all(len(hits) == 2 for hits in results)
+    assert results[0][0]["distance"] <= results[0][1]["distance"]
+
+    close = index.search(["evaluation criteria weighting"], 3, vector_distance_threshold=0.8)[0]
+    assert [hit["page"] for hit in close] == [1]
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = LocalVectorIndex.load(path)
+    assert loaded.chunks == index.chunks
+    assert loaded.embedder.spec() == {"backend": "hashing", "dimensions": 512}
+    assert loaded.search(["NDA"], 1)[0][0]["page"] == 3
+
+
+@pytest.mark.asyncio
+async def test_tool_runs_against_local_backend(index):
+    tool = RagRetrievalTool(
+        name="retrieve_rfp_guidelines",
+        description="test",
+        similarity_top_k=1,
+        client=LocalRagClient(index),
+    )
+    result = await tool.run_async(args={"query": "NDA for vendors"}, tool_context=None)
+    assert result == [
+        {"title": "Guidelines.pdf", "source_uri": "/docs/Guidelines.pdf", "page": 3, "text": PAGES[2]}
+    ]
@@ -0,0 +1,132 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest
+from google.api_core.exceptions import ResourceExhausted
+from google.genai import types
+
+from rag.long_validation import LongRfpValidator, SectionReview, split_parts
+from rag.rfp_prevalidation import required_sections
+
+SECTION_WORDS = 400
+
+
+def make_rfp(sections):
+    return "\n".join(f"## {name}\n" + " ".join(["word"] * SECTION_WORDS) for name in sections)
+
+
+class FakeModels:
+    """Stand-in for `client.aio.models` returning one review per section."""
+
+    def __init__(self, delay=0.05, fail_once=()):
+        self.delay = delay
+        self.fail_once = set(fail_once)
+        self.prompts = []
+
+    async def generate_content(self, model, contents, config):
+        self.prompts.append(contents)
+        await asyncio.sleep(self.delay)
+        heading = contents.splitlines()[0].removeprefix("Section: ")
+        if heading in self.fail_once:
+            self.fail_once.discard(heading)
+            raise ResourceExhausted("429 quota")
+        review = SectionReview(score=8, strengths=[f"Clear {heading}"], recommendations=["Add owners."])
+        return SimpleNamespace(parsed=review, text=review.model_dump_json())
+
+
+class FakeRetrieval:
+    def __init__(self):
+        self.queries = []
+
+    async def retrieve_async(self, query, similarity_top_k=None, vector_distance_threshold=None):
+        self.queries.append(query)
+        return [{"title": "Guidelines.pdf", "text": f"Guidance for {query}", "distance": 0.1}]
+
+
+def make_validator(models, **kwargs):
+    return LongRfpValidator(
+        model="gemini-test",
+        min_words=1000,
+        section_words=500,
+        concurrency=8,
+        backoff_seconds=0,
+        client=SimpleNamespace(aio=SimpleNamespace(models=models)),
+        retrieval_client=FakeRetrieval(),
+        **kwargs,
+    )
+
+
+def test_split_parts_merges_small_and_splits_large_sections():
+    text = "## Intro\nshort text\n## Scope of Work\n" + " ".join(["scope"] * 1200) + "\n## Budget\n" + " ".join(["sar"] * 200)
+
+    parts = split_parts(text, max_words=500)
+
+    assert [part.heading for part in parts] == [
+        "Intro / Scope of Work (1/3)",
+        "Intro / Scope of Work (2/3)",
+        "Intro / Scope of Work (3/3)",
+        "Budget",
+    ]
+    assert all(part.words <= 500 for part in parts)
+
+
+@pytest.mark.asyncio
+async def test_sections_are_reviewed_in_parallel_and_merged():
+    models = FakeModels(delay=0.1)
+    validator = make_validator(models)
+    names = required_sections()[:6]
+
+    start = time.perf_counter()
+    result = await validator.validate(make_rfp(names))
+    elapsed = time.perf_counter() - start
+
+    assert len(result.parts) == 6
+    assert elapsed < 0.4  # one section's latency, not six
+    assert len(validator.retrieval_client.queries) == 6
+    # 8/10 less 0.5 for each of the 4 missing required sections
+    assert result.score == 6.0
+    assert "**Overall Compliance Score: 6/10**" in result.report
+    assert "Required section missing: Contact Information" in result.report
+    assert "Executive Summary: Clear Executive Summary" in result.report
+    assert result.report.count("Add owners.") == 6
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_section_is_retried_on_its_own():
+    models = FakeModels(delay=0, fail_once={"Scope of Work"})
+    validator = make_validator(models)
+
+    result = await validator.validate(make_rfp(required_sections()))
+
+    assert all(part.review for part in result.parts)
+    assert len(models.prompts) == len(result.parts) + 1
+
+
+@pytest.mark.asyncio
+async def test_callback_answers_only_long_rfps():
+    validator = make_validator(FakeModels(delay=0))
+    long_request = LlmRequest(contents=[
+        types.Content(role="user", parts=[types.Part(text=make_rfp(required_sections()))])
+    ])
+    short_request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="Validate this")])])
+
+    response = await validator.before_model_callback(SimpleNamespace(), long_request)
+
+    assert response.content.parts[0].text.startswith("**RFP Validation Report**")
+    assert await validator.before_model_callback(SimpleNamespace(), short_request) is None
@@ -0,0 +1,87 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from rag.shared_libraries.offline import FakeRetrievalClient, ScriptedLlm, offline
+from rag.shared_libraries.prompt_cache import get_prompt_cache
+from rag.shared_libraries.retrieval import RagRetrievalTool
+
+
+def make_agent():
+    tool = RagRetrievalTool(name="retrieve_rfp_guidelines", description="test", memo=False)
+    return LlmAgent(name="guidelines_agent", model="gemini-test", instruction="Answer.", tools=[tool])
+
+
+async def ask(agent, *texts):
+    session_service = InMemorySessionService()
+    runner = Runner(app_name="test", agent=agent, session_service=session_service)
+    session = await session_service.create_session(app_name="test", user_id="user")
+    events = []
+    for text in texts:
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message):
+            events.append(event)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_scripted_llm_retrieves_then_answers():
+    agent = make_agent()
+    llm = ScriptedLlm(responses={"guidelines_agent": "Include a scope of work."}, latency_seconds=0.01)
+    retrieval = FakeRetrievalClient()
+
+    with offline(agent, llm, retrieval):
+        events = await ask(agent, "What should be included in an RFP?")
+
+    calls = [call.name for event in events for call in event.get_function_calls()]
+    assert calls == ["retrieve_rfp_guidelines"]
+    responses = [r.response for event in events for r in event.get_function_responses()]
+    assert responses[0]["result"][0]["section"] == "2 RFP STRUCTURE"
+    assert events[-1].content.parts[0].text == "Include a scope of work."
+    assert retrieval.queries == ["What should be included in an RFP?"]
+    assert llm.requests == 2
+    assert llm.simulated_seconds == pytest.approx(0.02)
+
+
+@pytest.mark.asyncio
+async def test_script_is_replayed_before_default_behaviour():
+    agent = make_agent()
+    llm = ScriptedLlm(script=["First answer."], call_tools=False)
+
+    with offline(agent, llm, FakeRetrievalClient()):
+        events = await ask(agent, "Hello", "Hello again")
+
+    texts = [event.content.parts[0].text for event in events if event.author == "guidelines_agent"]
+    assert texts == ["First answer.", llm.default_response]
+
+
+def test_offline_restores_the_agent_tree():
+    agent = make_agent()
+    tool = agent.tools[0]
+    prompt_cache = get_prompt_cache()
+    enabled = prompt_cache.enabled
+
+    with offline(agent, ScriptedLlm(), FakeRetrievalClient()):
+        assert isinstance(agent.model, ScriptedLlm)
+        assert isinstance(tool._client, FakeRetrievalClient)
+        assert prompt_cache.enabled is False
+
+    assert agent.model == "gemini-test"
+    assert tool._client is None
+    assert prompt_cache.enabled == enabled
@@ -0,0 +1,143 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.evaluation.eval_case import EvalCase, IntermediateData, Invocation
+from google.adk.evaluation.evaluator import EvaluationResult, Evaluator
+from google.genai import types
+
+from eval.parallel_eval import CaseRun, EvalReport, run_eval
+from rag.shared_libraries.embeddings import HashingEmbedder
+from rag.shared_libraries.offline import FakeRetrievalClient, ScriptedLlm, offline
+from rag.shared_libraries.retrieval import RagRetrievalTool
+from rag.shared_libraries.retrieval_cache import RetrievalCache
+from rag.shared_libraries.semantic_cache import SemanticAnswerCache, SemanticCache
+
+CRITERIA = {"tool_trajectory_avg_score": 0.5}
+
+
+class ToolNameEvaluator(Evaluator):
+    """Scores 1.0 per turn whose tool names match, without comparing arguments."""
+
+    def evaluate_invocations(self, actual_invocations, expected_invocations):
+        scores = [
+            float([c.name for c in a.intermediate_data.tool_uses] == [c.name for c in e.intermediate_data.tool_uses])
+            for a, e in zip(actual_invocations, expected_invocations)
+        ]
+        return EvaluationResult(overall_score=sum(scores) / len(scores))
+
+
+def make_case(eval_id, query, tools):
+    return EvalCase(
+        eval_id=eval_id,
+        conversation=[
+            Invocation(
+                user_content=types.Content(role="user", parts=[types.Part(text=query)]),
+                intermediate_data=IntermediateData(
+                    tool_uses=[types.FunctionCall(name=name, args={"query": query}) for name in tools]
+                ),
+            )
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_cases_run_concurrently_and_are_scored_per_run():
+    tool = RagRetrievalTool(name="retrieve_rfp_guidelines", description="test", memo=False)
+    agent = LlmAgent(name="eval_agent", model="gemini-test", instruction="Answer.", tools=[tool])
+    llm = ScriptedLlm(latency_seconds=0.05)
+    cases = [
+        make_case("retrieves", "What should be included in an RFP?", ["retrieve_rfp_guidelines"]),
+        make_case("no-tools", "Hello", []),
+    ]
+
+    with offline(agent, llm, FakeRetrievalClient()):
+        report = await run_eval(
+            agent, cases, CRITERIA, runs=3, concurrency=6, get_evaluator=lambda metric: ToolNameEvaluator()
+        )
+
+    assert len(report.results) == 6
+    assert all(r.error is None for r in report.results)
+    # The scripted model retrieves on every new question, so only "retrieves" matches
+    summary = report.metric_summary("tool_trajectory_avg_score")
+    assert summary["mean"] == pytest.approx(0.5)
+    assert summary["stdev_across_runs"] == pytest.approx(0.0)
+    assert summary["passed"]
+    cases_summary = report.case_summaries()
+    assert cases_summary["retrieves"]["tool_trajectory_avg_score"]["mean"] == 1.0
+    assert cases_summary["no-tools"]["tool_trajectory_avg_score"]["mean"] == 0.0
+    assert cases_summary["retrieves"]["tokens_mean"] > 0
+    # Six runs of two model calls each at 50ms would take 0.6s one after another
+    assert report.elapsed_seconds < 0.4
+
+
+@pytest.mark.asyncio
+async def test_repeat_runs_start_with_cold_caches():
+    retrieval = FakeRetrievalClient()
+    retrieval.cache = RetrievalCache()
+    answer_cache = SemanticAnswerCache(SemanticCache(HashingEmbedder()), corpus="fake", instruction="Answer.")
+    tool = RagRetrievalTool(name="retrieve_rfp_guidelines", description="test", client=retrieval, memo=False)
+    llm = ScriptedLlm()
+    agent = LlmAgent(
+        name="eval_agent",
+        model=llm,
+        instruction="Answer.",
+        tools=[tool],
+        before_model_callback=[answer_cache.before_model_callback],
+        after_model_callback=[answer_cache.after_model_callback],
+    )
+    cases = [
+        make_case("guidelines-00", "What should be included in an RFP?", ["retrieve_rfp_guidelines"]),
+        make_case("guidelines-01", "What are the evaluation criteria for vendors?", ["retrieve_rfp_guidelines"]),
+    ]
+
+    async def evaluate(**kwargs):
+        return await run_eval(
+            agent, cases, CRITERIA, runs=3, concurrency=1, get_evaluator=lambda metric: ToolNameEvaluator(), **kwargs
+        )
+
+    report = await evaluate()
+    # Every run of every case calls the tool and then answers
+    assert llm.requests == 2 * 6 and len(retrieval.queries) == 6
+    assert all(r.tokens > 0 for r in report.results)
+    assert report.metric_summary("tool_trajectory_avg_score")["mean"] == 1.0
+    assert retrieval.cache is not None and answer_cache.enabled
+
+    llm.requests, retrieval.queries = 0, []
+    await evaluate(warm_caches=True)
+    # Answered from the caches after the first run
+    assert llm.requests < 2 * 6 and len(retrieval.queries) < 6
+
+
+def test_report_aggregates_variance_and_errors():
+    results = [
+        CaseRun("a", 0, {"response_match_score": 0.6}, [100.0], 50, 10),
+        CaseRun("b", 0, {"response_match_score": 0.2}, [300.0], 70, 30),
+        CaseRun("a", 1, {"response_match_score": 0.8}, [200.0], 50, 10),
+        CaseRun("b", 1, error="RuntimeError: 429"),
+    ]
+    report = EvalReport({"response_match_score": 0.5}, runs=2, results=results, elapsed_seconds=1.0)
+
+    summary = report.metric_summary("response_match_score")
+    # Run means are 0.4 and 0.8
+    assert summary["mean"] == pytest.approx(0.6)
+    assert summary["stdev_across_runs"] == pytest.approx(0.2)
+    assert summary["passed"]
+    performance = report.performance_summary()
+    assert performance["errors"] == 1
+    assert performance["turn_latency_p50_ms"] == 200.0
+    assert performance["tokens_per_case"] == pytest.approx(220 / 3)
+    assert report.case_summaries()["b"]["errors"] == ["RuntimeError: 429"]
+    assert "response_match_score: 0.600 ± 0.200" in report.format()
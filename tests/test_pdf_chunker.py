@@ -0,0 +1,97 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from rag.shared_libraries import pdf_chunker
+from rag.shared_libraries.embeddings import HashingEmbedder
+from rag.shared_libraries.local_index import LocalVectorIndex
+from rag.shared_libraries.pdf_chunker import (
+    chunk_pdfs,
+    chunk_sections,
+    is_heading,
+    read_chunk_file,
+    split_sections,
+    write_chunk_file,
+)
+
+PAGES = [
+    "INTRODUCTION\nThis guideline explains how digital project RFPs are written.\n"
+    "3.2 Evaluation Criteria\nTechnical and financial scores are weighted",
+    "seventy to thirty.\n1. The vendor must submit the proposal on time.\n"
+    "4 Scope of Work\n" + " ".join(f"w{i}" for i in range(25)),
+]
+
+
+def test_detects_headings():
+    assert is_heading("3.2 Evaluation Criteria")
+    assert is_heading("SCOPE OF WORK")
+    assert not is_heading("1. The vendor must submit the proposal on time.")
+    assert not is_heading("Scope")
+    assert not is_heading("SLA")
+
+
+def test_chunks_respect_sections_and_track_pages():
+    chunks = chunk_sections(split_sections(PAGES), "g.pdf", "/g.pdf", chunk_size=10, overlap=2)
+    assert [chunk["section"] for chunk in chunks] == [
+        "INTRODUCTION",
+        "3.2 Evaluation Criteria",
+        "3.2 Evaluation Criteria",
+        "4 Scope of Work",
+        "4 Scope of Work",
+        "4 Scope of Work",
+    ]
+    evaluation = chunks[1]
+    assert evaluation["text"].startswith("3.2 Evaluation Criteria\nTechnical and financial")
+    assert (evaluation["page"], evaluation["page_end"]) == (1, 2)
+    assert chunks[2]["text"].split("\n")[1].split()[:2] == evaluation["text"].split()[-2:]
+    assert chunks[-1]["text"].split()[-1] == "w24"
+    assert len({chunk["id"] for chunk in chunks}) == len(chunks)
+
+
+def test_chunk_pdfs_splits_page_ranges_across_workers(monkeypatch):
+    pages = {"/a.pdf": ["A PAGE\nalpha"] * 40, "/b.pdf": ["B PAGE\nbeta"] * 3}
+    calls = []
+
+    def fake_extract(path, start, stop):
+        calls.append((path, start))
+        return pages[path][start:stop]
+
+    monkeypatch.setattr(pdf_chunker, "_page_count", lambda path: len(pages[path]))
+    monkeypatch.setattr(pdf_chunker, "extract_pages", fake_extract)
+    results = chunk_pdfs(["/a.pdf", "/b.pdf"], max_workers=1)
+    assert calls == [("/a.pdf", 0), ("/a.pdf", 16), ("/a.pdf", 32), ("/b.pdf", 0)]
+    assert [chunk["page"] for chunk in results["/a.pdf"]] == list(range(1, 41))
+    assert len(results["/b.pdf"]) == 3
+
+    index = LocalVectorIndex.build(["/b.pdf"], HashingEmbedder(), max_workers=1)
+    assert index.search(["beta"], 1)[0][0]["section"] == "B PAGE"
+
+
+def test_chunk_files_round_trip(tmp_path):
+    chunks = chunk_sections(split_sections(["no heading here"]), "g.pdf", "/g.pdf")
+    path = str(tmp_path / "g.chunks.jsonl")
+    write_chunk_file(chunks, path)
+    assert '"section"' not in open(path).read()
+    assert read_chunk_file(path) == chunks
+
+
+def test_same_file_names_in_different_folders_stay_apart(monkeypatch):
+    monkeypatch.setattr(pdf_chunker, "_page_count", lambda path: 1)
+    monkeypatch.setattr(pdf_chunker, "extract_pages", lambda path, start, stop: [f"SCOPE\n{path}"])
+    results = chunk_pdfs(["/2023/guide.pdf", "/2024/guide.pdf"], max_workers=1)
+
+    ids = [chunk["id"] for chunks in results.values() for chunk in chunks]
+    assert len(set(ids)) == 2
+    assert pdf_chunker.document_key("/2023/guide.pdf") != pdf_chunker.document_key("/2024/guide.pdf")
+    assert pdf_chunker.document_key("/2023/guide.pdf").startswith("guide-")
+    assert results["/2023/guide.pdf"][0]["title"] == "guide.pdf"
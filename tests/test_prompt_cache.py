@@ -0,0 +1,211 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import errors, types
+
+from rag.shared_libraries.prompt_cache import PromptCache, prefix_key
+
+MODEL = "gemini-2.5-flash"
+CONTEXT = SimpleNamespace(agent_name="rfp_creation_agent")
+
+
+class FakeCaches:
+    """In-memory stand-in for `client.aio.caches`."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.contents = {}
+        self.created = []
+        self.updated = []
+        # Error raised by create, if any
+        self.reject = None
+
+    def _content(self, name, display_name, ttl):
+        expire = datetime.fromtimestamp(self.clock() + int(ttl.rstrip("s")), tz=timezone.utc)
+        content = types.CachedContent(name=name, display_name=display_name, expire_time=expire)
+        self.contents[name] = content
+        return content
+
+    async def create(self, *, model, config):
+        if self.reject:
+            raise self.reject
+        self.created.append(config)
+        return self._content(f"cachedContents/{len(self.created)}", config.display_name, config.ttl)
+
+    async def update(self, *, name, config):
+        if name not in self.contents:
+            raise errors.ClientError(404, {"error": {"message": "not found"}})
+        self.updated.append(name)
+        return self._content(name, self.contents[name].display_name, config.ttl)
+
+    async def list(self):
+        async def pages():
+            for content in list(self.contents.values()):
+                yield content
+
+        return pages()
+
+
+def make_cache(now):
+    caches = FakeCaches(lambda: now[0])
+    client = SimpleNamespace(aio=SimpleNamespace(caches=caches))
+    return PromptCache(ttl_seconds=3600, refresh_margin_seconds=300, client=client, clock=lambda: now[0]), caches
+
+
+def make_request(instruction="Long static RFP instruction"):
+    tool = types.Tool(function_declarations=[types.FunctionDeclaration(name="retrieve_rfp_guidelines")])
+    return LlmRequest(
+        model=MODEL,
+        contents=[types.Content(role="user", parts=[types.Part(text="Create an RFP")])],
+        config=types.GenerateContentConfig(system_instruction=instruction, tools=[tool]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_moves_instruction_and_tools_into_cached_content():
+    now = [1_000_000.0]
+    cache, caches = make_cache(now)
+    request = make_request()
+    key = prefix_key(MODEL, request.config)
+
+    await cache.before_model_callback(CONTEXT, request)
+    assert request.config.cached_content == "cachedContents/1"
+    assert request.config.system_instruction is None and request.config.tools is None
+    [created] = caches.created
+    assert created.system_instruction == "Long static RFP instruction"
+    assert created.tools[0].function_declarations[0].name == "retrieve_rfp_guidelines"
+    assert created.display_name.endswith(key[:32])
+
+    # Other sessions reuse the handle; another prompt gets its own cache
+    second = make_request()
+    await cache.before_model_callback(CONTEXT, second)
+    assert second.config.cached_content == "cachedContents/1"
+    other = make_request("Validation instruction")
+    await cache.before_model_callback(CONTEXT, other)
+    assert other.config.cached_content == "cachedContents/2"
+
+
+@pytest.mark.asyncio
+async def test_refreshes_before_expiry_and_recreates_deleted_caches():
+    now = [1_000_000.0]
+    cache, caches = make_cache(now)
+    await cache.before_model_callback(CONTEXT, make_request())
+
+    now[0] += 3400
+    await cache.before_model_callback(CONTEXT, make_request())
+    assert caches.updated == ["cachedContents/1"]
+
+    caches.contents.clear()
+    now[0] += 3400
+    request = make_request()
+    await cache.before_model_callback(CONTEXT, request)
+    assert request.config.cached_content == "cachedContents/2"
+
+
+@pytest.mark.asyncio
+async def test_finds_cache_created_by_another_process():
+    now = [1_000_000.0]
+    first, caches = make_cache(now)
+    await first.before_model_callback(CONTEXT, make_request())
+    second = PromptCache(client=SimpleNamespace(aio=SimpleNamespace(caches=caches)), clock=lambda: now[0])
+    request = make_request()
+    await second.before_model_callback(CONTEXT, request)
+    assert request.config.cached_content == "cachedContents/1"
+    assert len(caches.created) == 1
+
+
+@pytest.mark.asyncio
+async def test_uncacheable_prefix_is_sent_unchanged():
+    now = [1_000_000.0]
+    cache, caches = make_cache(now)
+    caches.reject = errors.ClientError(400, {"error": {
+        "code": 400,
+        "message": "Cached content is too small. total_token_count=812, min_total_token_count=1024",
+        "status": "INVALID_ARGUMENT",
+    }})
+    request = make_request()
+    await cache.before_model_callback(CONTEXT, request)
+    assert request.config.cached_content is None
+    assert request.config.system_instruction == "Long static RFP instruction"
+
+    caches.reject = None
+    await cache.before_model_callback(CONTEXT, make_request())
+    assert caches.created == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("code, status", [(429, "RESOURCE_EXHAUSTED"), (403, "PERMISSION_DENIED")])
+async def test_failed_create_is_retried_on_the_next_call(code, status):
+    now = [1_000_000.0]
+    cache, caches = make_cache(now)
+    caches.reject = errors.ClientError(code, {"error": {"code": code, "message": "try later", "status": status}})
+    request = make_request()
+    await cache.before_model_callback(CONTEXT, request)
+    assert request.config.cached_content is None
+
+    caches.reject = None
+    request = make_request()
+    await cache.before_model_callback(CONTEXT, request)
+    assert request.config.cached_content == "cachedContents/1"
+
+
+@pytest.mark.asyncio
+async def test_reports_cached_and_uncached_tokens():
+    cache = PromptCache(enabled=False)
+    for cached in (None, 4000):
+        response = LlmResponse(
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=4500, cached_content_token_count=cached
+            )
+        )
+        await cache.after_model_callback(CONTEXT, response)
+    request = make_request()
+    await cache.before_model_callback(CONTEXT, request)
+    assert request.config.cached_content is None
+
+    stats = cache.stats()["rfp_creation_agent"]
+    assert stats["requests"] == 2
+    assert (stats["cached_tokens"], stats["uncached_tokens"]) == (4000, 5000)
+    assert stats["cached_ratio"] == pytest.approx(4000 / 9000)
+
+
+def test_shared_cache_works_across_event_loops():
+    now = [1_000_000.0]
+    cache, caches = make_cache(now)
+    create = caches.create
+
+    async def slow_create(**kwargs):
+        # Lets the other requests queue on the key lock
+        await asyncio.sleep(0.01)
+        return await create(**kwargs)
+
+    caches.create = slow_create
+
+    async def concurrent_requests():
+        requests = [make_request() for _ in range(3)]
+        await asyncio.gather(*(cache.before_model_callback(CONTEXT, request) for request in requests))
+        return {request.config.cached_content for request in requests}
+
+    # Each asyncio.run has its own loop, as in CLIs and test runs
+    assert asyncio.run(concurrent_requests()) == {"cachedContents/1"}
+    cache._handles.clear()
+    caches.contents.clear()
+    assert asyncio.run(concurrent_requests()) == {"cachedContents/2"}
+    assert len(caches.created) == 2
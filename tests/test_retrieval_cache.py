@@ -0,0 +1,163 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from vertexai.preview import rag
+
+from rag.shared_libraries.retrieval import RagRetrievalTool, VertexRagClient
+from rag.shared_libraries.retrieval_cache import RetrievalCache
+
+CORPUS = "projects/1/locations/us-east1/ragCorpora/2"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_normalizes_query():
+    key = RetrievalCache.make_key([CORPUS], "What sections must an RFP contain?", 10, 0.6)
+    assert key == RetrievalCache.make_key([CORPUS], "  what sections must an  RFP contain", 10, 0.6)
+    assert key != RetrievalCache.make_key([CORPUS], "What sections must an RFP contain?", 15, 0.6)
+
+
+def test_lru_eviction_and_counters():
+    cache = RetrievalCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats() == {
+        "entries": 2,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "hit_rate": 0.5,
+    }
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = RetrievalCache(ttl_seconds=10, clock=clock)
+    cache.put("a", 1)
+    clock.now += 9
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a") is None
+
+
+def test_persistence_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    clock = FakeClock()
+    cache = RetrievalCache(ttl_seconds=10, path=path, clock=clock)
+    cache.put("fresh", ["chunk"])
+    cache.put("stale", ["old"])
+    cache.put("fresh", ["newer chunk"])
+
+    clock.now += 5
+    restarted = RetrievalCache(ttl_seconds=10, path=path, clock=clock)
+    assert restarted.get("fresh") == ["newer chunk"]
+    with open(path) as f:
+        assert len(f.readlines()) == 2  # compacted on load
+
+
+def test_persistence_file_stays_bounded(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    cache = RetrievalCache(max_entries=10, path=path, clock=FakeClock())
+    for i in range(1000):
+        cache.put(f"query-{i % 50}", [i])
+        with open(path) as f:
+            assert len(f.readlines()) <= 2 * 10 + 1
+
+    restarted = RetrievalCache(max_entries=10, path=path, clock=FakeClock())
+    assert restarted.stats()["entries"] == 10
+    assert restarted.get("query-49") == [999]
+
+
+class HeldFileLock:
+    """File lock stand-in that holds the first writer back until a second one has written."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.first = None
+        self.second_done = threading.Event()
+
+    def __enter__(self):
+        if self.first is None:
+            self.first = threading.get_ident()
+            self.second_done.wait(5)
+        self.lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+        if threading.get_ident() != self.first:
+            self.second_done.set()
+
+
+def test_concurrent_puts_persist_the_last_value(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+    cache = RetrievalCache(path=path, clock=FakeClock())
+    cache._file_lock = held = HeldFileLock()
+
+    first = threading.Thread(target=cache.put, args=("query", ["first"]))
+    first.start()
+    while held.first is None:
+        time.sleep(0.001)
+    cache.put("query", ["second"])
+    first.join()
+
+    assert cache.get("query") == ["second"]
+    assert RetrievalCache(path=path, clock=FakeClock()).get("query") == ["second"]
+
+
+@pytest.mark.asyncio
+async def test_tool_serves_repeated_queries_from_cache(monkeypatch):
+    calls = []
+
+    def fake_retrieval_query(**kwargs):
+        calls.append(kwargs["text"])
+        context = SimpleNamespace(
+            source_display_name="Guidelines.pdf",
+            source_uri="gs://bucket/Guidelines.pdf",
+            text="Scope",
+            distance=0.2,
+        )
+        return SimpleNamespace(contexts=SimpleNamespace(contexts=[context]))
+
+    monkeypatch.setattr(rag, "retrieval_query", fake_retrieval_query)
+    client = VertexRagClient(corpora=[CORPUS], cache=RetrievalCache())
+    tool = RagRetrievalTool(
+        name="retrieve_rfp_guidelines",
+        description="test",
+        similarity_top_k=10,
+        vector_distance_threshold=0.6,
+        client=client,
+    )
+
+    first = await tool.run_async(args={"query": "What sections must an RFP contain?"}, tool_context=None)
+    second = await tool.run_async(args={"query": "what sections must an RFP contain"}, tool_context=None)
+
+    assert first == second == [
+        {"title": "Guidelines.pdf", "source_uri": "gs://bucket/Guidelines.pdf", "text": "Scope"}
+    ]
+    assert len(calls) == 1
+    assert client.cache.stats()["hits"] == 1
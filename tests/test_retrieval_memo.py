@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+
+from rag.shared_libraries.retrieval import RagRetrievalTool
+from rag.shared_libraries.retrieval_memo import MEMO_STATE_KEY, RetrievalMemo, chunk_id
+
+CHUNKS = {
+    "evaluation": [
+        {"id": "g#1", "title": "Guidelines.pdf", "section": "5 EVALUATION", "text": "Weights must add up to 100%."},
+        {"id": "g#2", "title": "Guidelines.pdf", "section": "5 EVALUATION", "text": "Price is scored separately."},
+    ],
+    "budget": [
+        {"id": "g#2", "title": "Guidelines.pdf", "section": "5 EVALUATION", "text": "Price is scored separately."},
+        {"id": "g#7", "title": "Guidelines.pdf", "section": "7 BUDGET", "text": "State the budget range."},
+    ],
+}
+
+
+class FakeClient:
+    def __init__(self):
+        self.queries = []
+
+    async def retrieve_async(self, query, similarity_top_k=None, vector_distance_threshold=None):
+        self.queries.append(query)
+        return CHUNKS["budget" if "budget" in query.lower() else "evaluation"]
+
+
+@pytest.fixture
+def tool():
+    return RagRetrievalTool(name="retrieve_rfp_guidelines", description="test", client=FakeClient(), memo=True, pack=False)
+
+
+@pytest.mark.asyncio
+async def test_repeated_and_overlapping_queries_are_served_from_memo(tool):
+    context = SimpleNamespace(state={})
+
+    first = await tool.run_async(args={"query": "RFP evaluation criteria weights"}, tool_context=context)
+    again = await tool.run_async(args={"query": "What are the evaluation criteria weights?"}, tool_context=context)
+
+    assert [chunk["id"] for chunk in first] == ["g#1", "g#2"]
+    assert all("text" in chunk for chunk in first)
+    assert again == [
+        {"id": "g#1", "title": "Guidelines.pdf", "section": "5 EVALUATION", "already_retrieved": True},
+        {"id": "g#2", "title": "Guidelines.pdf", "section": "5 EVALUATION", "already_retrieved": True},
+    ]
+    assert tool.client.queries == ["RFP evaluation criteria weights"]
+
+
+@pytest.mark.asyncio
+async def test_only_new_chunks_are_sent_in_full(tool):
+    context = SimpleNamespace(state={})
+
+    await tool.run_async(args={"query": "evaluation criteria"}, tool_context=context)
+    result = await tool.run_async(args={"query": "budget range"}, tool_context=context)
+
+    assert result[0] == {"id": "g#2", "title": "Guidelines.pdf", "section": "5 EVALUATION", "already_retrieved": True}
+    assert result[1]["id"] == "g#7" and result[1]["text"] == "State the budget range."
+    assert set(context.state[MEMO_STATE_KEY]["seen"]) == {"g#1", "g#2", "g#7"}
+
+
+def test_memo_keeps_settings_apart_and_hashes_chunks_without_ids():
+    memo = RetrievalMemo({}, max_queries=2)
+    chunk = {"title": "Guidelines.pdf", "source_uri": "gs://b/g.pdf", "text": "Scope"}
+
+    memo.record("scope of work", "15|0.5", [chunk])
+
+    assert memo.lookup("scope of work", "10|0.5") is None
+    assert memo.lookup("scope of work", "15|0.5")[0]["id"] == chunk_id(chunk) == chunk_id(dict(chunk))
+    memo.record("budget", "15|0.5", [])
+    memo.record("timeline", "15|0.5", [])
+    assert memo.lookup("scope of work", "15|0.5") is None
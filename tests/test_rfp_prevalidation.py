@@ -0,0 +1,95 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from rag.rfp_prevalidation import FINDINGS_HEADER, PreValidator, quick_check, required_sections
+
+RFP = """# Cloud Migration RFP
+## 1. Executive Summary
+Saudia seeks a partner to migrate its workloads to a cloud platform.
+## 2. Project Overview and Objectives
+Move 40 applications within 18 months with no downtime for customers.
+**Scope of Work**
+Assessment, migration, testing and hypercare of all in-scope workloads.
+EVALUATION CRITERIA
+Technical approach 50%, price 30%, experience 10%.
+Timeline:
+Proposals are due 15 March 2026, kickoff is on 2026-05-01 and go-live by December 1, 2026.
+## Budget
+The estimated budget is SAR 12,500,000 over 3 years.
+"""
+
+
+def test_required_sections_come_from_creation_prompt():
+    sections = required_sections()
+    assert sections[0] == "Executive Summary"
+    assert "Budget Information" in sections and "Contact Information" in sections
+    assert len(sections) == 10
+
+
+def test_quick_check_reports_sections_and_facts():
+    findings = quick_check(RFP)
+
+    assert findings.required_present["Evaluation Criteria"] == "EVALUATION CRITERIA"
+    assert findings.required_present["Timeline and Milestones"] == "Timeline"
+    assert findings.required_present["Budget Information"] == "Budget"
+    assert findings.missing_sections == [
+        "Technical Requirements",
+        "Submission Guidelines",
+        "Terms and Conditions",
+        "Contact Information",
+    ]
+    assert findings.budget_amounts == ["SAR 12,500,000"]
+    assert findings.dates == ["2026-03-15", "2026-05-01", "2026-12-01"]
+    assert findings.durations == ["18 months", "3 years"]
+    assert findings.issues == ["Evaluation weights add up to 90%, not 100%"]
+
+
+def test_quick_check_flags_sections_without_facts():
+    findings = quick_check("## Budget Information\nTo be confirmed by finance later.\n## Timeline\nTo be agreed with vendor.")
+
+    assert findings.issues == [
+        "'Budget Information' states no amount",
+        "'Timeline' states no dates or durations",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pre_validator_appends_findings_to_rfp_message():
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text=RFP)])])
+    original = request.contents[0]
+
+    result = await PreValidator().before_model_callback(SimpleNamespace(), request)
+
+    assert result is None
+    parts = request.contents[0].parts
+    assert parts[0].text == RFP
+    assert parts[1].text.startswith(FINDINGS_HEADER)
+    assert "Contact Information" in parts[1].text
+    # The session's own content is left untouched
+    assert len(original.parts) == 1
+
+
+@pytest.mark.asyncio
+async def test_pre_validator_ignores_questions():
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="How do I validate an RFP?")])])
+
+    await PreValidator().before_model_callback(SimpleNamespace(), request)
+
+    assert len(request.contents[0].parts) == 1
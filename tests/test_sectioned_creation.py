@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from rag.sectioned_creation import RfpPlan, SectionedRfpWriter, SectionPlan
+from rag.shared_libraries.tracing import create_tracer, read_spans
+
+HEADINGS = ["Executive Summary", "Scope of Work", "Budget Information", "Contact Information"]
+
+
+class FakeModels:
+    """Stand-in for `client.aio.models`: plans HEADINGS, and writes later sections faster."""
+
+    def __init__(self, fail_once=(), fail_always=()):
+        self.fail_once = set(fail_once)
+        self.fail_always = set(fail_always)
+        self.calls = []
+
+    async def generate_content(self, model, contents, config):
+        self.calls.append(contents)
+        if config.response_schema is RfpPlan:
+            plan = RfpPlan(
+                title="Cloud Migration RFP",
+                sections=[SectionPlan(heading=h, brief=f"About {h}", query=f"{h} guidelines") for h in HEADINGS],
+            )
+            return SimpleNamespace(parsed=plan, text=plan.model_dump_json())
+        heading = contents.splitlines()[1].removeprefix("Section: ")
+        await asyncio.sleep(0.05 * (len(HEADINGS) - HEADINGS.index(heading)))
+        if heading in self.fail_once or heading in self.fail_always:
+            self.fail_once.discard(heading)
+            raise RuntimeError("503 unavailable")
+        return SimpleNamespace(text=f"## {heading}\nText for {heading}.")
+
+
+class FakeRetrieval:
+    async def retrieve_async(self, query, similarity_top_k=None, vector_distance_threshold=None):
+        return [{"title": "Guidelines.pdf", "text": f"Guidance for {query}"}]
+
+
+async def run_writer(models, tracer=None, **kwargs):
+    writer = SectionedRfpWriter(
+        name="rfp_section_writer",
+        model="gemini-test",
+        client=SimpleNamespace(aio=SimpleNamespace(models=models)),
+        retrieval_client=FakeRetrieval(),
+        **{"backoff_seconds": 0, **kwargs},
+    )
+    if tracer:
+        tracer.instrument(writer)
+    sessions = InMemorySessionService()
+    runner = Runner(app_name="test", agent=writer, session_service=sessions)
+    session = await sessions.create_session(app_name="test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text="Write the RFP for our cloud migration, budget SAR 5M")])
+    events = [event async for event in runner.run_async(user_id="u", session_id=session.id, new_message=message)]
+    session = await sessions.get_session(app_name="test", user_id="u", session_id=session.id)
+    return events, session
+
+
+@pytest.mark.asyncio
+async def test_sections_stream_as_completed_and_assemble_in_order():
+    models = FakeModels()
+
+    start = time.perf_counter()
+    events, session = await run_writer(models)
+    elapsed = time.perf_counter() - start
+
+    streamed = [event.content.parts[0].text for event in events if event.partial]
+    assert streamed[0].startswith("Drafting **Cloud Migration RFP** (4 sections)")
+    # Shortest section first: completion order, not plan order
+    assert [text.splitlines()[0] for text in streamed[1:]] == [f"## {h}" for h in reversed(HEADINGS)]
+    assert elapsed < 0.35  # the slowest section, not the sum of all four
+
+    final = events[-1]
+    assert not final.partial
+    text = final.content.parts[0].text
+    assert text.startswith("# Cloud Migration RFP")
+    assert [text.index(f"## {h}") for h in HEADINGS] == sorted(text.index(f"## {h}") for h in HEADINGS)
+    # Only the assembled RFP is kept in the session
+    assert [event.author for event in session.events] == ["user", "rfp_section_writer"]
+    assert "SAR 5M" in models.calls[0]
+
+
+@pytest.mark.asyncio
+async def test_failed_section_is_retried_on_its_own():
+    models = FakeModels(fail_once={"Budget Information"})
+
+    events, _ = await run_writer(models)
+
+    assert "Text for Budget Information." in events[-1].content.parts[0].text
+    # One plan call, four sections and one retry
+    assert len(models.calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_backoff_releases_the_concurrency_slot():
+    models = FakeModels(fail_always={"Executive Summary"})
+
+    start = time.perf_counter()
+    events, _ = await run_writer(models, concurrency=1, max_attempts=2, backoff_seconds=0.4)
+    elapsed = time.perf_counter() - start
+
+    streamed = [event.content.parts[0].text.splitlines()[0] for event in events[1:-1]]
+    # The other sections are written while the failed one backs off
+    assert streamed == [f"## {h}" for h in HEADINGS[1:]]
+    assert elapsed < 1.0
+    text = events[-1].content.parts[0].text
+    assert "could not be drafted (RuntimeError: 503 unavailable)" in text
+    assert text.endswith(
+        "_Not drafted: Executive Summary. Ask me to write these sections, or to draft the whole RFP again._"
+    )
+
+
+@pytest.mark.asyncio
+async def test_model_calls_are_traced_one_span_each(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    tracer, provider = create_tracer(path)
+
+    await run_writer(FakeModels(), tracer)
+    provider.force_flush()
+
+    spans = read_spans(path)
+    (agent_span,) = [span for span in spans if span["name"] == "agent rfp_section_writer"]
+    model_spans = [span for span in spans if span["name"] == "llm rfp_section_writer"]
+    assert len(model_spans) == 1 + len(HEADINGS)
+    assert all(span["parent_id"] == agent_span["span_id"] for span in model_spans)
+    assert all(span["attributes"]["gen_ai.request.model"] == "gemini-test" for span in model_spans)
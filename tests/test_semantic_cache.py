@@ -0,0 +1,95 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from rag.shared_libraries.embeddings import HashingEmbedder
+from rag.shared_libraries.semantic_cache import SemanticAnswerCache, SemanticCache
+
+CORPUS = "projects/1/locations/us-east1/ragCorpora/2"
+
+
+def _user(text):
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def _context(text, invocation_id):
+    return SimpleNamespace(user_content=_user(text), invocation_id=invocation_id)
+
+
+def _answer(text):
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+@pytest.fixture
+def answer_cache():
+    cache = SemanticCache(HashingEmbedder(), similarity_threshold=0.8, max_entries=4)
+    return SemanticAnswerCache(cache, corpus=CORPUS, instruction="Answer questions.")
+
+
+def test_lookup_respects_threshold_and_tag():
+    cache = SemanticCache(HashingEmbedder(), similarity_threshold=0.8)
+    question = "What should be included in an RFP?"
+    cache.store(cache.embed(question), question, "Scope, budget. Citations: 1) Guide", "a")
+
+    assert cache.lookup(cache.embed("what should be included in an RFP"), "a").answer.startswith("Scope")
+    assert cache.lookup(cache.embed("What should be included in an RFP?"), "b") is None
+    assert cache.lookup(cache.embed("How do I submit a proposal late?"), "a") is None
+
+    assert cache.invalidate(keep_tag="b") == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_capacity_overwrites_oldest():
+    cache = SemanticCache(HashingEmbedder(), max_entries=2)
+    for question in ("first question", "second question", "third question"):
+        cache.store(cache.embed(question), question, question.upper(), "t")
+    assert cache.lookup(cache.embed("first question"), "t") is None
+    assert cache.lookup(cache.embed("third question"), "t").answer == "THIRD QUESTION"
+
+
+@pytest.mark.asyncio
+async def test_callbacks_store_and_serve_guideline_answers(answer_cache):
+    request = LlmRequest(contents=[_user("What should be included in an RFP?")])
+    first = _context("What should be included in an RFP?", "inv-1")
+    assert await answer_cache.before_model_callback(callback_context=first, llm_request=request) is None
+    await answer_cache.after_model_callback(
+        callback_context=first, llm_response=_answer("An executive summary... Citations: 1) Guide")
+    )
+
+    second = _context("What should be included in an RFP", "inv-2")
+    cached = await answer_cache.before_model_callback(callback_context=second, llm_request=request)
+    assert cached.content.parts[0].text == "An executive summary... Citations: 1) Guide"
+
+
+@pytest.mark.asyncio
+async def test_callbacks_skip_creation_turns_and_tool_results(answer_cache):
+    creation = _context("I want to create an RFP for a website", "inv-1")
+    request = LlmRequest(contents=[_user("I want to create an RFP for a website")])
+    assert await answer_cache.before_model_callback(callback_context=creation, llm_request=request) is None
+    await answer_cache.after_model_callback(callback_context=creation, llm_response=_answer("Draft"))
+    assert answer_cache.cache.stats()["entries"] == 0
+
+    tool_result = types.Content(
+        role="user",
+        parts=[types.Part(function_response=types.FunctionResponse(name="retrieve", response={}))],
+    )
+    question = _context("What should be included in an RFP?", "inv-2")
+    request = LlmRequest(contents=[_user("What should be included in an RFP?"), tool_result])
+    assert await answer_cache.before_model_callback(callback_context=question, llm_request=request) is None
+    assert answer_cache.cache.stats()["misses"] == 0
@@ -0,0 +1,125 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from rag.shared_libraries.offline import FakeRetrievalClient, ScriptedLlm
+from rag.shared_libraries.retrieval import RagRetrievalTool
+from rag.shared_libraries.sqlite_sessions import SqliteSessionService
+
+APP = "rag"
+RFP_TEXT = "Scope of work: migrate the reservation platform. " * 200
+
+
+def text_event(author, text, state_delta=None):
+    return Event(
+        author=author,
+        invocation_id="e-1",
+        content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+@pytest.mark.asyncio
+async def test_runner_conversation_survives_restart(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    tool = RagRetrievalTool(name="retrieve_rfp_guidelines", description="test", client=FakeRetrievalClient(), memo=False)
+    agent = LlmAgent(
+        name="guidelines_agent",
+        model=ScriptedLlm(responses={"guidelines_agent": "Include a scope of work."}),
+        instruction="Answer.",
+        tools=[tool],
+    )
+    service = SqliteSessionService(path)
+    runner = Runner(app_name=APP, agent=agent, session_service=service)
+    session = await service.create_session(app_name=APP, user_id="user")
+    message = types.Content(role="user", parts=[types.Part(text="What should be included in an RFP?")])
+    events = [e async for e in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+    service.close()
+
+    reopened = SqliteSessionService(path)
+    loaded = await reopened.get_session(app_name=APP, user_id="user", session_id=session.id)
+    assert [e.model_dump() for e in loaded.events[1:]] == [e.model_dump() for e in events]
+    assert loaded.events[0].content.parts[0].text == "What should be included in an RFP?"
+
+    recent = await reopened.get_session(
+        app_name=APP, user_id="user", session_id=session.id, config=GetSessionConfig(num_recent_events=1)
+    )
+    assert [e.id for e in recent.events] == [events[-1].id]
+    listed = await reopened.list_sessions(app_name=APP, user_id="user")
+    assert [s.id for s in listed.sessions] == [session.id] and not listed.sessions[0].events
+
+
+@pytest.mark.asyncio
+async def test_state_prefixes_and_stale_sessions(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "sessions.db"))
+    first = await service.create_session(app_name=APP, user_id="alice", state={"draft": 1, "app:tenant": "saudia"})
+    await service.append_event(
+        first, text_event("rfp_creation_agent", "ok", {"draft": 2, "user:lang": "ar", "temp:scratch": "x"})
+    )
+
+    second = await service.create_session(app_name=APP, user_id="alice", session_id="second")
+    assert second.state == {"app:tenant": "saudia", "user:lang": "ar"}
+    other = await service.create_session(app_name=APP, user_id="bob")
+    assert other.state == {"app:tenant": "saudia"}
+    reloaded = await service.get_session(app_name=APP, user_id="alice", session_id=first.id)
+    assert reloaded.state == {"draft": 2, "app:tenant": "saudia", "user:lang": "ar"}
+
+    with pytest.raises(ValueError, match="already exists"):
+        await service.create_session(app_name=APP, user_id="alice", session_id="second")
+    stale = await service.get_session(app_name=APP, user_id="alice", session_id="second")
+    await service.append_event(second, text_event("user", "hello"))
+    with pytest.raises(ValueError, match="stale"):
+        await service.append_event(stale, text_event("user", "hello again"))
+
+
+@pytest.mark.asyncio
+async def test_large_text_is_stored_once_and_collected(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "sessions.db"), blob_min_chars=1000)
+    sessions = [await service.create_session(app_name=APP, user_id="user") for _ in range(2)]
+    for session in sessions:
+        await service.append_event(session, text_event("user", RFP_TEXT))
+        await service.append_event(session, text_event("rfp_validation_agent", "Validated: " + RFP_TEXT[:40]))
+
+    stats = service.storage_stats()
+    assert stats["events"] == 4 and stats["blobs"] == 1
+    assert stats["payload_bytes"] + stats["blob_bytes"] < stats["raw_bytes"] / 10
+    loaded = await service.get_session(app_name=APP, user_id="user", session_id=sessions[0].id)
+    assert loaded.events[0].content.parts[0].text == RFP_TEXT
+
+    await service.delete_session(app_name=APP, user_id="user", session_id=sessions[0].id)
+    assert service.storage_stats()["blobs"] == 1
+    await service.delete_session(app_name=APP, user_id="user", session_id=sessions[1].id)
+    assert service.storage_stats() == {
+        "sessions": 0, "events": 0, "blobs": 0, "payload_bytes": 0, "blob_bytes": 0, "raw_bytes": 0
+    }
+    assert await service.get_session(app_name=APP, user_id="user", session_id=sessions[1].id) is None
+
+
+@pytest.mark.asyncio
+async def test_values_shaped_like_blob_references_round_trip(tmp_path):
+    service = SqliteSessionService(str(tmp_path / "sessions.db"), blob_min_chars=1000)
+    session = await service.create_session(app_name=APP, user_id="user")
+    lookalikes = {"$blob": "not-a-hash", "nested": [{"$blob": RFP_TEXT}, {"$$ref": 1, "$": "x"}]}
+    event = text_event("rfp_creation_agent", "ok", {"draft": lookalikes})
+    await service.append_event(session, event)
+
+    loaded = await service.get_session(app_name=APP, user_id="user", session_id=session.id)
+    assert loaded.events[0].actions.state_delta == {"draft": lookalikes}
+    assert service.storage_stats()["blobs"] == 1
@@ -0,0 +1,53 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cold-start regression checks, each run in a fresh interpreter."""
+
+import json
+import pathlib
+import subprocess
+import sys
+
+REPO_ROOT = pathlib.Path(__file__).parent.parent
+
+
+def _run(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_registry_import_builds_no_agents():
+    loaded = _run(
+        "import json, sys\n"
+        "import rag\n"
+        "from rag.agent_registry import list_available_agents, get_agent_descriptions\n"
+        "list_available_agents(); get_agent_descriptions()\n"
+        "print(json.dumps(sorted(m for m in sys.modules if m.startswith(('rag', 'google.adk', 'vertexai')))))\n"
+    )
+    assert loaded == ["rag", "rag.agent_registry"]
+
+
+def test_get_agent_builds_only_the_requested_agent():
+    loaded = _run(
+        "import json, sys\n"
+        "from rag.agent_registry import AGENT_REGISTRY, get_agent\n"
+        "get_agent('rfp_validation')\n"
+        "print(json.dumps({\n"
+        "    'loaded': [name for name in AGENT_REGISTRY if AGENT_REGISTRY.is_loaded(name)],\n"
+        "    'modules': [m for m in sys.modules if m.endswith('_agent') and m.startswith('rag.')],\n"
+        "}))\n"
+    )
+    assert loaded == {"loaded": ["rfp_validation"], "modules": ["rag.rfp_validation_agent"]}
@@ -0,0 +1,106 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from rag.shared_libraries.offline import FakeRetrievalClient, ScriptedLlm
+from rag.shared_libraries.retrieval import RagRetrievalTool
+from rag.shared_libraries.tracing import create_tracer, read_spans, summarize
+
+
+def make_agent():
+    tool = RagRetrievalTool(
+        name="retrieve_rfp_guidelines",
+        description="test",
+        client=FakeRetrievalClient(latency_seconds=0.02),
+        similarity_top_k=5,
+        vector_distance_threshold=0.5,
+        memo=False,
+    )
+    existing = lambda callback_context, llm_request: None  # noqa: E731
+    return LlmAgent(
+        name="guidelines_agent",
+        model=ScriptedLlm(latency_seconds=0.01),
+        instruction="Answer.",
+        tools=[tool],
+        before_model_callback=existing,
+    )
+
+
+async def ask(agent, text):
+    session_service = InMemorySessionService()
+    runner = Runner(app_name="test", agent=agent, session_service=session_service)
+    session = await session_service.create_session(app_name="test", user_id="user")
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    async for _ in runner.run_async(user_id="user", session_id=session.id, new_message=message):
+        pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", ["jsonl", "otlp"])
+async def test_turn_is_traced_per_phase(tmp_path, export_format):
+    path = str(tmp_path / "traces.jsonl")
+    tracer, provider = create_tracer(path, export_format)
+    agent = make_agent()
+    tracer.instrument(agent)
+    tracer.instrument(agent)  # idempotent
+    assert len(agent.before_model_callback) == 2
+
+    await ask(agent, "What should be included in an RFP?")
+    provider.force_flush()
+
+    spans = {span["name"]: span for span in read_spans(path)}
+    assert len(read_spans(path)) == 4  # agent, two model calls, one tool call
+    root = spans["agent guidelines_agent"]
+    assert root["parent_id"] is None
+    tool = spans["tool retrieve_rfp_guidelines"]
+    assert tool["parent_id"] == root["span_id"]
+    assert tool["attributes"]["rag.retrieval.top_k"] == 5
+    assert tool["attributes"]["rag.retrieval.threshold"] == 0.5
+    assert tool["attributes"]["rag.retrieval.chunks"] == 3
+    assert tool["attributes"]["rag.tool.response_bytes"] > 0
+    assert spans["llm guidelines_agent"]["attributes"]["gen_ai.usage.input_tokens"] > 0
+
+    summary = summarize(read_spans(path))
+    assert summary["turns"] == 1
+    assert summary["spans"]["llm guidelines_agent"]["count"] == 2
+    assert summary["phases"]["tool"]["total_ms"] >= 20
+    assert summary["phases"]["llm"]["total_ms"] >= 20
+    assert sum(phase["share"] for phase in summary["phases"].values()) == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_model_call_served_by_callback_is_closed(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    tracer, provider = create_tracer(path)
+    cached = types.Content(role="model", parts=[types.Part(text="Cached answer.")])
+    agent = LlmAgent(
+        name="cached_agent",
+        model=ScriptedLlm(),
+        instruction="Answer.",
+        before_model_callback=lambda callback_context, llm_request: LlmResponse(content=cached),
+    )
+    tracer.instrument(agent)
+
+    await ask(agent, "Hello")
+    provider.force_flush()
+
+    spans = {span["name"]: span for span in read_spans(path)}
+    assert spans["llm cached_agent"]["attributes"]["rag.served_by_callback"] is True
+    assert agent.model.requests == 0